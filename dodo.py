@@ -39,6 +39,29 @@ OUTPUT_DIR = (config("OUTPUT_DIR"))
 MANUAL_DATA_DIR = (config("MANUAL_DATA_DIR"))
 PUBLISH_DIR = (config("PUBLISH_DIR"))
 
+CIP_DATA_URL = "https://raw.githubusercontent.com/Kunj121/CIP_DATA/main/CIP_2025%20(1).xlsx"
+CIP_WORKBOOK = str(MANUAL_DATA_DIR / "CIP_2025.xlsx")
+
+# Code and tables every stage that loads the CIP panel depends on
+CIP_CODE = [
+    "./src/settings.py",
+    "./src/pull_bloomberg_cip_data.py",
+    "./src/panel_cache.py",
+    "./src/panel_store.py",
+    "./src/currency_universe.py",
+    "./src/currency_universe.csv",
+    "./src/cip_engine.py",
+    "./src/outlier_filter.py",
+    "./src/polars_backend.py",
+    "./src/parallel_cip.py",
+    "./src/bloomberg_store.py",
+    "./src/instrumentation.py",
+    "./src/downsample.py",
+    "./src/panel_dataset.py",
+    "./src/cip_incremental.py",
+    "./src/downloader.py",
+]
+
 
 
 
@@ -64,15 +87,17 @@ class GreenReporter(ConsoleReporter):
 #######################################
 ## Helper Functions for Jupyter Tasks
 #######################################
+# Notebooks are executed into OUTPUT_DIR rather than in place, so running a
+# stage never modifies its own (content-hashed) input.
 def jupyter_execute_notebook(notebook):
-    return (f"jupyter nbconvert --ClearOutputPreprocessor.enabled=True --execute --to notebook --"
-            f"inplace --ExecutePreprocessor.allow_errors=True ./src/{notebook}.ipynb")
+    return (f"jupyter nbconvert --execute --to notebook --output-dir={OUTPUT_DIR} "
+            f"--ExecutePreprocessor.allow_errors=True ./src/{notebook}.ipynb")
 
 def jupyter_to_html(notebook):
-    return f"jupyter nbconvert --to html --output-dir={OUTPUT_DIR} ./src/{notebook}.ipynb"
+    return f"jupyter nbconvert --to html --output-dir={OUTPUT_DIR} {OUTPUT_DIR / notebook}.ipynb"
 
 def jupyter_to_latex(notebook):
-    return f"jupyter nbconvert --to latex --output-dir={OUTPUT_DIR} ./src/{notebook}.ipynb"
+    return f"jupyter nbconvert --to latex --output-dir={OUTPUT_DIR} {OUTPUT_DIR / notebook}.ipynb"
 
 def jupyter_clear_output(notebook):
     return f"jupyter nbconvert --ClearOutputPreprocessor.enabled=True --inplace ./src/{notebook}.ipynb"
@@ -188,17 +213,27 @@ def task_download_cip_data():
 
     def download():
         import requests
-        url = "https://raw.githubusercontent.com/Kunj121/CIP_DATA/main/CIP_2025%20(1).xlsx"
-        response = requests.get(url)
-        response.raise_for_status()
-        os.makedirs(MANUAL_DATA_DIR, exist_ok=True)
-        with open(target_file, "wb") as f:
-            f.write(response.content)
-        print(f"File saved to {target_file.resolve()}")
+        from src.downloader import download_file
+
+        try:
+            result = download_file(CIP_DATA_URL, target_file,
+                                   expected_sha256=config("CIP_DATA_SHA256") or None)
+        except requests.ConnectionError as e:
+            if not target_file.exists():
+                raise
+            # Offline: keep working from the copy on disk
+            print(f"Could not reach {CIP_DATA_URL} ({e}); using {target_file}")
+            return
+        if result["changed"]:
+            print(f"File saved to {target_file.resolve()}")
+        else:
+            print(f"{target_file} is up to date (HTTP {result['status']})")
 
     return {
         "actions": [download],
         "targets": [str(target_file)],
+        # Always ask the server: an unchanged workbook costs a 304 and is not
+        # rewritten, so stages depending on its content stay up to date
         "uptodate": [False],
         "clean": True,
     }
@@ -208,10 +243,15 @@ def task_download_cip_data():
 def task_clean_data():
     """Run the CIP data cleaning script."""
     tidy_data_file = DATA_DIR / "tidy_data.csv"
+    dataset_dir = DATA_DIR / "datasets"
     return {
         "actions": ["ipython ./src/clean_data.py"],
-        "file_dep": [str(MANUAL_DATA_DIR / "CIP_2025.xlsx")],
-        "targets": [str(tidy_data_file)],
+        "file_dep": ["./src/clean_data.py", *CIP_CODE, CIP_WORKBOOK],
+        "targets": [
+            str(tidy_data_file),
+            str(dataset_dir / "panel" / "_meta.json"),
+            str(dataset_dir / "spreads" / "_meta.json"),
+        ],
         "clean": True,
     }
 
@@ -227,9 +267,16 @@ def task_run_notebooks():
             jupyter_to_latex(notebook),
             # convert_html_to_png  # Move PNGs and process files
         ],
-        "file_dep": ["./src/main_cip.ipynb", str(MANUAL_DATA_DIR / "CIP_2025.xlsx")],
+        "file_dep": [
+            "./src/main_cip.ipynb",
+            "./src/cip_analysis.py",
+            "./src/stats_accumulator.py",
+            *CIP_CODE,
+            CIP_WORKBOOK,
+        ],
         "targets": [
-            str(OUTPUT_DIR /"html_files"/ "main_cip.html"),
+            str(OUTPUT_DIR / "main_cip.ipynb"),
+            str(OUTPUT_DIR / "main_cip.html"),
             str(OUTPUT_DIR / "main_cip.tex"),
         ],
         "task_dep": ["download_cip_data"],
@@ -280,46 +327,68 @@ def task_rename_plots():
         ],
         "file_dep": [
             "./src/cip_analysis.py",
-            "./src/pull_bloomberg_cip_data.py",
-            str(MANUAL_DATA_DIR / "CIP_2025.xlsx"),
+            str(OUTPUT_DIR / "main_cip.tex"),
+            *CIP_CODE,
+            CIP_WORKBOOK,
         ],
         "targets": [
             str(OUTPUT_DIR / "main_cip_files" / "cip_spread_plot_replication.png"),
             str(OUTPUT_DIR / "main_cip_files" / "cip_spread_plot_2025.png"),
         ],
-        "task_dep": ["download_cip_data"],
+        "task_dep": ["download_cip_data", "run_notebooks"],
         "clean": True,
     }
 
 def task_summary_stats():
-    """Generate summary statistics and save them as HTML files."""
+    """Generate summary statistics and save them as HTML and PNG tables."""
     def generate_summary():
-        # Ensure we correctly import the required functions
-        from src.directory_functions import save_cip_statistics_as_html
+        from src.directory_functions import export_cip_statistics
         from src.pull_bloomberg_cip_data import compute_cip
         from src.cip_analysis import compute_cip_statistics
+        from src import instrumentation
 
-        # Step 1: Compute CIP data
-        cip_data = compute_cip()
+        stats_dict = compute_cip_statistics(compute_cip())
+        export_cip_statistics(stats_dict, formats=("html", "png"))
+        # Trace + per-stage table when PROFILE=True
+        instrumentation.report("summary_stats")
 
-        # Step 2: Compute statistics
-        stats_dict = compute_cip_statistics(cip_data)
+    stems = ["cip_summary_overall", "cip_correlation_matrix", "cip_annual_statistics"]
+    return {
+        "actions": [generate_summary],
+        "file_dep": [
+            "./src/cip_analysis.py",
+            "./src/stats_accumulator.py",
+            "./src/directory_functions.py",
+            "./src/table_render.py",
+            *CIP_CODE,
+            CIP_WORKBOOK,
+        ],
+        "targets": [str(OUTPUT_DIR / "html_files" / f"{stem}.html") for stem in stems]
+        + [str(OUTPUT_DIR / "main_cip_files" / f"{stem}.png") for stem in stems],
+        "task_dep": ["download_cip_data"],
+        "clean": True,
+    }
 
-        # Debugging: Check if 'overall_statistics' exists
-        if "overall_statistics" not in stats_dict:
-            raise KeyError("Error: 'overall_statistics' key is missing from stats_dict!")
+def task_charts():
+    """Render the registered charts, redrawing only those whose inputs changed."""
+    def render():
+        from src.chart_registry import render_charts
+        from src import instrumentation
 
-        # Step 3: Save statistics as HTML
-        save_cip_statistics_as_html(stats_dict)
+        for name, status in render_charts().items():
+            print(f"{name}: {status}")
+        instrumentation.report("charts")
 
     return {
-        "actions": [generate_summary],
-        "file_dep": ["./src/pull_bloomberg_cip_data.py", "./src/cip_analysis.py"],
-        "targets": [
-            str(OUTPUT_DIR / "cip_summary_overall.html"),
-            str(OUTPUT_DIR / "cip_correlation_matrix.html"),
-            str(OUTPUT_DIR / "cip_annual_statistics.html"),
+        "actions": [render],
+        "file_dep": [
+            "./src/chart_registry.py",
+            "./src/downsample.py",
+            *CIP_CODE,
+            CIP_WORKBOOK,
         ],
+        "targets": [str(OUTPUT_DIR / "charts" / "manifest.json")],
+        "task_dep": ["download_cip_data"],
         "clean": True,
     }
 
@@ -333,6 +402,31 @@ def copy_notebook():
     shutil.copy2(src_path, dest_path)  # Copy and preserve metadata
     print(f"Copied {src_path} → {dest_path}")
 
+def compile_latex(tex_path, max_runs=3):
+    """
+    Run pdflatex until the .aux file stops changing (at most `max_runs` times).
+
+    Cross-references only need another pass when the previous one changed
+    the .aux file, so an unchanged document compiles once instead of three
+    times.
+    """
+    import hashlib
+
+    tex_path = Path(tex_path)
+    aux_path = tex_path.with_suffix(".aux")
+
+    def aux_digest():
+        return hashlib.md5(aux_path.read_bytes()).hexdigest() if aux_path.exists() else None
+
+    previous = aux_digest()
+    for _ in range(max_runs):
+        subprocess.run(["pdflatex", f"-output-directory={tex_path.parent}", str(tex_path)], check=True)
+        current = aux_digest()
+        if current == previous:
+            break
+        previous = current
+
+
 def task_generate_paper():
     """Generate a LaTeX paper from the copied Jupyter Notebook."""
     paper_notebook = PUBLISH_DIR / "paper.ipynb"
@@ -344,14 +438,18 @@ def task_generate_paper():
             copy_notebook,  # Copy first
             f"jupyter nbconvert --execute --to notebook --inplace --ExecutePreprocessor.allow_errors=True \"{paper_notebook}\"",
             f"jupyter nbconvert --to latex --output-dir=\"{PUBLISH_DIR}\" \"{paper_notebook}\"",
-            f"pdflatex -output-directory=\"{PUBLISH_DIR}\" \"{paper_tex}\"",
             # f"bibtex \"{paper_tex.with_suffix('')}\"",  # Keep commented if no bibliography
-            f"pdflatex -output-directory=\"{PUBLISH_DIR}\" \"{paper_tex}\"",
-            f"pdflatex -output-directory=\"{PUBLISH_DIR}\" \"{paper_tex}\""
+            (compile_latex, [paper_tex]),
         ],
-        "file_dep": [],
-        "targets": [str(paper_tex)],
-        "task_dep": [],
+        "file_dep": [
+            "./src/main_cip.ipynb",
+            "./src/cip_analysis.py",
+            "./src/stats_accumulator.py",
+            *CIP_CODE,
+            CIP_WORKBOOK,
+        ],
+        "targets": [str(paper_tex), str(paper_tex.with_suffix(".pdf"))],
+        "task_dep": ["download_cip_data"],
         "clean": True,
     }
 
@@ -392,4 +490,5 @@ def task_clean_reports():
 #   doit run_notebooks     # Execute notebooks (including main_cip.ipynb)
 #   doit pull_cip          # Renames and cleans _output folder
 #   doit summary_stats     # Generate summary statistics
+#   doit charts            # Render charts whose input data changed
 #   doit generate_paper    #Outputs LaTex and PDF of notebooks
@@ -28,15 +28,22 @@ OUTPUT_DIR.mkdir(parents=True, exist_ok=True)  # Ensure the directory exists
 
 sns.set()
 
-# Load data
-df = pull_bloomberg_cip_data.load_raw(end='2020-01-01', plot=True)
-df_2025 = pull_bloomberg_cip_data.load_raw(end='2025-01-01', plot=True)
-
-
-
+# Both horizons are slices of one computation over the full history
+horizons = pull_bloomberg_cip_data.compute_cip(end=['2020-01-01', '2025-01-01'])
+
+fig, axes = plt.subplots(2, 1, figsize=(13, 12), sharey=True)
+for ax, (end, spreads) in zip(axes, horizons.items()):
+    for column in spreads.columns:
+        ax.plot(spreads.index, spreads[column], label=column[4:7], linewidth=1)
+    ax.set_title(f"CIP spreads through {end}")
+    ax.set_ylabel("Arbitrage Spread (bps)")
+    ax.set_ylim([-50, 210])
+axes[0].legend(loc='upper right', ncol=4)
+fig.tight_layout()
 
 # Save figure
 filename = OUTPUT_DIR / 'CIP_Replication.png'
+fig.savefig(filename, dpi=300, bbox_inches='tight')
 
 
 print(f"Plot saved at {filename}")
@@ -0,0 +1,403 @@
+"""
+Benchmarks of the CIP pipeline on synthetic panels of growing size.
+
+Synthetic spot / forward-point / OIS sheets are generated for any number of
+currencies (8 up to 500) and any sampling frequency (business days up to
+minute bars), with the same layout and quote conventions as the workbook.
+Each case times the pipeline stages on them:
+
+- ``ingest``: normalize_sheets, the load_raw-equivalent merge of the sheets;
+- ``cip``: the vectorized basis (compute_cip_basis);
+- ``outlier_filter``: the 45-day rolling-median filter;
+- ``stats``: compute_cip_statistics;
+- ``render``: plot_spreads to PNG.
+
+Stages are measured with the instrumentation module (wall time, CPU time,
+RSS, rows), best of `repeat` runs. Results are appended to
+OUTPUT_DIR/benchmarks/results.jsonl, one line per stage, tagged with the
+engine, commit and machine, so runs can be compared with
+`compare_results` to catch slowdowns or to compare engines::
+
+    python src/benchmarks.py --preset quick
+    python src/benchmarks.py --preset default --compare
+"""
+import argparse
+import datetime
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+try:
+    from settings import config
+    import instrumentation
+    import cip_engine
+    import outlier_filter
+    import pull_bloomberg_cip_data
+    import cip_analysis
+except ModuleNotFoundError:
+    from src.settings import config
+    import src.instrumentation as instrumentation
+    import src.cip_engine as cip_engine
+    import src.outlier_filter as outlier_filter
+    import src.pull_bloomberg_cip_data as pull_bloomberg_cip_data
+    import src.cip_analysis as cip_analysis
+
+
+BENCHMARK_DIR = Path(config("OUTPUT_DIR")) / "benchmarks"
+RESULTS_FILE = "results.jsonl"
+
+STAGES = ("ingest", "cip", "outlier_filter", "stats", "render")
+
+# (currencies, years of history, sampling frequency)
+PRESETS = {
+    "quick": [(8, 15, "B"), (50, 5, "B")],
+    "default": [
+        (8, 15, "B"),
+        (50, 15, "B"),
+        (200, 15, "B"),
+        (500, 15, "B"),
+        (8, 1, "h"),
+        (8, 1, "min"),
+    ],
+    "full": [
+        (8, 15, "B"),
+        (50, 15, "B"),
+        (200, 15, "B"),
+        (500, 15, "B"),
+        (8, 15, "h"),
+        (50, 15, "h"),
+        (8, 5, "min"),
+        (8, 15, "min"),
+    ],
+}
+
+
+######################################
+# Synthetic panels
+######################################
+def synthetic_currencies(n_currencies):
+    """Three-letter codes AAA, AAB, ... (USD skipped)."""
+    codes = ("".join(letters) for letters in itertools.product("ABCDEFGHIJKLMNOPQRSTUVWXYZ", repeat=3))
+    return list(itertools.islice((code for code in codes if code != "USD"), n_currencies))
+
+
+def synthetic_universe(n_currencies):
+    """
+    Currency universe table for synthetic currencies.
+
+    Same columns as currency_universe.load_universe; every fourth pair is
+    quoted as USD per unit, every seventh has JPY-style forward points.
+    """
+    codes = synthetic_currencies(n_currencies)
+    position = np.arange(n_currencies)
+    return pd.DataFrame(
+        {
+            "spot_ticker": [f"{c} CMPN Curncy" for c in codes],
+            "forward_ticker": [f"{c}3M CMPN Curncy" for c in codes],
+            "forward_scale": np.where(position % 7 == 5, 100.0, 10000.0),
+            "usd_per_unit": position % 4 == 0,
+            "ois_ticker": [f"{c}OIS CMPN Curncy" for c in codes],
+            "day_count": np.where(position % 3 == 0, 365.0, 360.0),
+        },
+        index=pd.Index(codes, name="currency"),
+    )
+
+
+def synthetic_dates(years, freq="B", end="2024-12-31"):
+    """Weekday timestamps covering `years` of history at `freq` (B, h, min, ...)."""
+    end = pd.Timestamp(end)
+    start = end - pd.DateOffset(years=years)
+    if freq == "B":
+        return pd.bdate_range(start, end, name="Date")
+    dates = pd.date_range(start, end, freq=freq, name="Date")
+    return dates[dates.dayofweek < 5]
+
+
+def synthetic_sheets(n_currencies=8, years=15, freq="B", seed=0, outlier_rate=1e-3):
+    """
+    Spot, forward-point and OIS sheets shaped like the workbook.
+
+    Spot follows a log random walk, OIS rates (percent) a slow random walk,
+    and the 3M forward is priced off the rate differential with a true CIP
+    basis around 20 bps. A fraction `outlier_rate` of the forward points is
+    corrupted, so the outlier filter has work to do.
+
+    Returns
+    -------
+    exchange_rates, forward_rates, interest_rates : pandas.DataFrame
+        Sheets as passed to normalize_sheets (OIS ends with USD).
+    universe : pandas.DataFrame
+    """
+    rng = np.random.default_rng(seed)
+    universe = synthetic_universe(n_currencies)
+    dates = synthetic_dates(years, freq)
+    n, k = len(dates), n_currencies
+    # Volatilities are per business day; scale to the sampling step
+    step = np.sqrt(max(years * 261 / max(n, 1), 1e-6))
+
+    level = np.exp(rng.normal(0.0, 1.5, size=k))
+    spot = level * np.exp(np.cumsum(rng.normal(0.0, 0.006 * step, size=(n, k)), axis=0))
+    ois = 2.0 + np.cumsum(rng.normal(0.0, 0.01 * step, size=(n, k + 1)), axis=0)
+    basis = 20.0 + rng.normal(0.0, 5.0, size=(n, k))
+
+    # log(F/S) = (i_foreign - i_usd - basis) x 90/360, see cip_engine
+    forward = spot * np.exp(((ois[:, :k] - ois[:, [k]]) / 100.0 - basis / 1e4) / cip_engine.TENOR_FACTOR_3M)
+
+    # Quote USD-per-unit pairs the other way round, then convert to points
+    flip = universe["usd_per_unit"].to_numpy()
+    spot[:, flip] = 1.0 / spot[:, flip]
+    forward[:, flip] = 1.0 / forward[:, flip]
+    points = (forward - spot) * universe["forward_scale"].to_numpy()
+
+    corrupt = rng.random(size=(n, k)) < outlier_rate
+    points[corrupt] *= 50.0
+
+    exchange_rates = pd.DataFrame(spot, index=dates, columns=universe["spot_ticker"])
+    forward_rates = pd.DataFrame(points, index=dates, columns=universe["forward_ticker"])
+    interest_rates = pd.DataFrame(ois, index=dates, columns=list(universe["ois_ticker"]) + ["USDOIS CMPN Curncy"])
+    return exchange_rates, forward_rates, interest_rates, universe
+
+
+######################################
+# Engines
+######################################
+def _numpy_basis(panel, currencies):
+    return cip_engine.compute_cip_basis(panel, currencies)
+
+
+def _polars_basis(panel, currencies):
+    try:
+        import polars_backend
+    except ModuleNotFoundError:
+        import src.polars_backend as polars_backend
+
+    return polars_backend.spreads_to_pandas(polars_backend.basis_query(panel, currencies).collect())
+
+
+# Engine name -> function(panel, currencies) returning the CIP_<CCY>_ln frame
+ENGINES = {
+    "numpy": _numpy_basis,
+    "polars": _polars_basis,
+}
+
+
+######################################
+# Running cases
+######################################
+def _best_of(name, repeat, func, rows):
+    """Run `func` `repeat` times inside a stage; keep the fastest record."""
+    best, result = None, None
+    for _ in range(repeat):
+        instrumentation.reset_trace()
+        with instrumentation.stage(name, rows=rows):
+            result = func()
+        record = instrumentation.get_trace()[-1]
+        if best is None or record["wall_s"] < best["wall_s"]:
+            best = record
+    return best, result
+
+
+def run_case(n_currencies, years, freq="B", engine="numpy", repeat=3, stages=STAGES, seed=0):
+    """
+    Time the pipeline stages on one synthetic panel.
+
+    Parameters
+    ----------
+    n_currencies : int
+    years : int
+    freq : str, optional
+        Sampling frequency of the panel ("B", "h", "min", ...).
+    engine : str, optional
+        Key of ENGINES used for the ``cip`` stage.
+    repeat : int, optional
+        Runs per stage; the fastest one is kept.
+    stages : sequence of str, optional
+        Subset of STAGES to time; later stages reuse earlier outputs.
+    seed : int, optional
+
+    Returns
+    -------
+    list of dict
+        One record per stage with the case parameters, wall and CPU
+        seconds, rows and memory figures (see instrumentation).
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine: {engine!r}")
+    exchange_rates, forward_rates, interest_rates, universe = synthetic_sheets(n_currencies, years, freq, seed)
+    currencies = list(universe.index)
+    rows = len(exchange_rates)
+    case = {"engine": engine, "currencies": n_currencies, "years": years, "freq": freq, "rows": rows}
+
+    was_enabled = instrumentation.is_enabled()
+    instrumentation.enable()
+    try:
+        records = []
+
+        def timed(name, func):
+            record, result = _best_of(name, repeat, func, rows)
+            if name in stages:
+                records.append({**case, **record, "stage": name})
+            return result
+
+        panel = timed("ingest", lambda: pull_bloomberg_cip_data.normalize_sheets(
+            exchange_rates, forward_rates, interest_rates, universe))
+        spreads = timed("cip", lambda: ENGINES[engine](panel, currencies))
+        if {"outlier_filter", "stats", "render"} & set(stages):
+            spreads = timed("outlier_filter", lambda: outlier_filter.filter_outliers(spreads)[0])
+        if "stats" in stages:
+            timed("stats", lambda: cip_analysis.compute_cip_statistics(spreads))
+        if "render" in stages:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                timed("render", lambda: _render(spreads, tmp_dir))
+    finally:
+        instrumentation.enable(was_enabled)
+        instrumentation.reset_trace()
+    return records
+
+
+def _render(spreads, output_dir):
+    from matplotlib import pyplot as plt
+
+    fig = pull_bloomberg_cip_data.plot_spreads(spreads, "benchmark", output_dir=output_dir, formats=("png",), dpi=100)
+    plt.close(fig)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(cases, engine="numpy", repeat=3, stages=STAGES, results_dir=None, label=None):
+    """
+    Run several cases and append their records to the results file.
+
+    Parameters
+    ----------
+    cases : list of tuple
+        ``(currencies, years, freq)`` triples, e.g. PRESETS["default"].
+    engine, repeat, stages
+        See run_case.
+    results_dir : str or Path, optional
+        Defaults to OUTPUT_DIR/benchmarks.
+    label : str, optional
+        Free-form tag stored with the run.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The records of this run.
+    """
+    run = {
+        "run_id": datetime.datetime.now().strftime("%Y%m%dT%H%M%S"),
+        "label": label,
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.node(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+    records = []
+    for n_currencies, years, freq in cases:
+        started = time.perf_counter()
+        case_records = run_case(n_currencies, years, freq, engine=engine, repeat=repeat, stages=stages)
+        print(f"{engine}: {n_currencies} currencies x {years}y @ {freq} "
+              f"({case_records[0]['rows'] if case_records else 0} rows) in {time.perf_counter() - started:.1f}s")
+        records.extend({**run, **record} for record in case_records)
+
+    results_dir = Path(results_dir or BENCHMARK_DIR)
+    results_dir.mkdir(parents=True, exist_ok=True)
+    with open(results_dir / RESULTS_FILE, "a") as f:
+        for record in records:
+            f.write(json.dumps(record, default=str) + "\n")
+    return pd.DataFrame(records)
+
+
+def load_results(results_dir=None):
+    """All stored benchmark records as a DataFrame (empty if none)."""
+    path = Path(results_dir or BENCHMARK_DIR) / RESULTS_FILE
+    if not path.exists():
+        return pd.DataFrame()
+    return pd.read_json(path, lines=True, dtype={"run_id": str, "commit": str})
+
+
+CASE_KEYS = ["currencies", "years", "freq", "stage"]
+
+
+def compare_results(current, baseline, tolerance=0.25):
+    """
+    Compare the wall times of two sets of benchmark records.
+
+    Cases are matched on currencies, years, frequency and stage, so two
+    engines or two commits can be compared.
+
+    Parameters
+    ----------
+    current, baseline : pandas.DataFrame
+        Records as returned by run_benchmarks / load_results.
+    tolerance : float, optional
+        Relative slowdown above which a stage is flagged.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per matched case with both wall times, their ratio and a
+        ``slower`` flag.
+    """
+    columns = CASE_KEYS + ["wall_s"]
+    merged = current[columns].merge(baseline[columns], on=CASE_KEYS, suffixes=("", "_baseline"))
+    merged["ratio"] = merged["wall_s"] / merged["wall_s_baseline"]
+    merged["slower"] = merged["ratio"] > 1.0 + tolerance
+    return merged.set_index(CASE_KEYS)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="quick")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="numpy")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--label", default=None)
+    parser.add_argument("--results-dir", default=None)
+    parser.add_argument("--compare", nargs="?", const="previous", default=None, metavar="RUN_ID",
+                        help="compare with a stored run (default: the previous run of the engine)")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    history = load_results(args.results_dir)
+    current = run_benchmarks(PRESETS[args.preset], engine=args.engine, repeat=args.repeat,
+                             stages=args.stages, results_dir=args.results_dir, label=args.label)
+    with pd.option_context("display.width", 120, "display.float_format", "{:.4f}".format):
+        print(current.set_index(CASE_KEYS)[["rows", "wall_s", "cpu_s", "peak_rss"]])
+
+        if args.compare and not history.empty:
+            if args.compare == "previous":
+                history = history[history["engine"] == args.engine]
+                baseline = history[history["run_id"] == history["run_id"].max()]
+            else:
+                baseline = history[history["run_id"] == args.compare]
+            comparison = compare_results(current, baseline, args.tolerance)
+            print(comparison)
+            if comparison["slower"].any():
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+"""
+Local per-ticker store for Bloomberg history.
+
+Each ticker's PX_LAST history lives in its own Parquet file under
+DATA_DIR/bloomberg, and coverage.json records which date ranges have
+already been requested for it (a requested range with no prints, e.g. a
+holiday, still counts as covered). A pull then only asks the terminal for
+the ranges that are missing, merges them in and reads everything else from
+disk. Tickers with the same gaps share one request.
+"""
+import json
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+try:
+    from settings import config
+except ModuleNotFoundError:
+    from src.settings import config
+
+
+STORE_DIR = Path(config("DATA_DIR")) / "bloomberg"
+COVERAGE_FILE = "coverage.json"
+ONE_DAY = pd.Timedelta(days=1)
+
+
+def _ticker_path(store_dir, ticker):
+    safe = "".join(c if c.isalnum() else "_" for c in ticker)
+    return Path(store_dir) / f"{safe}.parquet"
+
+
+def read_coverage(store_dir=None):
+    """Return {ticker: [(start, end), ...]} of requested ranges, as Timestamps."""
+    path = Path(store_dir or STORE_DIR) / COVERAGE_FILE
+    if not path.exists():
+        return {}
+    with open(path, "r") as f:
+        raw = json.load(f)
+    return {
+        ticker: [(pd.Timestamp(a), pd.Timestamp(b)) for a, b in ranges]
+        for ticker, ranges in raw.items()
+    }
+
+
+def _write_coverage(store_dir, coverage):
+    path = Path(store_dir) / COVERAGE_FILE
+    raw = {
+        ticker: [[a.strftime("%Y-%m-%d"), b.strftime("%Y-%m-%d")] for a, b in ranges]
+        for ticker, ranges in sorted(coverage.items())
+    }
+    tmp_path = path.with_suffix(".json.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(raw, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def merge_ranges(ranges):
+    """
+    Merge overlapping or adjacent (start, end) date ranges.
+
+    Examples
+    --------
+    >>> merge_ranges([(pd.Timestamp("2020-01-01"), pd.Timestamp("2020-01-31")),
+    ...               (pd.Timestamp("2020-02-01"), pd.Timestamp("2020-02-29"))])
+    [(Timestamp('2020-01-01 00:00:00'), Timestamp('2020-02-29 00:00:00'))]
+    """
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + ONE_DAY:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def missing_ranges(covered, start, end):
+    """Return the sub-ranges of [start, end] not contained in `covered`."""
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    gaps = []
+    cursor = start
+    for a, b in merge_ranges(covered):
+        if b < cursor or a > end:
+            continue
+        if a > cursor:
+            gaps.append((cursor, min(a - ONE_DAY, end)))
+        cursor = max(cursor, b + ONE_DAY)
+        if cursor > end:
+            break
+    if cursor <= end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+def read_ticker(ticker, store_dir=None):
+    """Stored history of one ticker as a Series (empty if never pulled)."""
+    path = _ticker_path(store_dir or STORE_DIR, ticker)
+    if not path.exists():
+        return pd.Series(dtype=float, name=ticker, index=pd.DatetimeIndex([], name="Date"))
+    return pd.read_parquet(path)["PX_LAST"].rename(ticker)
+
+
+def _write_ticker(store_dir, ticker, series):
+    path = _ticker_path(store_dir, ticker)
+    tmp_path = path.with_suffix(".parquet.tmp")
+    series.rename("PX_LAST").to_frame().to_parquet(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def fetch_incremental(tickers_by_group, start_date, end_date, fetch, store_dir=None):
+    """
+    Serve a pull from the local store, fetching only the missing date ranges.
+
+    Parameters
+    ----------
+    tickers_by_group : dict
+        Group name -> list of tickers.
+    start_date, end_date : str
+        'YYYY-MM-DD' bounds of the pull.
+    fetch : callable
+        ``fetch(tickers_by_group, start_date, end_date) -> dict`` of
+        date-indexed frames with one column per ticker, e.g.
+        pull_bloomberg_cip_data.fetch_bloomberg_history with a client bound.
+    store_dir : str or Path, optional
+        Defaults to DATA_DIR/bloomberg.
+
+    Returns
+    -------
+    dict
+        Group name -> frame over [start_date, end_date], columns in ticker order.
+    """
+    store_dir = Path(store_dir or STORE_DIR)
+    store_dir.mkdir(parents=True, exist_ok=True)
+    start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+
+    # Today's print can still change, so today is never marked as covered
+    coverage_end = min(end, pd.Timestamp.today().normalize() - ONE_DAY)
+
+    coverage = read_coverage(store_dir)
+    all_tickers = list(dict.fromkeys(t for tickers in tickers_by_group.values() for t in tickers))
+
+    # Tickers with identical gaps are requested together
+    requests_by_gaps = {}
+    for ticker in all_tickers:
+        gaps = tuple(missing_ranges(coverage.get(ticker, []), start, end))
+        if gaps:
+            requests_by_gaps.setdefault(gaps, []).append(ticker)
+
+    for gaps, tickers in requests_by_gaps.items():
+        for gap_start, gap_end in gaps:
+            fetched = fetch(
+                {"missing": tickers},
+                gap_start.strftime("%Y-%m-%d"),
+                gap_end.strftime("%Y-%m-%d"),
+            )["missing"]
+            for ticker in tickers:
+                new = fetched[ticker].dropna() if ticker in fetched else pd.Series(dtype=float)
+                old = read_ticker(ticker, store_dir)
+                merged = pd.concat([old, new]).sort_index()
+                merged = merged[~merged.index.duplicated(keep="last")]
+                _write_ticker(store_dir, ticker, merged)
+                if gap_start <= coverage_end:
+                    coverage[ticker] = merge_ranges(
+                        coverage.get(ticker, []) + [(gap_start, min(gap_end, coverage_end))]
+                    )
+        _write_coverage(store_dir, coverage)
+
+    results = {}
+    for group, tickers in tickers_by_group.items():
+        frame = pd.concat([read_ticker(t, store_dir) for t in tickers], axis=1).sort_index()
+        frame.index.name = "Date"
+        results[group] = frame.loc[start:end].reindex(columns=tickers)
+    return results
+
+
+def coverage_report(store_dir=None):
+    """
+    Summarize the local store, one row per ticker.
+
+    Columns are the first and last covered dates, the number of stored
+    observations and the gaps between covered ranges, so holes in the
+    history are visible at a glance.
+    """
+    store_dir = Path(store_dir or STORE_DIR)
+    rows = []
+    for ticker, ranges in read_coverage(store_dir).items():
+        ranges = merge_ranges(ranges)
+        rows.append({
+            "ticker": ticker,
+            "first": ranges[0][0],
+            "last": ranges[-1][1],
+            "observations": len(read_ticker(ticker, store_dir)),
+            "gaps": missing_ranges(ranges, ranges[0][0], ranges[-1][1]),
+        })
+    return pd.DataFrame(rows, columns=["ticker", "first", "last", "observations", "gaps"]).set_index("ticker")
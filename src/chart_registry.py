@@ -0,0 +1,227 @@
+"""
+Registry of the project's charts, rendered in parallel with a content-hash cache.
+
+Each chart is registered with a function that builds its input data, a
+renderer and the style parameters passed to the renderer. Before rendering,
+the input data, the style and the renderer name are hashed; if the hash
+matches the one recorded next to the chart's files in
+OUTPUT_DIR/charts/manifest.json and all files still exist, the chart is
+skipped. Everything else is drawn in worker processes, so an incremental
+run only redraws the charts whose inputs changed.
+"""
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+try:
+    from settings import config
+    import instrumentation
+except ModuleNotFoundError:
+    from src.settings import config
+    import src.instrumentation as instrumentation
+
+
+CHART_DIR = Path(config("OUTPUT_DIR")) / "charts"
+MANIFEST_FILE = "manifest.json"
+
+# Bump when the renderers change in a way the style parameters do not capture
+CHART_VERSION = 1
+
+CHARTS = {}
+
+
+def register_chart(name, data, renderer="spreads", formats=("pdf", "png"), **style):
+    """
+    Add a chart to the registry.
+
+    Parameters
+    ----------
+    name : str
+        Chart name; also the stem of its files.
+    data : callable
+        ``data() -> pandas.DataFrame`` with the series to draw; called in
+        the parent process.
+    renderer : str, optional
+        Key of RENDERERS.
+    formats : sequence of str, optional
+        File formats to write.
+    **style
+        Keyword arguments for the renderer; part of the cache key.
+    """
+    if renderer not in RENDERERS:
+        raise ValueError(f"Unknown chart renderer: {renderer!r}")
+    CHARTS[name] = {"data": data, "renderer": renderer, "formats": tuple(formats), "style": style}
+
+
+def chart_key(df, renderer, formats, style):
+    """Hex digest identifying a chart's input data, renderer and style."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps(
+        {
+            "version": CHART_VERSION,
+            "renderer": renderer,
+            "formats": list(formats),
+            "style": style,
+            "columns": [str(c) for c in df.columns],
+        },
+        sort_keys=True,
+        default=str,
+    ).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _chart_files(output_dir, name, formats):
+    return [str(Path(output_dir) / f"{name}.{fmt}") for fmt in formats]
+
+
+def _read_manifest(output_dir):
+    try:
+        with open(Path(output_dir) / MANIFEST_FILE, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(output_dir, manifest):
+    path = Path(output_dir) / MANIFEST_FILE
+    tmp_path = path.with_suffix(".json.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+######################################
+# Renderers (run in worker processes)
+######################################
+def _init_worker():
+    # Worker processes only write files; in this process the caller's
+    # backend (e.g. a notebook's) is left alone
+    import matplotlib
+    matplotlib.use("Agg")
+
+
+def _render_spreads(df, name, output_dir, formats, style):
+    from matplotlib import pyplot as plt
+
+    try:
+        import pull_bloomberg_cip_data
+    except ModuleNotFoundError:
+        import src.pull_bloomberg_cip_data as pull_bloomberg_cip_data
+
+    # plot_spreads names its files spread_plot_<yr>; the chart name is used
+    # as the whole stem instead
+    fig = pull_bloomberg_cip_data.plot_spreads(df, name, output_dir=output_dir, formats=(), **style)
+    for fmt in formats:
+        fig.savefig(Path(output_dir) / f"{name}.{fmt}", format=fmt, dpi=fig.dpi, bbox_inches="tight")
+    plt.close(fig)
+
+
+RENDERERS = {
+    "spreads": _render_spreads,
+}
+
+
+def _render_job(job):
+    name, renderer, df, output_dir, formats, style = job
+    RENDERERS[renderer](df, name, output_dir, formats, style)
+    return name
+
+
+def render_charts(names=None, output_dir=None, max_workers=None, force=False):
+    """
+    Render registered charts whose inputs changed since the last run.
+
+    Parameters
+    ----------
+    names : list of str, optional
+        Charts to consider; all registered charts by default.
+    output_dir : str or Path, optional
+        Defaults to OUTPUT_DIR/charts.
+    max_workers : int, optional
+        Worker processes; 1 renders in this process.
+    force : bool, optional
+        Redraw even when the cache is current.
+
+    Returns
+    -------
+    dict
+        Chart name -> "rendered" or "cached".
+    """
+    output_dir = Path(output_dir or CHART_DIR)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    names = list(CHARTS) if names is None else list(names)
+    manifest = _read_manifest(output_dir)
+
+    status, jobs, keys = {}, [], {}
+    for name in names:
+        chart = CHARTS[name]
+        df = chart["data"]()
+        key = chart_key(df, chart["renderer"], chart["formats"], chart["style"])
+        files = _chart_files(output_dir, name, chart["formats"])
+        cached = manifest.get(name, {})
+        if not force and cached.get("key") == key and all(os.path.exists(f) for f in files):
+            status[name] = "cached"
+            continue
+        keys[name] = key
+        jobs.append((name, chart["renderer"], df, str(output_dir), chart["formats"], chart["style"]))
+
+    if max_workers is None:
+        max_workers = min(len(jobs), os.cpu_count() or 1)
+    with instrumentation.stage("render_charts", rows=len(jobs)):
+        if max_workers <= 1 or len(jobs) <= 1:
+            done = [_render_job(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker) as pool:
+                done = list(pool.map(_render_job, jobs))
+
+    for name in done:
+        manifest[name] = {"key": keys[name], "files": _chart_files(output_dir, name, CHARTS[name]["formats"])}
+        status[name] = "rendered"
+    _write_manifest(output_dir, manifest)
+    return status
+
+
+######################################
+# Project charts
+######################################
+def _spreads_through(end):
+    """Data function for the cleaned spreads up to `end`, short column names."""
+    def data():
+        try:
+            import pull_bloomberg_cip_data
+        except ModuleNotFoundError:
+            import src.pull_bloomberg_cip_data as pull_bloomberg_cip_data
+
+        spreads = pull_bloomberg_cip_data.compute_cip(end=end)
+        spreads.columns = [c[4:7] for c in spreads.columns]  # e.g., CIP_AUD_ln -> AUD
+        return spreads
+    return data
+
+
+def _currency_spread(ccy, end):
+    def data():
+        return _spreads_through(end)()[[ccy]]
+    return data
+
+
+def register_currency_panels(currencies=None, end=None, **style):
+    """Register one spread chart per currency, named spread_<CCY>."""
+    try:
+        import currency_universe
+    except ModuleNotFoundError:
+        import src.currency_universe as currency_universe
+
+    for ccy in currencies or currency_universe.currencies():
+        register_chart(f"spread_{ccy}", _currency_spread(ccy, end), **style)
+
+
+register_chart("spread_plot_rep", _spreads_through("2020-01-01"))
+register_chart("spread_plot_2025", _spreads_through("2025-01-01"))
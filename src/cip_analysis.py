@@ -12,36 +12,77 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 try:
     from src.pull_bloomberg_cip_data import *
+    import src.stats_accumulator as stats_accumulator
+    import src.instrumentation as instrumentation
 except ModuleNotFoundError:
     from pull_bloomberg_cip_data import *
+    import stats_accumulator
+    import instrumentation
 
+try:
+    from settings import config
+except ModuleNotFoundError:
+    from src.settings import config
 
+OUTPUT_DIR = config("OUTPUT_DIR")
 
 
-from settings import config
+def compute_cip_statistics(cip_data, accumulator=None):
+    """
+    Compute CIP statistics from CIP data.
 
-OUTPUT_DIR = config("OUTPUT_DIR")
+    All three tables come from one pass over the panel with a
+    stats_accumulator.StatsAccumulator; `cip_data` itself is not modified.
 
+    Parameters
+    ----------
+    cip_data : pandas.DataFrame
+        Date-indexed panel with CIP_<CCY>_ln columns.
+    accumulator : stats_accumulator.StatsAccumulator, optional
+        State built from earlier rows; `cip_data` is then only the new rows
+        and is folded into it (in place).
 
-def compute_cip_statistics(cip_data):
-    """Compute CIP statistics from CIP data."""
+    Returns
+    -------
+    dict
+        ``overall_statistics`` (describe layout), ``correlation_matrix`` and
+        ``annual_statistics`` (mean, std, min, max per calendar year).
+    """
     if cip_data is None or cip_data.empty:
         raise ValueError("Error: cip_data is empty or None. Check if compute_cip() is working correctly.")
 
-    stats_dict = {}
     cip_columns = [col for col in cip_data.columns if col.startswith('CIP_') and col.endswith('_ln')]
-    cip_df = cip_data[cip_columns]
-
-    if cip_df.empty:
+    if not cip_columns:
         raise ValueError("Error: cip_df is empty after filtering CIP columns.")
 
-    stats_dict["overall_statistics"] = cip_df.describe()
-    stats_dict["correlation_matrix"] = cip_df.corr()
-    cip_data.index = pd.to_datetime(cip_data.index)
-    stats_dict["annual_statistics"] = cip_df.resample('YE').agg(['mean', 'std', 'min', 'max'])
-
-    return stats_dict
-
+    with instrumentation.stage("stats", rows=len(cip_data)):
+        cip_df = cip_data[cip_columns].set_axis(pd.to_datetime(cip_data.index), axis=0)
+        fresh = accumulator is None
+        if fresh:
+            accumulator = stats_accumulator.StatsAccumulator(cip_columns)
+        accumulator.update(cip_df)
+
+        total = accumulator.total()
+        if fresh and config("CIP_BACKEND") == "polars":
+            # All rows are in cip_df, so the annual table can be one polars query
+            annual = _polars_annual_statistics(cip_df, cip_data.index.name)
+        else:
+            annual = accumulator.annual(index_name=cip_data.index.name)
+        return {
+            "overall_statistics": accumulator.describe(total),
+            "correlation_matrix": accumulator.correlation(total),
+            "annual_statistics": annual,
+        }
+
+
+def _polars_annual_statistics(cip_df, index_name):
+    try:
+        import src.polars_backend as polars_backend
+    except ModuleNotFoundError:
+        import polars_backend
+
+    annual = polars_backend.annual_query(cip_df.rename_axis(polars_backend.DATE)).collect()
+    return polars_backend.annual_to_pandas(annual, index_name=index_name)
 
 
 def display_cip_summary(stats_dict):
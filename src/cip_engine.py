@@ -0,0 +1,192 @@
+"""
+Vectorized CIP basis engine.
+
+Spot, forward and OIS data are held as aligned 2-D NumPy blocks
+(date x currency) and the whole basis matrix is computed in one broadcast,
+instead of looping over currencies one column pair at a time.
+"""
+import numpy as np
+import pandas as pd
+
+try:
+    import currency_universe
+except ModuleNotFoundError:
+    import src.currency_universe as currency_universe
+
+
+# List of all the core currencies, from the currency universe table
+CURRENCIES = currency_universe.currencies()
+
+# 3M forward, quoted on an ACT/360 basis
+TENOR_FACTOR_3M = 360.0 / 90.0
+
+
+def _block(df, cols):
+    """
+    Return the columns `cols` of `df` as a 2-D float array.
+
+    When the columns sit next to each other in a single-dtype frame (as they
+    do in the panel returned by load_panel) this is a view, not a copy.
+    """
+    idx = df.columns.get_indexer(cols)
+    if (idx < 0).any():
+        missing = [c for c, i in zip(cols, idx) if i < 0]
+        raise KeyError(f"Missing columns in panel: {missing}")
+    if len(idx) > 1 and (np.diff(idx) == 1).all():
+        return df.iloc[:, idx[0]:idx[-1] + 1].to_numpy(dtype=float, copy=False)
+    return df.iloc[:, idx].to_numpy(dtype=float)
+
+
+def panel_blocks(df_merged, currencies=CURRENCIES):
+    """
+    Split a merged panel into aligned spot, forward and OIS blocks.
+
+    Parameters
+    ----------
+    df_merged : pandas.DataFrame
+        Panel with <CCY>_CURNCY, <CCY>_CURNCY3M, <CCY>_IR and USD_IR columns.
+    currencies : list of str, optional
+        Currencies to extract, in column order.
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        ``(spot, forward, ois, usd_ir)``; the first three are (dates x
+        currencies), `usd_ir` is 1-D.
+    """
+    spot = _block(df_merged, [f'{ccy}_CURNCY' for ccy in currencies])
+    forward = _block(df_merged, [f'{ccy}_CURNCY3M' for ccy in currencies])
+    ois = _block(df_merged, [f'{ccy}_IR' for ccy in currencies])
+    usd_ir = df_merged['USD_IR'].to_numpy(dtype=float)
+    return spot, forward, ois, usd_ir
+
+
+def cip_basis_matrix(spot, forward, ois, usd_ir, tenor_factor=TENOR_FACTOR_3M):
+    """
+    Compute the log CIP basis (bps) for every date and currency at once.
+
+        CIP = 100*100 x [ domestic_i - (logF - logS)*(360/90) - foreign_i ]
+
+    with the USD rate broadcast across the currency columns. Only one output
+    matrix and one rate-differential temporary are allocated.
+
+    Parameters
+    ----------
+    spot, forward, ois : numpy.ndarray
+        (dates x currencies) blocks; rates in percent.
+    usd_ir : numpy.ndarray
+        1-D USD rate in percent, one value per date.
+    tenor_factor : float, optional
+        Annualization factor of the forward tenor (360/90 for 3M).
+
+    Returns
+    -------
+    numpy.ndarray
+        (dates x currencies) basis in basis points.
+    """
+    basis = np.divide(forward, spot)
+    np.log(basis, out=basis)
+    basis *= -tenor_factor
+
+    rate_diff = np.subtract(ois, np.asarray(usd_ir)[:, None])
+    rate_diff /= 100.0
+    basis += rate_diff
+    basis *= 100 * 100
+    return basis
+
+
+def compute_cip_basis(df_merged, currencies=CURRENCIES, tenor_factor=TENOR_FACTOR_3M):
+    """
+    Compute the CIP basis for a merged panel as a DataFrame.
+
+    The returned frame wraps the basis matrix directly (no extra copy) and
+    has one CIP_<CCY>_ln column per currency.
+
+    Parameters
+    ----------
+    df_merged : pandas.DataFrame
+        Panel as returned by load_raw.
+    currencies : list of str, optional
+        Currencies to compute, in column order.
+    tenor_factor : float, optional
+        Annualization factor of the forward tenor (360/90 for 3M).
+
+    Returns
+    -------
+    pandas.DataFrame
+    """
+    spot, forward, ois, usd_ir = panel_blocks(df_merged, currencies)
+    basis = cip_basis_matrix(spot, forward, ois, usd_ir, tenor_factor)
+    return pd.DataFrame(
+        basis,
+        index=df_merged.index,
+        columns=[f'CIP_{ccy}_ln' for ccy in currencies],
+        copy=False,
+    )
+
+
+def year_fractions(dates, tenors, day_count):
+    """
+    Accrual year fraction of each tenor, per trade date and currency.
+
+    The tenor end date is the trade date plus the calendar tenor (1W, 1M,
+    3M, 6M, 1Y); the actual number of days is divided by each currency's
+    day-count basis (360 for ACT/360, 365 for ACT/365).
+
+    Parameters
+    ----------
+    dates : pandas.DatetimeIndex
+    tenors : list of str
+        Keys of currency_universe.TENOR_OFFSETS.
+    day_count : array-like
+        One basis per currency.
+
+    Returns
+    -------
+    numpy.ndarray
+        Shape (dates, currencies, tenors).
+    """
+    dates = pd.DatetimeIndex(dates)
+    days = np.column_stack([
+        ((dates + currency_universe.TENOR_OFFSETS[tenor]) - dates).days.to_numpy(dtype=float)
+        for tenor in tenors
+    ]).reshape(len(dates), len(tenors))
+    day_count = np.asarray(day_count, dtype=float)
+    return days[:, None, :] / day_count[None, :, None]
+
+
+def cip_term_structure(spot, forward, ois, usd_ois, year_fraction):
+    """
+    Compute the CIP basis (bps) for every date, currency and tenor at once.
+
+        CIP = 100*100 x [ domestic_i - (logF - logS) / yf - foreign_i ]
+
+    For the 3M tenor with yf = 90/360 this is the same formula as
+    cip_basis_matrix.
+
+    Parameters
+    ----------
+    spot : numpy.ndarray
+        (dates x currencies) spot rates.
+    forward, ois : numpy.ndarray
+        (dates x currencies x tenors) outright forwards and OIS rates (percent).
+    usd_ois : numpy.ndarray
+        (dates x tenors) USD OIS rates (percent).
+    year_fraction : numpy.ndarray
+        Broadcastable to (dates x currencies x tenors), e.g. from year_fractions.
+
+    Returns
+    -------
+    numpy.ndarray
+        (dates x currencies x tenors) basis in basis points.
+    """
+    basis = np.divide(forward, spot[:, :, None])
+    np.log(basis, out=basis)
+    basis /= year_fraction
+    np.negative(basis, out=basis)
+
+    rate_diff = np.subtract(ois, np.asarray(usd_ois)[:, None, :])
+    rate_diff /= 100.0
+    basis += rate_diff
+    basis *= 100 * 100
+    return basis
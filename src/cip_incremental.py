@@ -0,0 +1,259 @@
+"""
+Incremental daily-append mode for the CIP pipeline.
+
+`build_store` computes the basis and outlier flags once over the full
+history and saves them, together with the 45-day window state of the
+outlier filter, next to the cached panel in CACHE_DIR. `append_rows` then
+takes new Spot / Forward / OIS rows, computes the basis for those rows only,
+pushes them through the saved filter state and adds them, with their
+normalized panel rows, to a small Parquet part, so a nightly update costs
+O(new rows) instead of O(full history). Appends go into the last part until
+it holds PART_ROWS rows, so the number of files stays small.
+
+The store is tied to the data source it was built from (see
+pull_bloomberg_cip_data._panel_source) and is rebuilt when the workbook
+changes. load_panel, load_raw and compute_cip serve the appended rows after
+the history of that source (see tail_version and load_tail).
+"""
+import json
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+try:
+    from settings import config
+    import cip_engine
+    import outlier_filter
+    import pull_bloomberg_cip_data
+except ModuleNotFoundError:
+    from src.settings import config
+    import src.cip_engine as cip_engine
+    import src.outlier_filter as outlier_filter
+    import src.pull_bloomberg_cip_data as pull_bloomberg_cip_data
+
+
+STORE_DIR = Path(config("CACHE_DIR")) / "cip_incremental"
+STATE_FILE = "state.json"
+
+# Rows an appended part may hold before a new part is started
+PART_ROWS = 256
+
+
+def _canonical(source):
+    # Tuples and lists compare equal once they have been through JSON
+    return json.loads(json.dumps(source, default=str))
+
+
+def _part_path(store_dir, part):
+    return Path(store_dir) / f"part-{part:05d}.parquet"
+
+
+def _write_part(store_dir, part, basis, outlier_mask, panel=None):
+    frame = basis.copy() if panel is None else pd.concat([panel, basis], axis=1)
+    for col in outlier_mask.columns:
+        frame[f"{col}_outlier"] = outlier_mask[col].to_numpy()
+    path = _part_path(store_dir, part)
+    tmp_path = path.with_suffix(".parquet.tmp")
+    frame.to_parquet(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _read_state(store_dir):
+    path = Path(store_dir) / STATE_FILE
+    if not path.exists():
+        raise FileNotFoundError(
+            f"No incremental CIP store in {store_dir}; call build_store() first."
+        )
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def _stored_rows(store_dir, state, parts, columns=None):
+    """Rows of `parts` up to the last committed date (drops rows of an interrupted append)."""
+    frames = [pd.read_parquet(_part_path(store_dir, part), columns=columns) for part in parts]
+    return pd.concat(frames).loc[:pd.Timestamp(state["last_date"])]
+
+
+def _write_state(store_dir, state):
+    path = Path(store_dir) / STATE_FILE
+    tmp_path = path.with_suffix(".json.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def build_store(df_merged=None, store_dir=None, currencies=cip_engine.CURRENCIES):
+    """
+    (Re)build the incremental store from a full-history panel.
+
+    Parameters
+    ----------
+    df_merged : pandas.DataFrame, optional
+        Normalized panel; defaults to the full history of the current data
+        source, and the store is then tied to that source.
+    store_dir : str or Path, optional
+        Defaults to CACHE_DIR/cip_incremental.
+    currencies : list of str, optional
+
+    Returns
+    -------
+    Path
+        The store directory.
+    """
+    store_dir = Path(store_dir) if store_dir is not None else STORE_DIR
+    source = None
+    if df_merged is None:
+        source = pull_bloomberg_cip_data._panel_source()
+        df_merged = pull_bloomberg_cip_data._full_panel(*source)
+
+    basis = cip_engine.compute_cip_basis(df_merged, currencies)
+    _, outlier_mask = outlier_filter.filter_outliers(basis)
+    panel_filter = outlier_filter.PanelOutlierFilter.from_history(basis)
+
+    store_dir.mkdir(parents=True, exist_ok=True)
+    for old_part in store_dir.glob("part-*.parquet"):
+        old_part.unlink()
+    _write_part(store_dir, 0, basis, outlier_mask)
+    _write_state(store_dir, {
+        "source": None if source is None else _canonical(source),
+        "currencies": list(currencies),
+        "panel_columns": [str(c) for c in df_merged.columns],
+        "parts": 1,
+        "part_rows": [len(basis)],
+        "last_date": basis.index[-1].isoformat(),
+        "filter": panel_filter.to_state(),
+    })
+    return store_dir
+
+
+def _current_state(store_dir):
+    """State of the store, rebuilt first if it belongs to an older version of the source."""
+    state = _read_state(store_dir)
+    if state.get("source") is not None:
+        source = pull_bloomberg_cip_data._panel_source()
+        if state["source"] != _canonical(source):
+            build_store(store_dir=store_dir, currencies=state["currencies"])
+            state = _read_state(store_dir)
+    return state
+
+
+def append_rows(exchange_rates, forward_rates, interest_rates, store_dir=None):
+    """
+    Append new trading days to the store.
+
+    The rows use the same layout as the Spot / Forward / OIS sheets of
+    CIP_2025.xlsx (raw quotes and forward points). Dates on or before the
+    last stored date are ignored. If the store was built from another
+    version of the data source it is rebuilt first.
+
+    Returns
+    -------
+    cleaned : pandas.DataFrame
+        CIP spreads of the appended rows, with outliers set to NaN.
+    outlier_mask : pandas.DataFrame
+    """
+    store_dir = Path(store_dir) if store_dir is not None else STORE_DIR
+    state = _current_state(store_dir)
+
+    df_new = pull_bloomberg_cip_data.normalize_sheets(exchange_rates, forward_rates, interest_rates)
+    df_new = df_new.loc[df_new.index > pd.Timestamp(state["last_date"])].sort_index()
+    if df_new.empty:
+        columns = [f'CIP_{ccy}_ln' for ccy in state["currencies"]]
+        empty = pd.DataFrame(columns=columns, index=df_new.index, dtype=float)
+        return empty, empty.astype(bool)
+
+    basis = cip_engine.compute_cip_basis(df_new, state["currencies"])
+    panel_filter = outlier_filter.PanelOutlierFilter.from_state(state["filter"])
+    cleaned, outlier_mask = panel_filter.push_frame(basis)
+
+    panel = df_new[state.get("panel_columns", list(df_new.columns))]
+    # Stores written before part_rows was kept count as full
+    part_rows = state.setdefault("part_rows", [PART_ROWS] * state["parts"])
+    if state["parts"] > 1 and part_rows[-1] < PART_ROWS:
+        # Rewrite the last part with the new rows rather than add a file
+        previous = _stored_rows(store_dir, state, [state["parts"] - 1])
+        cip_cols = list(basis.columns)
+        mask_cols = [f"{col}_outlier" for col in cip_cols]
+        previous_mask = previous[mask_cols].set_axis(cip_cols, axis=1)
+        _write_part(
+            store_dir, state["parts"] - 1,
+            pd.concat([previous[cip_cols], basis]),
+            pd.concat([previous_mask, outlier_mask]),
+            pd.concat([previous[panel.columns], panel]),
+        )
+        part_rows[-1] = len(previous) + len(basis)
+    else:
+        # Part first, state second: a crash in between leaves an orphan part
+        # that the next append overwrites, never a state that points past the data.
+        _write_part(store_dir, state["parts"], basis, outlier_mask, panel)
+        state["parts"] += 1
+        part_rows.append(len(basis))
+    state["last_date"] = basis.index[-1].isoformat()
+    state["filter"] = panel_filter.to_state()
+    _write_state(store_dir, state)
+    return cleaned, outlier_mask
+
+
+def load_store(end=None, store_dir=None):
+    """
+    Read the stored CIP spreads.
+
+    Returns
+    -------
+    cleaned : pandas.DataFrame
+        CIP_<CCY>_ln columns with outliers set to NaN, as from compute_cip.
+    outlier_mask : pandas.DataFrame
+    """
+    store_dir = Path(store_dir) if store_dir is not None else STORE_DIR
+    state = _read_state(store_dir)
+    cleaned, outlier_mask = _spreads(store_dir, state, range(state["parts"]))
+    return cleaned.loc[:end], outlier_mask.loc[:end]
+
+
+def _spreads(store_dir, state, parts):
+    cip_cols = [f'CIP_{ccy}_ln' for ccy in state["currencies"]]
+    mask_cols = [f"{col}_outlier" for col in cip_cols]
+    frame = _stored_rows(store_dir, state, parts, cip_cols + mask_cols)
+    outlier_mask = frame[mask_cols].set_axis(cip_cols, axis=1)
+    cleaned = frame[cip_cols].mask(outlier_mask)
+    return cleaned, outlier_mask
+
+
+def tail_version(source, fingerprint, store_dir=None):
+    """
+    Last appended date of the store for this data source, or None.
+
+    None when there is no store, it belongs to another source (or version
+    of it), or nothing has been appended yet.
+    """
+    store_dir = Path(store_dir) if store_dir is not None else STORE_DIR
+    try:
+        state = _read_state(store_dir)
+    except FileNotFoundError:
+        return None
+    if state["parts"] <= 1 or state.get("source") != _canonical((source, fingerprint)):
+        return None
+    return state["last_date"]
+
+
+def load_tail(store_dir=None):
+    """
+    Rows appended after the history the store was built from.
+
+    Returns
+    -------
+    panel : pandas.DataFrame
+        Normalized panel rows, with the columns of load_panel.
+    cleaned : pandas.DataFrame
+        Their CIP spreads, outliers set to NaN.
+    """
+    store_dir = Path(store_dir) if store_dir is not None else STORE_DIR
+    state = _read_state(store_dir)
+    parts = range(1, state["parts"])
+    panel = _stored_rows(store_dir, state, parts, state["panel_columns"])
+    cleaned, _ = _spreads(store_dir, state, parts)
+    return panel, cleaned
@@ -1,5 +1,6 @@
 """
-Cleans the raw data pulled from Github and pushes it into a csv
+Cleans the raw data pulled from Github and pushes it into a csv, plus
+year-partitioned Parquet datasets of the panel and the spreads
 """
 
 # double check this works
@@ -18,9 +19,17 @@ except ModuleNotFoundError:
 
 DATA_DIR = Path(config("DATA_DIR"))  # Should point to '_data'
 
+# Year-partitioned Parquet datasets of the normalized panel and the cleaned
+# spreads, read back by date range with read_panel / read_spreads
+panel_path = pull_bloomberg_cip_data.panel_dataset_path()
+spreads_path = pull_bloomberg_cip_data.spreads_dataset_path()
+print(f"Panel dataset saved to {panel_path}")
+print(f"Spreads dataset saved to {spreads_path}")
+
 df = pull_bloomberg_cip_data.load_raw('2025-03-01')
 output_file = DATA_DIR / "tidy_data.csv"
 
-df.to_csv(output_file, index=False)
+# Keep the dates: they are the index of the panel
+df.to_csv(output_file, index=True)
 
 print(f"Cleaned data saved to {output_file}")
\ No newline at end of file
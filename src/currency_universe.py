@@ -0,0 +1,188 @@
+"""
+Currency universe table driving the fetch, normalization and CIP stages.
+
+Each row of currency_universe.csv describes one currency pair against USD:
+
+- spot_ticker / forward_ticker : Bloomberg tickers of the spot rate and the
+  3M forward points
+- forward_scale : divisor turning forward points into a rate difference
+  (10,000 for most pairs, 100 for JPY)
+- usd_per_unit : True if the pair is quoted as USD per unit of the currency
+  (EUR, GBP, AUD, NZD); those quotes are flipped to currency per USD
+- ois_ticker : Bloomberg ticker of the matching OIS rate
+- day_count : money-market day-count basis of the currency (360 or 365)
+
+The USD row only carries the USD OIS ticker. Adding a currency is a new row
+in the CSV (or a different file via the CURRENCY_UNIVERSE setting).
+
+currency_tenors.csv (CURRENCY_TENORS setting) lists the forward-point and
+OIS tickers of every currency for each tenor of the term structure.
+"""
+import os
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+try:
+    from settings import config
+except ModuleNotFoundError:
+    from src.settings import config
+
+
+UNIVERSE_FILE = Path(config("CURRENCY_UNIVERSE"))
+TENORS_FILE = Path(config("CURRENCY_TENORS"))
+USD = "USD"
+
+# Calendar length of each tenor, applied to the trade date
+TENOR_OFFSETS = {
+    "1W": pd.DateOffset(weeks=1),
+    "1M": pd.DateOffset(months=1),
+    "3M": pd.DateOffset(months=3),
+    "6M": pd.DateOffset(months=6),
+    "1Y": pd.DateOffset(years=1),
+}
+
+
+@lru_cache(maxsize=8)
+def _read_universe(path):
+    table = pd.read_csv(path, dtype={"currency": str}).set_index("currency")
+    if USD not in table.index:
+        raise ValueError(f"Currency universe {path} has no {USD} row for the USD OIS ticker.")
+    return table
+
+
+def load_universe(path=None):
+    """
+    Return the universe table (one row per non-USD currency).
+
+    Parameters
+    ----------
+    path : str or Path, optional
+        CSV to read; defaults to the CURRENCY_UNIVERSE setting.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Indexed by currency code, with columns spot_ticker, forward_ticker,
+        forward_scale, usd_per_unit and ois_ticker.
+    """
+    table = _read_universe(str(path or UNIVERSE_FILE))
+    universe = table.drop(index=USD).copy()
+    universe["forward_scale"] = universe["forward_scale"].astype(float)
+    universe["usd_per_unit"] = universe["usd_per_unit"].astype(bool)
+    universe["day_count"] = universe["day_count"].astype(float)
+    return universe
+
+
+@lru_cache(maxsize=8)
+def _read_tenors(path):
+    return pd.read_csv(path, dtype={"currency": str, "tenor": str})
+
+
+def load_tenors(path=None, tenors=None):
+    """
+    Return the tenor table, optionally restricted to `tenors`.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per (currency, tenor), with forward_ticker (empty for USD)
+        and ois_ticker; rows are ordered by tenor length.
+    """
+    table = _read_tenors(str(path or TENORS_FILE)).copy()
+    unknown = set(table["tenor"]) - set(TENOR_OFFSETS)
+    if unknown:
+        raise ValueError(f"Unknown tenors in {path or TENORS_FILE}: {sorted(unknown)}")
+    order = {tenor: i for i, tenor in enumerate(TENOR_OFFSETS)}
+    if tenors is not None:
+        table = table[table["tenor"].isin(tenors)]
+    return table.sort_values("tenor", key=lambda t: t.map(order), kind="stable")
+
+
+def tenors(table=None):
+    """Tenors present in the tenor table, shortest first."""
+    table = table if table is not None else load_tenors()
+    return list(dict.fromkeys(table["tenor"]))
+
+
+def usd_ois_ticker(path=None):
+    """Bloomberg ticker of the USD OIS rate."""
+    return _read_universe(str(path or UNIVERSE_FILE)).loc[USD, "ois_ticker"]
+
+
+def currencies(universe=None):
+    """Currency codes of the universe, in table order."""
+    universe = universe if universe is not None else load_universe()
+    return list(universe.index)
+
+
+def bloomberg_tickers(universe=None, path=None):
+    """
+    Every ticker needed for the universe, for one combined bulk request.
+
+    Returns
+    -------
+    dict
+        ``{"spot": [...], "forward": [...], "ois": [...]}``; the OIS list
+        ends with the USD ticker.
+    """
+    universe = universe if universe is not None else load_universe(path)
+    return {
+        "spot": list(universe["spot_ticker"]),
+        "forward": list(universe["forward_ticker"]),
+        "ois": list(universe["ois_ticker"]) + [usd_ois_ticker(path)],
+    }
+
+
+def apply_quote_conventions(spot, forward, universe=None):
+    """
+    Normalize raw spot quotes and forward points in place.
+
+    One vectorized pass over (date x currency) blocks, with the scale and
+    quote direction of each column taken from the universe table:
+
+    1. forward points are divided by `forward_scale` and added to spot,
+       turning `forward` into outright forwards;
+    2. pairs quoted as USD per unit are flipped to currency per USD, for
+       both spot and forward.
+
+    Parameters
+    ----------
+    spot : numpy.ndarray
+        Float block of shape (dates, currencies) in universe order.
+    forward : numpy.ndarray
+        Forward points of shape (dates, currencies) or, for a term
+        structure, (dates, currencies, tenors). Both arrays are overwritten.
+    universe : pandas.DataFrame, optional
+
+    Returns
+    -------
+    spot, forward : numpy.ndarray
+        The same arrays, for chaining.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> u = load_universe().loc[["EUR", "JPY"]]
+    >>> spot = np.array([[1.25, 100.0]])
+    >>> fwd = np.array([[50.0, -25.0]])
+    >>> apply_quote_conventions(spot, fwd, u)[1].round(6).tolist()
+    [[0.796813, 99.75]]
+    """
+    universe = universe if universe is not None else load_universe()
+    # Trailing tenor axes, if any, broadcast against per-currency vectors
+    extra = (1,) * (forward.ndim - spot.ndim)
+    scale = universe["forward_scale"].to_numpy(dtype=float).reshape(-1, *extra)
+    flip = universe["usd_per_unit"].to_numpy(dtype=bool)
+
+    forward /= scale
+    forward += spot.reshape(spot.shape + extra)
+    if flip.any():
+        np.divide(1.0, forward, out=forward, where=flip.reshape(-1, *extra))
+        np.divide(1.0, spot, out=spot, where=flip)
+    return spot, forward
@@ -1,19 +1,12 @@
 """
-Converts CIP data to hmtl and png
-"""
-
-
-
+Exports the CIP statistics tables as HTML and images.
 
-import sys
+Nothing is computed at import time: pass the output of
+cip_analysis.compute_cip_statistics to export_cip_statistics, or run this
+file as a script to compute and export the statistics for one end date.
+"""
+import argparse
 import os
-import pandas as pd
-import numpy as np
-import argparse  # ✅ Fix: Handle command-line arguments
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.options import Options
 
 try:
     from settings import config
@@ -21,78 +14,123 @@ except ModuleNotFoundError:
     from src.settings import config
 
 try:
-    from cip_analysis import compute_cip_statistics
-    import cip_analysis as cip_stats
-except ModuleNotFoundError:
-    from src.cip_analysis import compute_cip_statistics
-    import src.cip_analysis as cip_stats
-
-try:
-    from pull_bloomberg_cip_data import compute_cip
-    import pull_bloomberg_cip_data as cip
+    import table_render
+    import instrumentation
 except ModuleNotFoundError:
-    from src.pull_bloomberg_cip_data import compute_cip
-    import src.pull_bloomberg_cip_data as cip
-
-
-
-
-
-cip_table_2025 = cip.compute_cip(end = '2025-01-01')
-stats_dict = cip_stats.compute_cip_statistics(cip_table_2025)
-
+    import src.table_render as table_render
+    import src.instrumentation as instrumentation
 
 
 OUTPUT_DIR = config("OUTPUT_DIR")
 
+# File stem and cell format of each table in stats_dict
+STAT_TABLES = {
+    "overall_statistics": ("cip_summary_overall", "{:.2f}"),
+    "correlation_matrix": ("cip_correlation_matrix", "{:.3f}"),
+    "annual_statistics": ("cip_annual_statistics", "{:.2f}"),
+}
+IMAGE_FORMATS = ("png", "svg", "pdf")
 
-def html_to_png(html_file, png_file):
-    """Convert an HTML file to PNG using Selenium and Chrome."""
 
-    # Set up Chrome in headless mode
-    chrome_options = Options()
-    chrome_options.add_argument("--headless")
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--window-size=1920x1080")
-
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
-
-    # Load the HTML file
-    driver.get(f"file://{html_file}")
-
-    # Take screenshot and save as PNG
-    driver.save_screenshot(png_file)
-
-    driver.quit()
-    return png_file
-
-
-
-def save_cip_statistics_as_html(stats_dict):
-    output_dir = os.path.join(OUTPUT_DIR, "html_files")
-    """Save CIP statistics as HTML files."""
+def save_cip_statistics_as_html(stats_dict, output_dir=None):
+    """Save CIP statistics as HTML files (default OUTPUT_DIR/html_files)."""
+    output_dir = output_dir or os.path.join(OUTPUT_DIR, "html_files")
     os.makedirs(output_dir, exist_ok=True)
 
-    overall_html = os.path.join(output_dir, "cip_summary_overall.html")
-    corr_html = os.path.join(output_dir, "cip_correlation_matrix.html")
-    annual_html = os.path.join(output_dir, "cip_annual_statistics.html")
-
-    stats_dict["overall_statistics"].to_html(overall_html)
-    stats_dict["correlation_matrix"].to_html(corr_html)
-    stats_dict["annual_statistics"].to_html(annual_html)
-
-    return overall_html, corr_html, annual_html
-
-
-def convert_html_to_png(html_files):
-    """Convert HTML files to PNG images."""
-
-    output_dir = os.path.join(OUTPUT_DIR, "main_cip_files")
-    for html_file in html_files:
-        png_file = os.path.join(output_dir, os.path.basename(html_file).replace(".html", ".png"))
-        html_to_png(html_file, png_file)
-
-
-html_files = save_cip_statistics_as_html(stats_dict)
-convert_html_to_png(html_files)
\ No newline at end of file
+    paths = []
+    for key, (stem, _) in STAT_TABLES.items():
+        path = os.path.join(output_dir, f"{stem}.html")
+        stats_dict[key].to_html(path)
+        paths.append(path)
+    return tuple(paths)
+
+
+def save_cip_statistics_as_images(stats_dict, output_dir=None, formats=("png",), max_workers=None):
+    """
+    Render the CIP statistics tables straight to image files.
+
+    Parameters
+    ----------
+    stats_dict : dict
+        Output of compute_cip_statistics.
+    output_dir : str or Path, optional
+        Defaults to OUTPUT_DIR/main_cip_files.
+    formats : sequence of str, optional
+        Any of "png", "svg", "pdf".
+    max_workers : int, optional
+        Worker processes for table_render.render_tables.
+
+    Returns
+    -------
+    list of Path
+    """
+    output_dir = output_dir or os.path.join(OUTPUT_DIR, "main_cip_files")
+    tables = {
+        stem: (stats_dict[key], {"float_format": float_format})
+        for key, (stem, float_format) in STAT_TABLES.items()
+    }
+    with instrumentation.stage("render_tables", rows=len(tables)):
+        return table_render.render_tables(tables, output_dir, formats=formats, max_workers=max_workers)
+
+
+def export_cip_statistics(stats_dict, formats=("html", "png"), html_dir=None, image_dir=None, max_workers=None):
+    """
+    Write every statistics table in every requested format in one call.
+
+    Parameters
+    ----------
+    stats_dict : dict
+        Precomputed output of cip_analysis.compute_cip_statistics.
+    formats : sequence of str, optional
+        Any of "html", "png", "svg", "pdf". All image formats are rendered
+        in one parallel batch.
+    html_dir, image_dir : str or Path, optional
+        Default to OUTPUT_DIR/html_files and OUTPUT_DIR/main_cip_files.
+    max_workers : int, optional
+        Worker processes for the image renders.
+
+    Returns
+    -------
+    dict
+        Format -> list of written paths.
+    """
+    missing = [key for key in STAT_TABLES if key not in stats_dict]
+    if missing:
+        raise KeyError(f"Keys {missing} not found in stats dictionary.")
+    unknown = set(formats) - {"html", *IMAGE_FORMATS}
+    if unknown:
+        raise ValueError(f"Unsupported export formats: {sorted(unknown)}")
+
+    written = {}
+    if "html" in formats:
+        written["html"] = list(save_cip_statistics_as_html(stats_dict, html_dir))
+
+    image_formats = [fmt for fmt in formats if fmt in IMAGE_FORMATS]
+    if image_formats:
+        paths = save_cip_statistics_as_images(stats_dict, image_dir, image_formats, max_workers)
+        for fmt in image_formats:
+            written[fmt] = [str(p) for p in paths if p.suffix == f".{fmt}"]
+    return written
+
+
+def main(argv=None):
+    """Compute the statistics up to --end and export them."""
+    try:
+        import cip_analysis
+        import pull_bloomberg_cip_data as cip
+    except ModuleNotFoundError:
+        import src.cip_analysis as cip_analysis
+        import src.pull_bloomberg_cip_data as cip
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--end", default="2025-01-01", help="Last date of the CIP panel.")
+    parser.add_argument("--formats", nargs="+", default=["html", "png"],
+                        choices=["html", *IMAGE_FORMATS])
+    args = parser.parse_args(argv)
+
+    stats_dict = cip_analysis.compute_cip_statistics(cip.compute_cip(end=args.end))
+    return export_cip_statistics(stats_dict, formats=args.formats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Conditional, streaming and atomic file downloads over one pooled session.
+
+`download_file` remembers the ETag, Last-Modified and SHA-256 of each
+downloaded file in a small JSON sidecar next to it. The next request is
+conditional (If-None-Match / If-Modified-Since), so unchanged data costs a
+304 round-trip. New content is streamed in chunks to a temporary file in the
+target's directory, hashed on the way, checked against the expected size and
+checksum, and only then renamed over the target; readers never see a
+half-written file.
+"""
+import hashlib
+import json
+import os
+import secrets
+from functools import lru_cache
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+CHUNK_SIZE = 1 << 20
+TIMEOUT = 60
+META_SUFFIX = ".download.json"
+
+
+@lru_cache(maxsize=1)
+def get_session():
+    """Process-wide requests session with connection pooling and retries."""
+    session = requests.Session()
+    retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                  allowed_methods=("GET", "HEAD"))
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _meta_path(target):
+    target = Path(target)
+    return target.with_name(target.name + META_SUFFIX)
+
+
+def _read_meta(target):
+    try:
+        with open(_meta_path(target), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_meta(target, meta):
+    path = _meta_path(target)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def download_file(url, target, session=None, expected_sha256=None, chunk_size=CHUNK_SIZE, timeout=TIMEOUT):
+    """
+    Download `url` to `target` unless the server reports it unchanged.
+
+    Parameters
+    ----------
+    url : str
+    target : str or Path
+    session : requests.Session, optional
+        Defaults to the shared pooled session (get_session).
+    expected_sha256 : str, optional
+        Hex digest the downloaded bytes must match.
+    chunk_size : int, optional
+        Bytes per streamed chunk.
+    timeout : float, optional
+        Connect/read timeout in seconds.
+
+    Returns
+    -------
+    dict
+        ``path``, ``status`` (HTTP status code), ``changed`` (whether the
+        target file was replaced) and ``sha256`` of the file on disk.
+
+    Raises
+    ------
+    requests.HTTPError
+        For error responses.
+    ValueError
+        If the body is truncated or fails the checksum; the existing target
+        is left untouched.
+    """
+    target = Path(target)
+    session = session or get_session()
+    meta = _read_meta(target) if target.exists() else {}
+    if meta.get("url") != url:
+        meta = {}
+
+    headers = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+
+    with session.get(url, headers=headers, stream=True, timeout=timeout) as response:
+        if response.status_code == 304:
+            return {"path": target, "status": 304, "changed": False, "sha256": meta.get("sha256")}
+        response.raise_for_status()
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        # A fresh name per download; "x" refuses to reuse an existing file and
+        # the OS applies the umask as for any new file
+        tmp_name = target.parent / f".{target.name}.{os.getpid()}.{secrets.token_hex(8)}.part"
+        try:
+            with open(tmp_name, "xb") as f:
+                try:
+                    for chunk in response.iter_content(chunk_size=chunk_size):
+                        f.write(chunk)
+                        digest.update(chunk)
+                        size += len(chunk)
+                except requests.exceptions.ChunkedEncodingError as e:
+                    raise ValueError(f"Truncated download from {url}: {e}") from e
+                f.flush()
+                os.fsync(f.fileno())
+
+            expected_size = response.headers.get("Content-Length")
+            if expected_size is not None and "Content-Encoding" not in response.headers and int(expected_size) != size:
+                raise ValueError(f"Truncated download from {url}: {size} of {expected_size} bytes")
+            sha256 = digest.hexdigest()
+            if expected_sha256 is not None and sha256 != expected_sha256.lower():
+                raise ValueError(f"Checksum mismatch for {url}: expected {expected_sha256}, got {sha256}")
+
+            # Same bytes as before (e.g. a server without validators): keep
+            # the existing file and its mtime
+            changed = not (target.exists() and meta.get("sha256") == sha256)
+            if changed:
+                os.replace(tmp_name, target)
+        finally:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
+
+        _write_meta(target, {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "sha256": sha256,
+            "size": size,
+        })
+    return {"path": target, "status": response.status_code, "changed": changed, "sha256": sha256}
@@ -0,0 +1,131 @@
+"""
+Shape-preserving downsampling of time series for plotting.
+
+A daily series drawn across a chart has more points than the chart has
+pixels. These helpers reduce a series to about one point per pixel column
+while keeping its visual shape:
+
+- `lttb_indices`: Largest-Triangle-Three-Buckets, which keeps the point of
+  each bucket forming the largest triangle with its neighbours;
+- `minmax_indices`: the first, last, minimum and maximum of each bucket,
+  so every spike survives.
+
+`downsample_series` applies either one to a date-indexed Series and keeps
+NaN gaps (e.g. removed outliers) as gaps in the result.
+"""
+import numpy as np
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Indices of the points kept by Largest-Triangle-Three-Buckets.
+
+    Parameters
+    ----------
+    x, y : numpy.ndarray
+        Finite coordinates, `x` increasing.
+    n_out : int
+        Number of points to keep (the first and last are always kept).
+
+    Returns
+    -------
+    numpy.ndarray of int
+
+    Examples
+    --------
+    >>> x = np.arange(10.0)
+    >>> lttb_indices(x, np.where(x == 4, 9.0, 0.0), 4).tolist()
+    [0, 4, 5, 9]
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # Interior points split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    kept = np.empty(n_out, dtype=int)
+    kept[0], kept[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Average of the next bucket (or the last point)
+        if i + 2 < len(edges):
+            nlo, nhi = edges[i + 1], edges[i + 2]
+            cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        else:
+            cx, cy = x[-1], y[-1]
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        kept[i + 1] = a
+    return kept
+
+
+def minmax_indices(y, n_buckets):
+    """
+    Indices of the first, minimum, maximum and last point of each bucket.
+
+    Examples
+    --------
+    >>> y = np.array([0.0, 5.0, 1.0, 2.0, 1.0, 1.0, 1.0, -3.0, 0.0, 1.0, 1.0, 1.0])
+    >>> minmax_indices(y, 2).tolist()
+    [0, 1, 5, 6, 7, 11]
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if 4 * n_buckets >= n:
+        return np.arange(n)
+
+    edges = np.linspace(0, n, n_buckets + 1).astype(int)
+    kept = []
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        bucket = y[lo:hi]
+        kept.extend([lo, lo + int(np.argmin(bucket)), lo + int(np.argmax(bucket)), hi - 1])
+    return np.unique(kept)
+
+
+def downsample_series(series, n_out, method="lttb"):
+    """
+    Reduce a date-indexed Series to about `n_out` points for plotting.
+
+    Each run of non-NaN values is downsampled on its own, with a share of
+    `n_out` proportional to its length, and runs stay separated by a NaN so
+    the plotted line still breaks where data is missing.
+
+    Parameters
+    ----------
+    series : pandas.Series
+    n_out : int
+        Target number of points, e.g. the pixel width of the axes.
+    method : {"lttb", "minmax"}, optional
+
+    Returns
+    -------
+    pandas.Series
+    """
+    if method not in ("lttb", "minmax"):
+        raise ValueError(f"Unknown downsampling method: {method!r}")
+    values = series.to_numpy(dtype=float)
+    n_valid = int(np.isfinite(values).sum())
+    if n_out >= len(values) or n_valid == 0:
+        return series
+
+    x = series.index.to_numpy(dtype="datetime64[ns]").astype(np.int64).astype(float)
+    finite = np.isfinite(values)
+    # Start and end positions of each run of finite values
+    change = np.diff(np.concatenate([[False], finite, [False]]).astype(int))
+    starts, ends = np.flatnonzero(change == 1), np.flatnonzero(change == -1)
+
+    kept = []
+    for start, end in zip(starts, ends):
+        share = max(int(round(n_out * (end - start) / n_valid)), 3)
+        if method == "lttb":
+            idx = lttb_indices(x[start:end], values[start:end], share)
+        else:
+            idx = minmax_indices(values[start:end], max(share // 4, 1))
+        kept.append(start + idx)
+        if end < len(values):
+            kept.append([end])  # first NaN after the run keeps the gap
+    return series.iloc[np.concatenate(kept)]
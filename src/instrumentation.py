@@ -0,0 +1,250 @@
+"""
+Opt-in per-stage timing and memory instrumentation.
+
+Pipeline stages (parse, normalize, merge, CIP, outlier filter, statistics,
+rendering, ...) are wrapped in `stage(...)` blocks or decorated with
+`instrumented(...)`. While instrumentation is off (the default) these are
+no-ops. When it is on (PROFILE=True in the environment/.env, or `enable()`),
+every stage appends a record with:
+
+- wall and CPU time (perf_counter / process_time),
+- resident set size before and after, and the process peak RSS so far,
+- rows processed, when the stage reports them.
+
+Nested stages are recorded with their full path, e.g.
+``load_panel/normalize/merge``. `write_trace` dumps the records of the run
+as JSON under PROFILE_DIR and `summary_table` aggregates them per stage.
+"""
+import datetime
+import functools
+import json
+import os
+import platform
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+try:
+    from settings import config
+except ModuleNotFoundError:
+    from src.settings import config
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+PROFILE_DIR = Path(config("PROFILE_DIR"))
+
+# The pipeline modules import this file as `instrumentation` or as
+# `src.instrumentation` depending on sys.path. A second copy takes over the
+# state of the first one, so a process has one switch and one trace.
+_twin = sys.modules.get("src.instrumentation" if __name__ == "instrumentation" else "instrumentation")
+if _twin is not None and hasattr(_twin, "_state"):
+    _state = _twin._state
+else:
+    _state = {"enabled": bool(config("PROFILE")), "records": [], "stack": []}
+_records = _state["records"]
+_stack = _state["stack"]
+
+
+def enable(on=True):
+    """Turn instrumentation on (or off) for this process."""
+    _state["enabled"] = bool(on)
+
+
+def is_enabled():
+    return _state["enabled"]
+
+
+def reset_trace():
+    """Drop the records collected so far."""
+    _records.clear()
+
+
+def get_trace():
+    """Records collected so far (a copy), in completion order."""
+    return [dict(r) for r in _records]
+
+
+def current_rss():
+    """Current resident set size in bytes (None where unavailable)."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def peak_rss():
+    """Peak resident set size of the process so far, in bytes."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class StageRecord(dict):
+    """Record of one stage run; set ``rows`` inside the block to report work done."""
+
+    @property
+    def rows(self):
+        return self.get("rows")
+
+    @rows.setter
+    def rows(self, value):
+        self["rows"] = None if value is None else int(value)
+
+
+@contextmanager
+def stage(name, rows=None):
+    """
+    Time a block of code as pipeline stage `name`.
+
+    Parameters
+    ----------
+    name : str
+    rows : int, optional
+        Rows processed; can also be set later through the yielded record.
+
+    Yields
+    ------
+    StageRecord
+        Filled in when the block exits (and only stored while enabled).
+
+    Examples
+    --------
+    >>> enable(); reset_trace()
+    >>> with stage("demo") as s:
+    ...     s.rows = 3
+    >>> [(r["stage"], r["rows"]) for r in get_trace()]
+    [('demo', 3)]
+    >>> enable(False)
+    """
+    record = StageRecord(rows=rows)
+    if not is_enabled():
+        yield record
+        return
+
+    _stack.append(name)
+    record["stage"] = "/".join(_stack)
+    record["rss_before"] = current_rss()
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        yield record
+    finally:
+        record["wall_s"] = time.perf_counter() - wall
+        record["cpu_s"] = time.process_time() - cpu
+        record["rss_after"] = current_rss()
+        record["peak_rss"] = peak_rss()
+        record["finished"] = datetime.datetime.now().isoformat(timespec="milliseconds")
+        _stack.pop()
+        _records.append(record)
+
+
+def instrumented(name, rows=len):
+    """
+    Decorator recording each call of a function as stage `name`.
+
+    `rows` maps the return value to a row count (``len`` by default; pass
+    None to skip). Failures to count are ignored.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not is_enabled():
+                return func(*args, **kwargs)
+            with stage(name) as record:
+                result = func(*args, **kwargs)
+                if rows is not None:
+                    try:
+                        record.rows = rows(result)
+                    except TypeError:
+                        pass
+            return result
+        return wrapper
+    return decorator
+
+
+def summary_table(records=None):
+    """
+    Aggregate stage records into one row per stage.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Indexed by stage, with calls, total wall and CPU seconds, rows,
+        the largest RSS increase and the process peak RSS (MiB).
+    """
+    records = get_trace() if records is None else records
+    columns = ["calls", "wall_s", "cpu_s", "rows", "rss_delta_mib", "peak_rss_mib"]
+    if not records:
+        return pd.DataFrame(columns=columns, index=pd.Index([], name="stage"))
+
+    df = pd.DataFrame(records)
+    mib = float(1 << 20)
+    df["rss_delta_mib"] = (df["rss_after"] - df["rss_before"]) / mib
+    df["peak_rss_mib"] = df["peak_rss"] / mib
+    summary = df.groupby("stage", sort=False).agg(
+        calls=("wall_s", "size"),
+        wall_s=("wall_s", "sum"),
+        cpu_s=("cpu_s", "sum"),
+        rows=("rows", "sum"),
+        rss_delta_mib=("rss_delta_mib", "max"),
+        peak_rss_mib=("peak_rss_mib", "max"),
+    )
+    return summary[columns]
+
+
+def write_trace(path=None, run_name="run"):
+    """
+    Write the collected records and run metadata as JSON.
+
+    Parameters
+    ----------
+    path : str or Path, optional
+        Defaults to PROFILE_DIR/<run_name>-<timestamp>.json.
+    run_name : str, optional
+
+    Returns
+    -------
+    Path
+    """
+    started = datetime.datetime.now()
+    if path is None:
+        path = PROFILE_DIR / f"{run_name}-{started.strftime('%Y%m%dT%H%M%S')}.json"
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    trace = {
+        "run": run_name,
+        "written": started.isoformat(timespec="seconds"),
+        "argv": sys.argv,
+        "pid": os.getpid(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "stages": get_trace(),
+    }
+    tmp_path = path.with_suffix(".json.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(trace, f, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+def report(run_name="run", path=None):
+    """Write the trace and print the summary table, if instrumentation is on."""
+    if not is_enabled():
+        return None
+    trace_path = write_trace(path, run_name)
+    with pd.option_context("display.width", 120, "display.float_format", "{:.3f}".format):
+        print(summary_table())
+    print(f"Trace written to {trace_path}")
+    return trace_path
@@ -4,13 +4,12 @@
 
 import numpy as np
 import pandas as pd
-import polars as pl
-from matplotlib import pyplot as plt
-import matplotlib.dates as mdates
 
-from dateutil.relativedelta import relativedelta
 import datetime
 
+# polars, matplotlib and dateutil are imported by the functions that use
+# them, so importing this module stays cheap
+
 
 ########################################################################################
 ## Pandas Helpers
@@ -162,6 +161,8 @@ def dataframe_set_difference(dff, df, library="pandas", show="rows_and_numbers")
         ret = row_numbers
 
     elif library == "polars":
+        import polars as pl
+
         # Assuming dff and df have the same schema (column names and types)
         assert dff.columns == df.columns
 
@@ -205,6 +206,8 @@ def freq_counts(df, col=None, with_count=True, with_cum_freq=True):
     ).pipe(freq_counts, col="bus_tenor_bin")
     ```
     """
+    import polars as pl
+
     s = df[col]
     ret = (
         s.value_counts(sort=True)
@@ -668,6 +671,8 @@ def get_most_recent_quarter_end(d):
 
     ```
     """
+    from dateutil.relativedelta import relativedelta
+
     quarter_month = (d.month - 1) // 3 * 3 + 1
     quarter_end = datetime.datetime(d.year, quarter_month, 1) - relativedelta(days=1)
     return quarter_end
@@ -751,6 +756,9 @@ def add_vertical_lines_to_plot(
     alpha=0.1,
     extend_to_nearest_quarter=True,
 ):
+    from matplotlib import pyplot as plt
+    import matplotlib.dates as mdates
+
     # start_date = '2019-09-10'
     # end_date = '2022-09-01'
     if extend_to_nearest_quarter:
@@ -843,6 +851,8 @@ def plot_weighted_median_with_distribution_bars(
 
 
     """
+    from matplotlib import pyplot as plt
+
     if ax is None:
         plt.clf()
         _, ax = plt.subplots()
@@ -911,6 +921,10 @@ def html_to_png(directory):
     """
     Convert all .html files in the given directory to .png format.
 
+    The tables in each file are parsed with pandas.read_html and drawn with
+    matplotlib (see table_render), so no external converter is needed.
+    Files are rendered in parallel.
+
     Parameters:
     directory (str): The path to the directory containing .html files.
 
@@ -918,7 +932,11 @@ def html_to_png(directory):
     list: A list of paths to the generated .png files.
     """
     from pathlib import Path
-    import subprocess
+
+    try:
+        import table_render
+    except ModuleNotFoundError:
+        import src.table_render as table_render
 
     directory = Path(directory)
     if not directory.exists():
@@ -928,22 +946,14 @@ def html_to_png(directory):
     output_dir = directory / "converted_pngs"
     output_dir.mkdir(exist_ok=True)
 
-    # Find all HTML files
-    html_files = list(directory.glob("*.html"))
-    png_files = []
-
-    for html_file in html_files:
-        png_file = output_dir / f"{html_file.stem}.png"
+    tables = {}
+    for html_file in directory.glob("*.html"):
         try:
-            subprocess.run(
-                ["wkhtmltoimage", str(html_file), str(png_file)],
-                check=True
-            )
-            png_files.append(str(png_file))
-        except subprocess.CalledProcessError as e:
+            tables[html_file.stem] = pd.read_html(html_file, index_col=0)[0]
+        except ValueError as e:
             print(f"Error converting {html_file}: {e}")
 
-    return png_files
+    return [str(p) for p in table_render.render_tables(tables, output_dir, formats=("png",))]
 
 
 
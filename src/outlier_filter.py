@@ -0,0 +1,370 @@
+"""
+Rolling-median outlier filter for CIP spreads.
+
+A point is flagged when its absolute deviation from the rolling 45-day median
+is at least 10 times the rolling 45-day mean of those deviations. The filter
+is not recursive: flagged points still enter the windows with their raw
+values, exactly as in the original per-currency pandas loop.
+
+Two modes share the same definition:
+
+- `filter_outliers` cleans a whole (date x currency) panel at once with
+  pandas' rolling kernels (a skiplist median in C), one call for all
+  columns.
+- `RollingOutlierFilter` / `PanelOutlierFilter` keep a two-heap median
+  window per currency and update the median and dispersion as each
+  observation arrives, so a daily append costs O(log w) per currency
+  instead of a rescan of the history. Their state can be seeded from the
+  tail of a panel and serialized to JSON.
+"""
+import heapq
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+
+WINDOW_SIZE = 45
+THRESHOLD = 10.0
+
+
+def filter_outliers(spreads, window=WINDOW_SIZE, threshold=THRESHOLD, inplace=False):
+    """
+    Replace rolling-median outliers in every column of `spreads` with NaN.
+
+    Parameters
+    ----------
+    spreads : pandas.DataFrame
+        (date x currency) panel of CIP spreads.
+    window : int, optional
+        Rolling window length, in observations.
+    threshold : float, optional
+        Deviation / mean-deviation ratio at which a point is an outlier.
+    inplace : bool, optional
+        If True, write the NaNs into `spreads` itself.
+
+    Returns
+    -------
+    cleaned : pandas.DataFrame
+    outlier_mask : pandas.DataFrame
+        Boolean frame, True where a point was removed.
+    """
+    # Rolling median over the window, all currencies in one call
+    rolling_median = spreads.rolling(window).median()
+
+    # Absolute deviation from median
+    abs_dev = (spreads - rolling_median).abs()
+
+    # Rolling mean of abs_dev (proxy for MAD)
+    rolling_mad = abs_dev.rolling(window).mean()
+
+    # Mark outliers (abs_dev / mad >= threshold) and replace with NaN
+    outlier_mask = (abs_dev / rolling_mad) >= threshold
+    cleaned = spreads if inplace else spreads.copy()
+    cleaned[outlier_mask] = np.nan
+    return cleaned, outlier_mask
+
+
+class MedianWindow:
+    """
+    Fixed-length sliding window with an O(log w) running median.
+
+    The non-NaN values are split between a max-heap of the lower half and a
+    min-heap of the upper half, so the median is read off the heap tops.
+    Evicted values are deleted lazily: they are counted in `_delayed` and
+    popped once they reach a top, and the heaps are rebuilt from the window
+    whenever stale entries make up more than half of them. NaNs are counted
+    but not stored, so a window holding any NaN reports a NaN median, like
+    pandas' rolling(window) with the default min_periods.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._ring = deque()
+        self._low = []   # lower half, negated (max-heap)
+        self._high = []  # upper half
+        self._low_size = 0
+        self._high_size = 0
+        self._delayed = {}
+        self._nan_count = 0
+
+    def _prune(self, heap, sign):
+        while heap and self._delayed.get(sign * heap[0]):
+            value = sign * heapq.heappop(heap)
+            self._delayed[value] -= 1
+            if not self._delayed[value]:
+                del self._delayed[value]
+
+    def _rebalance(self):
+        if self._low_size > self._high_size + 1:
+            heapq.heappush(self._high, -heapq.heappop(self._low))
+            self._low_size -= 1
+            self._high_size += 1
+            self._prune(self._low, -1)
+        elif self._low_size < self._high_size:
+            heapq.heappush(self._low, -heapq.heappop(self._high))
+            self._low_size += 1
+            self._high_size -= 1
+            self._prune(self._high, 1)
+
+    def _insert(self, value):
+        if not self._low or value <= -self._low[0]:
+            heapq.heappush(self._low, -value)
+            self._low_size += 1
+        else:
+            heapq.heappush(self._high, value)
+            self._high_size += 1
+        self._rebalance()
+
+    def _erase(self, value):
+        self._delayed[value] = self._delayed.get(value, 0) + 1
+        if self._low and value <= -self._low[0]:
+            self._low_size -= 1
+            if value == -self._low[0]:
+                self._prune(self._low, -1)
+        else:
+            self._high_size -= 1
+            if value == self._high[0]:
+                self._prune(self._high, 1)
+        self._rebalance()
+
+    def _rebuild(self):
+        valid = sorted(x for x in self._ring if not math.isnan(x))
+        half = (len(valid) + 1) // 2
+        self._low = [-x for x in reversed(valid[:half])]
+        self._high = valid[half:]
+        self._low_size, self._high_size = len(self._low), len(self._high)
+        self._delayed = {}
+
+    def push(self, value):
+        """Add `value`, evicting the oldest observation once the window is full."""
+        if len(self._ring) == self.size:
+            old = self._ring.popleft()
+            if math.isnan(old):
+                self._nan_count -= 1
+            else:
+                self._erase(old)
+        self._ring.append(value)
+        if math.isnan(value):
+            self._nan_count += 1
+        else:
+            self._insert(value)
+        if len(self._low) + len(self._high) > 2 * self.size:
+            self._rebuild()
+
+    def median(self):
+        """Median of the window, or NaN unless it holds `size` valid values."""
+        if len(self._ring) < self.size or self._nan_count:
+            return math.nan
+        if (self._low_size + self._high_size) % 2:
+            return -self._low[0]
+        return 0.5 * (-self._low[0] + self._high[0])
+
+    def values(self):
+        """Window contents in arrival order."""
+        return list(self._ring)
+
+
+class RunningMean:
+    """
+    Fixed-length sliding mean with compensated (Neumaier) summation.
+
+    Like pandas' rolling(window).mean(), the mean is NaN until `size`
+    observations have arrived or while any NaN is in the window.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._ring = deque()
+        self._sum = 0.0
+        self._compensation = 0.0
+        self._nan_count = 0
+
+    def _add(self, x):
+        total = self._sum + x
+        if abs(self._sum) >= abs(x):
+            self._compensation += (self._sum - total) + x
+        else:
+            self._compensation += (x - total) + self._sum
+        self._sum = total
+
+    def push(self, value):
+        if len(self._ring) == self.size:
+            old = self._ring.popleft()
+            if math.isnan(old):
+                self._nan_count -= 1
+            else:
+                self._add(-old)
+        self._ring.append(value)
+        if math.isnan(value):
+            self._nan_count += 1
+        else:
+            self._add(value)
+
+    def mean(self):
+        if len(self._ring) < self.size or self._nan_count:
+            return math.nan
+        return (self._sum + self._compensation) / self.size
+
+    def values(self):
+        return list(self._ring)
+
+
+class RollingOutlierFilter:
+    """
+    Streaming version of `filter_outliers` for a single series.
+
+    Parameters
+    ----------
+    window : int, optional
+        Rolling window length, in observations.
+    threshold : float, optional
+        Deviation / mean-deviation ratio at which a point is an outlier.
+
+    Examples
+    --------
+    >>> f = RollingOutlierFilter(window=3, threshold=2.5)
+    >>> [f.push(x)[1] for x in [1.0, 2.0, 1.0, 2.0, 1.0, 50.0]]
+    [False, False, False, False, False, True]
+    """
+
+    def __init__(self, window=WINDOW_SIZE, threshold=THRESHOLD):
+        self.window = window
+        self.threshold = threshold
+        self._values = MedianWindow(window)
+        self._abs_dev = RunningMean(window)
+
+    def push(self, value):
+        """
+        Feed one observation.
+
+        Returns
+        -------
+        cleaned : float
+            `value`, or NaN if it was flagged.
+        is_outlier : bool
+        """
+        value = float(value)
+        self._values.push(value)
+        abs_dev = abs(value - self._values.median())
+        self._abs_dev.push(abs_dev)
+        mad = self._abs_dev.mean()
+
+        if math.isnan(abs_dev) or math.isnan(mad):
+            is_outlier = False
+        elif mad == 0.0:
+            # abs_dev / 0 is inf (an outlier) unless abs_dev is 0 too
+            is_outlier = abs_dev > 0.0
+        else:
+            is_outlier = abs_dev / mad >= self.threshold
+        return (math.nan if is_outlier else value), is_outlier
+
+    def seed(self, history):
+        """
+        Warm the filter up from the raw (unfiltered) tail of a series.
+
+        Only the last ``2 * window - 1`` observations can influence future
+        points, so older history is skipped.
+        """
+        history = np.asarray(history, dtype=float)
+        for value in history[-(2 * self.window - 1):]:
+            self.push(value)
+        return self
+
+    def to_state(self):
+        """JSON-serializable snapshot of the window state."""
+        return {
+            "window": self.window,
+            "threshold": self.threshold,
+            "values": _nan_to_none(self._values.values()),
+            "abs_dev": _nan_to_none(self._abs_dev.values()),
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild a filter from `to_state` output."""
+        f = cls(window=state["window"], threshold=state["threshold"])
+        for value in _none_to_nan(state["values"]):
+            f._values.push(value)
+        for value in _none_to_nan(state["abs_dev"]):
+            f._abs_dev.push(value)
+        return f
+
+
+class PanelOutlierFilter:
+    """
+    One `RollingOutlierFilter` per column of a (date x currency) panel.
+
+    Parameters
+    ----------
+    columns : list of str
+        Column names, in the order rows will be pushed.
+    window : int, optional
+    threshold : float, optional
+    """
+
+    def __init__(self, columns, window=WINDOW_SIZE, threshold=THRESHOLD):
+        self.columns = list(columns)
+        self.window = window
+        self.threshold = threshold
+        self.filters = [RollingOutlierFilter(window, threshold) for _ in self.columns]
+
+    @classmethod
+    def from_history(cls, spreads, window=WINDOW_SIZE, threshold=THRESHOLD):
+        """Seed a panel filter from the raw tail of every column of `spreads`."""
+        panel = cls(spreads.columns, window, threshold)
+        tail = spreads.iloc[-(2 * window - 1):].to_numpy(dtype=float)
+        for f, column in zip(panel.filters, tail.T):
+            f.seed(column)
+        return panel
+
+    def push_row(self, values):
+        """
+        Feed one row (one value per column).
+
+        Returns
+        -------
+        cleaned : numpy.ndarray
+        outlier_mask : numpy.ndarray of bool
+        """
+        values = np.asarray(values, dtype=float)
+        cleaned = np.empty(len(self.filters))
+        outlier_mask = np.zeros(len(self.filters), dtype=bool)
+        for i, (f, value) in enumerate(zip(self.filters, values)):
+            cleaned[i], outlier_mask[i] = f.push(value)
+        return cleaned, outlier_mask
+
+    def push_frame(self, spreads):
+        """Feed the rows of `spreads` in order; returns (cleaned, outlier_mask) frames."""
+        spreads = spreads[self.columns]
+        cleaned = np.empty(spreads.shape)
+        outlier_mask = np.zeros(spreads.shape, dtype=bool)
+        for i, row in enumerate(spreads.to_numpy(dtype=float)):
+            cleaned[i], outlier_mask[i] = self.push_row(row)
+        return (
+            pd.DataFrame(cleaned, index=spreads.index, columns=self.columns),
+            pd.DataFrame(outlier_mask, index=spreads.index, columns=self.columns),
+        )
+
+    def to_state(self):
+        return {
+            "columns": self.columns,
+            "window": self.window,
+            "threshold": self.threshold,
+            "filters": [f.to_state() for f in self.filters],
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        panel = cls(state["columns"], state["window"], state["threshold"])
+        panel.filters = [RollingOutlierFilter.from_state(s) for s in state["filters"]]
+        return panel
+
+
+def _nan_to_none(values):
+    return [None if math.isnan(v) else v for v in values]
+
+
+def _none_to_nan(values):
+    return [math.nan if v is None else float(v) for v in values]
@@ -0,0 +1,199 @@
+"""
+Columnar (Parquet) cache of the normalized Spot/Forward/OIS panel.
+
+Parsing CIP_2025.xlsx with openpyxl dominates the runtime of every pipeline
+task, so the normalized panel is written to Parquet the first time it is
+built and read back from there afterwards. Each cache entry carries a small
+JSON sidecar with the fingerprint (size, mtime and SHA-256) of the workbook
+it was built from; the entry is rebuilt as soon as the workbook changes.
+"""
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+try:
+    from settings import config
+except ModuleNotFoundError:
+    from src.settings import config
+
+
+CACHE_DIR = Path(config("CACHE_DIR"))
+
+# Bump whenever the normalization applied before caching changes, so that
+# panels written by older code are never read back.
+CACHE_VERSION = 1
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """Return the hex SHA-256 digest of the file at `path`."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_fingerprint(path, with_hash=True):
+    """
+    Fingerprint a source file by size, modification time and content hash.
+
+    Parameters
+    ----------
+    path : str or Path
+        File to fingerprint.
+    with_hash : bool, optional
+        If False, skip the SHA-256 and only return the cheap stat fields.
+
+    Returns
+    -------
+    dict
+        Keys ``size``, ``mtime_ns`` and (if requested) ``sha256``.
+    """
+    stat = os.stat(path)
+    fingerprint = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if with_hash:
+        fingerprint["sha256"] = file_sha256(path)
+    return fingerprint
+
+
+def cache_paths(source_path, cache_dir=None, name=None):
+    """
+    Return the (parquet, metadata) paths used to cache `source_path`.
+
+    `name` distinguishes several panels derived from the same file; it
+    defaults to the file's stem.
+    """
+    cache_dir = Path(cache_dir) if cache_dir is not None else CACHE_DIR
+    stem = name or Path(source_path).stem
+    return cache_dir / f"{stem}.parquet", cache_dir / f"{stem}.meta.json"
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(meta_path, meta):
+    tmp_path = meta_path.with_suffix(meta_path.suffix + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, meta_path)
+
+
+def fresh_cache_path(source_path, cache_dir=None, name=None):
+    """
+    Return the Parquet file of a current cache entry, or None if it is missing or stale.
+
+    The cheap (size, mtime) check is tried first. If it fails, the file is
+    hashed, so that a workbook which was merely touched or re-downloaded with
+    identical contents still hits the cache.
+    """
+    parquet_path, meta_path = cache_paths(source_path, cache_dir, name)
+    meta = _read_meta(meta_path)
+    if meta is None or meta.get("version") != CACHE_VERSION or not parquet_path.exists():
+        return None
+
+    cached = meta["fingerprint"]
+    current = file_fingerprint(source_path, with_hash=False)
+    if current["size"] != cached["size"]:
+        return None
+    if current["mtime_ns"] != cached["mtime_ns"]:
+        if file_sha256(source_path) != cached["sha256"]:
+            return None
+        # Same contents under a new mtime: refresh the sidecar so the next
+        # lookup takes the fast path again.
+        meta["fingerprint"] = {**current, "sha256": cached["sha256"]}
+        _write_meta(meta_path, meta)
+
+    return parquet_path
+
+
+def read_cached_panel(source_path, cache_dir=None, name=None):
+    """Return the cached panel for `source_path`, or None if it is missing or stale."""
+    parquet_path = fresh_cache_path(source_path, cache_dir, name)
+    if parquet_path is None:
+        return None
+    return pd.read_parquet(parquet_path)
+
+
+def write_cached_panel(source_path, df, cache_dir=None, name=None):
+    """Write `df` to the Parquet cache, tagged with the fingerprint of `source_path`."""
+    parquet_path, meta_path = cache_paths(source_path, cache_dir, name)
+    parquet_path.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp_path = parquet_path.with_suffix(".parquet.tmp")
+    df.to_parquet(tmp_path)
+    os.replace(tmp_path, parquet_path)
+
+    meta = {
+        "version": CACHE_VERSION,
+        "source": str(Path(source_path).resolve()),
+        "fingerprint": file_fingerprint(source_path),
+    }
+    _write_meta(meta_path, meta)
+    return parquet_path
+
+
+def load_or_build(source_path, build, cache_dir=None, name=None):
+    """
+    Read the panel for `source_path` from the cache, building it on a miss.
+
+    Parameters
+    ----------
+    source_path : str or Path
+        The workbook the panel is derived from.
+    build : callable
+        ``build(source_path) -> pandas.DataFrame``, called only on a cache miss.
+    cache_dir : str or Path, optional
+        Override for ``settings.CACHE_DIR``.
+    name : str, optional
+        Cache entry name, for several panels built from the same file.
+
+    Returns
+    -------
+    pandas.DataFrame
+    """
+    df = read_cached_panel(source_path, cache_dir, name)
+    if df is not None:
+        return df
+    df, _ = _build_and_write(source_path, build, cache_dir, name)
+    return df
+
+
+def ensure_cached(source_path, build, cache_dir=None, name=None):
+    """
+    Path of the Parquet cache entry for `source_path`, building it on a miss.
+
+    Unlike load_or_build the entry is not read, so callers can scan the file
+    themselves (e.g. lazily with polars).
+
+    Returns
+    -------
+    Path or pandas.DataFrame
+        The built frame itself if the cache directory cannot be written.
+    """
+    parquet_path = fresh_cache_path(source_path, cache_dir, name)
+    if parquet_path is not None:
+        return parquet_path
+    df, parquet_path = _build_and_write(source_path, build, cache_dir, name)
+    return df if parquet_path is None else parquet_path
+
+
+def _build_and_write(source_path, build, cache_dir=None, name=None):
+    """Build the panel and cache it; the path is None if it could not be written."""
+    df = build(source_path)
+    try:
+        return df, write_cached_panel(source_path, df, cache_dir, name)
+    except OSError as e:
+        # A read-only checkout should still be able to compute results.
+        print(f"Could not write panel cache for {source_path}: {e}")
+        return df, None
@@ -0,0 +1,201 @@
+"""
+Year-partitioned Parquet datasets for the normalized panel and the spreads.
+
+A date-indexed frame is written as a hive-partitioned dataset, one directory
+per calendar year (``year=2019/part-0.parquet``), with the dates stored as a
+``Date`` column. Reads take a start/end date and a column list: the year
+bounds prune whole partitions, the date bounds are pushed down to the
+Parquet row-group statistics, and only the requested columns are decoded,
+so a short window reads a few kilobytes instead of the whole history.
+
+Each dataset has a ``_meta.json`` sidecar with the fingerprint of the data
+it was built from (see ensure_dataset) and is replaced atomically on
+rebuild.
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+try:
+    from settings import config
+except ModuleNotFoundError:
+    from src.settings import config
+
+
+DATASET_DIR = Path(config("DATA_DIR")) / "datasets"
+META_FILE = "_meta.json"
+DATE = "Date"
+PARTITION = "year"
+
+# Bump when the on-disk layout changes, so older datasets are rebuilt
+DATASET_VERSION = 1
+
+_PARTITIONING = ds.partitioning(pa.schema([(PARTITION, pa.int32())]), flavor="hive")
+
+
+def write_dataset(df, path, fingerprint=None):
+    """
+    Write a date-indexed frame as a year-partitioned Parquet dataset.
+
+    The dataset is written next to `path` and swapped in, so readers never
+    see a partial dataset.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Indexed by date; columns must be strings.
+    path : str or Path
+        Dataset directory; replaced if it exists.
+    fingerprint : JSON-serializable, optional
+        Identifies the data the frame was built from, see ensure_dataset.
+
+    Returns
+    -------
+    Path
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    dates = pd.DatetimeIndex(df.index)
+    frame = df.set_axis(pd.RangeIndex(len(df)), axis=0)
+    frame.insert(0, DATE, dates.as_unit("ns"))
+    frame[PARTITION] = dates.year.astype("int32")
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+
+    tmp_dir = Path(tempfile.mkdtemp(dir=path.parent, prefix=f".{path.name}."))
+    try:
+        ds.write_dataset(
+            table,
+            tmp_dir,
+            format="parquet",
+            partitioning=_PARTITIONING,
+            basename_template="part-{i}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+        )
+        meta = {
+            "version": DATASET_VERSION,
+            "fingerprint": fingerprint,
+            "columns": [str(c) for c in df.columns],
+            "rows": len(df),
+            "start": dates.min().isoformat() if len(df) else None,
+            "end": dates.max().isoformat() if len(df) else None,
+        }
+        with open(tmp_dir / META_FILE, "w") as f:
+            json.dump(meta, f, indent=2)
+
+        old_dir = None
+        if path.exists():
+            old_dir = path.with_name(f".{path.name}.old")
+            shutil.rmtree(old_dir, ignore_errors=True)
+            os.replace(path, old_dir)
+        os.replace(tmp_dir, path)
+        if old_dir is not None:
+            shutil.rmtree(old_dir, ignore_errors=True)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return path
+
+
+def dataset_meta(path):
+    """The sidecar of a dataset, or None if it is missing or unreadable."""
+    try:
+        with open(Path(path) / META_FILE, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _canonical(fingerprint):
+    # Tuples and lists compare equal once they have been through JSON
+    return json.loads(json.dumps(fingerprint, default=str))
+
+
+def ensure_dataset(path, fingerprint, build):
+    """
+    Return `path`, (re)building the dataset if its fingerprint is not `fingerprint`.
+
+    Parameters
+    ----------
+    path : str or Path
+    fingerprint : JSON-serializable
+        E.g. the (source, fingerprint) pair of the raw data.
+    build : callable
+        ``build() -> pandas.DataFrame``, called only when the dataset is
+        missing or stale.
+
+    Returns
+    -------
+    Path
+    """
+    meta = dataset_meta(path)
+    if meta is None or meta.get("version") != DATASET_VERSION or meta.get("fingerprint") != _canonical(fingerprint):
+        write_dataset(build(), path, _canonical(fingerprint))
+    return Path(path)
+
+
+def _bounds(start, end):
+    """Timestamps covered by `start` and `end`; strings span their resolution, as with ``.loc``."""
+    if isinstance(start, str):
+        start = pd.Period(start).start_time
+    if isinstance(end, str):
+        end = pd.Period(end).end_time
+    return (None if start is None else pd.Timestamp(start)), (None if end is None else pd.Timestamp(end))
+
+
+def date_filter(start=None, end=None):
+    """
+    Dataset filter expression for rows between `start` and `end`.
+
+    The bounds on the partition column let the scanner skip every other
+    year's files; the bounds on Date are checked against row-group
+    statistics.
+    """
+    start, end = _bounds(start, end)
+    expression = None
+
+    def both(a, b):
+        return b if a is None else a & b
+
+    if start is not None:
+        expression = both(expression, ds.field(PARTITION) >= start.year)
+        expression = both(expression, ds.field(DATE) >= pa.scalar(start.as_unit("ns").value, pa.timestamp("ns")))
+    if end is not None:
+        expression = both(expression, ds.field(PARTITION) <= end.year)
+        expression = both(expression, ds.field(DATE) <= pa.scalar(end.as_unit("ns").value, pa.timestamp("ns")))
+    return expression
+
+
+def read_dataset(path, start=None, end=None, columns=None):
+    """
+    Read rows between `start` and `end` (inclusive, as with ``.loc``) from a dataset.
+
+    Parameters
+    ----------
+    path : str or Path
+    start, end : str or Timestamp, optional
+        Date bounds; None reads from the first / up to the last date.
+    columns : list of str, optional
+        Columns to load; all by default.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Indexed by Date, columns in dataset (or requested) order.
+    """
+    dataset = ds.dataset(path, format="parquet", partitioning=_PARTITIONING)
+    if columns is None:
+        meta = dataset_meta(path)
+        columns = meta["columns"] if meta else [n for n in dataset.schema.names if n not in (DATE, PARTITION)]
+    table = dataset.to_table(columns=[DATE, *columns], filter=date_filter(start, end))
+    df = table.to_pandas().set_index(DATE).sort_index()
+    # Exact .loc semantics for the bounds (e.g. partial date strings)
+    return df.loc[start:end]
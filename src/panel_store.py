@@ -0,0 +1,152 @@
+"""
+Memory-mapped binary store of the normalized panel.
+
+The spot, forward and OIS columns form one dense float64 matrix. The store
+keeps it as a column-major ``values.npy`` next to the dates (``dates.npy``,
+int64 nanoseconds) and a ``meta.json`` sidecar with the column names and
+the fingerprint of the data it was built from::
+
+    CIP_2025.panel/
+        values.npy
+        dates.npy
+        meta.json
+
+`open_store` maps ``values.npy`` read-only and wraps it in a DataFrame
+without copying, so every process and notebook that opens the store reads
+the same pages from the OS page cache instead of holding a private copy,
+and opening it costs a few milliseconds however large the panel is.
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+try:
+    from settings import config
+except ModuleNotFoundError:
+    from src.settings import config
+
+
+STORE_DIR = Path(config("CACHE_DIR"))
+VALUES_FILE = "values.npy"
+DATES_FILE = "dates.npy"
+META_FILE = "meta.json"
+
+# Bump when the layout changes, so stores written by older code are rebuilt
+STORE_VERSION = 1
+
+
+def write_store(df, path, fingerprint=None):
+    """
+    Write a date-indexed float frame as a memory-mappable store.
+
+    The store is written next to `path` and swapped in; processes that
+    still map the previous version keep reading it until they reopen.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+    path : str or Path
+        Store directory; replaced if it exists.
+    fingerprint : JSON-serializable, optional
+        Identifies the data the frame was built from, see ensure_store.
+
+    Returns
+    -------
+    Path
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    index = pd.DatetimeIndex(df.index).as_unit("ns")
+
+    tmp_dir = Path(tempfile.mkdtemp(dir=path.parent, prefix=f".{path.name}."))
+    try:
+        values = np.lib.format.open_memmap(
+            tmp_dir / VALUES_FILE, mode="w+", dtype=np.float64, shape=df.shape, fortran_order=True
+        )
+        values[:] = df.to_numpy(dtype=np.float64)
+        values.flush()
+        del values
+        np.save(tmp_dir / DATES_FILE, index.asi8)
+        meta = {
+            "version": STORE_VERSION,
+            "fingerprint": fingerprint,
+            "columns": [str(c) for c in df.columns],
+            "index_name": index.name,
+            "shape": list(df.shape),
+        }
+        with open(tmp_dir / META_FILE, "w") as f:
+            json.dump(meta, f, indent=2)
+
+        old_dir = None
+        if path.exists():
+            old_dir = path.with_name(f".{path.name}.old")
+            shutil.rmtree(old_dir, ignore_errors=True)
+            os.replace(path, old_dir)
+        os.replace(tmp_dir, path)
+        if old_dir is not None:
+            shutil.rmtree(old_dir, ignore_errors=True)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return path
+
+
+def store_meta(path):
+    """The sidecar of a store, or None if it is missing or unreadable."""
+    try:
+        with open(Path(path) / META_FILE, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _canonical(fingerprint):
+    return json.loads(json.dumps(fingerprint, default=str))
+
+
+def ensure_store(path, fingerprint, build):
+    """
+    Return `path`, (re)building the store if its fingerprint is not `fingerprint`.
+
+    Parameters
+    ----------
+    path : str or Path
+    fingerprint : JSON-serializable
+    build : callable
+        ``build() -> pandas.DataFrame``, called only when the store is
+        missing or stale.
+
+    Returns
+    -------
+    Path
+    """
+    meta = store_meta(path)
+    if meta is None or meta.get("version") != STORE_VERSION or meta.get("fingerprint") != _canonical(fingerprint):
+        write_store(build(), path, _canonical(fingerprint))
+    return Path(path)
+
+
+def open_store(path):
+    """
+    Open a store as a DataFrame over the read-only memory map (no copy).
+
+    Returns
+    -------
+    pandas.DataFrame
+        Writing to its values raises ValueError; slices with ``.loc`` /
+        ``.iloc`` stay views onto the mapped file.
+    """
+    path = Path(path)
+    meta = store_meta(path)
+    if meta is None:
+        raise FileNotFoundError(f"No panel store at {path}")
+    values = np.load(path / VALUES_FILE, mmap_mode="r")
+    index = pd.DatetimeIndex(np.load(path / DATES_FILE).view("datetime64[ns]"), name=meta["index_name"])
+    return pd.DataFrame(values, index=index, columns=meta["columns"], copy=False)
@@ -3,12 +3,11 @@ Fetches and loads raw data from the directory and cleans it
 """
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-import requests
-from io import BytesIO
+from functools import lru_cache
+import datetime
 import sys
 import os
+import warnings
 
 # Ensure the root directory (CIP/) is in sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -18,608 +17,1073 @@ try:
 except ModuleNotFoundError:
     import settings as settings # Fallback if src.settings isn't found
 
+try:
+    import src.panel_cache as panel_cache
+    import src.cip_engine as cip_engine
+    import src.outlier_filter as outlier_filter
+    import src.bloomberg_store as bloomberg_store
+    import src.currency_universe as currency_universe
+    import src.downsample as downsample
+    import src.instrumentation as instrumentation
+    import src.panel_dataset as panel_dataset
+    import src.panel_store as panel_store
+except ModuleNotFoundError:
+    import panel_cache as panel_cache
+    import cip_engine as cip_engine
+    import outlier_filter as outlier_filter
+    import bloomberg_store as bloomberg_store
+    import currency_universe as currency_universe
+    import downsample as downsample
+    import instrumentation as instrumentation
+    import panel_dataset as panel_dataset
+    import panel_store as panel_store
+
 
 BLOOMBERG = settings.BLOOMBERG
 
-def download():
-    target_file = "./data_manual/CIP_2025.xlsx"
-    import requests, os
-    url = "https://raw.githubusercontent.com/Kunj121/CIP_DATA/main/CIP_2025%20(1).xlsx"
-    response = requests.get(url)
-    response.raise_for_status()  # Raise an error on bad responses
-    # Ensure the data_manual folder exists.
-    os.makedirs(os.path.dirname(target_file), exist_ok=True)
-    # Write the file to the target path.
-    with open(target_file, "wb") as f:
-        f.write(response.content)
+# Engines for _full_spreads; "polars" runs the pipeline as one lazy query
+BACKENDS = ("pandas", "polars")
+
+# How the pandas engine runs the per-currency work; "process" shards the
+# currencies across a process pool (see parallel_cip)
+EXECUTORS = ("serial", "process")
+
+CIP_DATA_URL = "https://raw.githubusercontent.com/Kunj121/CIP_DATA/main/CIP_2025%20(1).xlsx"
+
+
+def download(target_file="./data_manual/CIP_2025.xlsx"):
+    """
+    Fetch the CIP workbook if it changed upstream, then read it.
+
+    The request is conditional, the file is replaced atomically and its
+    checksum must match the CIP_DATA_SHA256 setting, see
+    downloader.download_file.
+    """
+    # requests is only needed when the workbook is actually fetched
+    try:
+        import src.downloader as downloader
+    except ModuleNotFoundError:
+        import downloader as downloader
+
+    downloader.download_file(CIP_DATA_URL, target_file,
+                             expected_sha256=settings.config("CIP_DATA_SHA256") or None)
     df =  pd.read_excel(target_file)
     return df
 
 
+# Locations probed for the workbook, relative to the working directory
+EXCEL_PATHS = [
+    "./data_manual/CIP_2025.xlsx",
+    "../data_manual/CIP_2025.xlsx",
+]
+
+
+def _find_workbook():
+    """Return the first existing path in EXCEL_PATHS, or None."""
+    for filepath in EXCEL_PATHS:
+        if os.path.exists(filepath):
+            return filepath
+    return None
+
+
+# Raw sheets of the workbook, in the argument order of normalize_sheets
+WORKBOOK_SHEETS = ("Spot", "Forward", "OIS")
+
+
+def _read_workbook_sheets(filepath):
+    """Parse the Spot / Forward / OIS sheets of CIP_2025.xlsx, indexed by date."""
+    with instrumentation.stage("parse") as stage:
+        data = pd.read_excel(filepath, sheet_name=list(WORKBOOK_SHEETS), parse_dates=['Date'])
+        stage.rows = sum(len(sheet) for sheet in data.values())
+    return [data[name].set_index("Date") for name in WORKBOOK_SHEETS]
 
 
-def fetch_bloomberg_historical_data(start_date, end_date):
+def _read_workbook(filepath):
+    """Parse CIP_2025.xlsx once and normalize it into the merged panel."""
+    return normalize_sheets(*_read_workbook_sheets(filepath))
+
+
+def normalize_sheets(exchange_rates, forward_rates, interest_rates, universe=None):
     """
-    Fetch historical data from Bloomberg using xbbg for predefined sets of tickers,
-    clean up the data, and merge into a single DataFrame similar to the existing process.
+    Normalize raw Spot / Forward / OIS sheets into the merged panel.
+
+    Forward points are converted to outright forwards, the columns are renamed
+    to <CCY>_CURNCY / <CCY>_CURNCY3M / <CCY>_IR, the three sheets are inner
+    joined on Date and pairs quoted as USD per unit (EUR, GBP, AUD, NZD) are
+    flipped to foreign currency per USD. Scales and quote directions come
+    from the currency universe table.
 
     Parameters
     ----------
-    start_date : str, optional
-        Start date in 'YYYY-MM-DD' format, defaults to "2010-01-01"
-    end_date : str, optional
-        End date in 'YYYY-MM-DD' format, defaults to "2025-12-31"
+    exchange_rates, forward_rates : pandas.DataFrame
+        Spot quotes and forward points, indexed by date, one column per
+        currency in universe order.
+    interest_rates : pandas.DataFrame
+        OIS rates in percent, one column per currency in universe order
+        followed by USD.
+    universe : pandas.DataFrame, optional
+        Currency universe table; defaults to currency_universe.load_universe().
 
     Returns
     -------
     pandas.DataFrame
-        A merged DataFrame containing all the processed historical data
-        (spot rates, swap rates, interest rates) for AUD, CAD, CHF, EUR,
-        GBP, JPY, NZD, and SEK (with USD as reference).
     """
-    from xbbg import blp
-    start_date = "2010-01-01"
-    end_date = "2025-12-31"
-
-    # Tickers for Spot Rates
-    interest_rates = [
-        "ADSOC CMPN Curncy",  # AUD
-        "CDSOC CMPN Curncy",  # CAD
-        "SFSNTC CMPN Curncy", # CHF
-        "EUSWEC CMPN Curncy", # EUR
-        "BPSWSC CMPN Curncy", # GBP
-        "JYSOC CMPN Curncy",  # JPY
-        "NDSOC CMPN Curncy",  # NZD
-        "SKSWTNC BGN Curncy", # SEK
-        "USSOC CMPN Curncy",  # USD
-    ]
-
-    # Tickers for 3M interest rates (overnight or 3M LIBOR, depending on the data vendor)
-    forward_rates = [
-        "AUD3M CMPN Curncy",
-        "CAD3M CMPN Curncy",
-        "CHF3M CMPN Curncy",
-        "EUR3M CMPN Curncy",
-        "GBP3M CMPN Curncy",
-        "JPY3M CMPN Curncy",
-        "NZD3M CMPN Curncy",
-        "SEK3M CMPN Curncy"
-    ]
-
-
-    # Tickers for 3M swap rates (or 3M forward quotes)
-    spot_rates = [
-        "AUD CMPN Curncy",
-        "CAD CMPN Curncy",
-        "CHF CMPN Curncy",
-        "EUR CMPN Curncy",
-        "GBP CMPN Curncy",
-        "JPY CMPN Curncy",
-        "NZD CMPN Curncy",
-        "SEK CMPN Curncy"
-    ]
-
-    # Mapping from Bloomberg columns to simpler names
-   
-    IR_mapping = {
-        "ADSOC CMPN Curncy_PX_LAST": "AUD_IR",
-        "CDSOC CMPN Curncy_PX_LAST": "CAD_IR",
-        "SFSNTC CMPN Curncy_PX_LAST": "CHF_IR",
-        "EUSWEC CMPN Curncy_PX_LAST": "EUR_IR",
-        "BPSWSC CMPN Curncy_PX_LAST": "GBP_IR",
-        "JYSOC CMPN Curncy_PX_LAST": "JPY_IR",
-        "NDSOC CMPN Curncy_PX_LAST": "NZD_IR",
-        "SKSWTNC BGN Curncy_PX_LAST": "SEK_IR",
-        "USSOC CMPN Curncy_PX_LAST": "USD_IR"
-    }
-
-    forward_mapping = {
-        "AUD3M CMPN Curncy_PX_LAST": "AUD_CURNCY3M",
-        "CAD3M CMPN Curncy_PX_LAST": "CAD_CURNCY3M",
-        "CHF3M CMPN Curncy_PX_LAST": "CHF_CURNCY3M",
-        "EUR3M CMPN Curncy_PX_LAST": "EUR_CURNCY3M",
-        "GBP3M CMPN Curncy_PX_LAST": "GBP_CURNCY3M",
-        "JPY3M CMPN Curncy_PX_LAST": "JPY_CURNCY3M",
-        "NZD3M CMPN Curncy_PX_LAST": "NZD_CURNCY3M",
-        "SEK3M CMPN Curncy_PX_LAST": "SEK_CURNCY3M"
-    }
-
-    spot_mapping = {
-        "AUD CMPN CURNCY_PX_LAST": "AUD_CURNCY",
-        "CAD CMPN CURNCY_PX_LAST": "CAD_CURNCY",
-        "CHF CMPN CURNCY_PX_LAST": "CHF_CURNCY",
-        "EUR CMPN CURNCY_PX_LAST": "EUR_CURNCY",
-        "GBP CMPN CURNCY_PX_LAST": "GBP_CURNCY",
-        "JPY CMPN CURNCY_PX_LAST": "JPY_CURNCY",
-        "NZD CMPN CURNCY_PX_LAST": "NZD_CURNCY",
-        "SEK CMPN CURNCY_PX_LAST": "SEK_CURNCY"
-    }
-
-    fields = ["PX_LAST"]
-
-    # Helper to flatten the multi-index
-    def process_df(df, column_mapping):
-        if not df.empty:
-            df.columns = [f"{t[0]}_{t[1]}" for t in df.columns]
-            df.rename(columns=column_mapping, inplace=True)
-            df.set_index('date', inplace=True)
-        return df
-
-    # Pull each set of tickers
-    interest_rates_df = process_df(
-        blp.bdh(
-            tickers=interest_rates,
-            flds=fields,
-            start_date=start_date,
-            end_date=end_date,
-        ),
-        IR_mapping
-    )
+    with instrumentation.stage("normalize", rows=len(exchange_rates)):
+        return _normalize_sheets(exchange_rates, forward_rates, interest_rates, universe)
+
+
+def _normalize_sheets(exchange_rates, forward_rates, interest_rates, universe):
+    universe = universe if universe is not None else currency_universe.load_universe()
+    cols = currency_universe.currencies(universe)
+    k = len(cols)
+    for name, sheet, expected in [
+        ("spot", exchange_rates, k),
+        ("forward", forward_rates, k),
+        ("OIS", interest_rates, k + 1),
+    ]:
+        if sheet.shape[1] != expected:
+            raise ValueError(
+                f"The {name} sheet has {sheet.shape[1]} columns but the currency universe needs {expected}."
+            )
 
-    forward_rates_df = process_df(
-        blp.bdh(
-            tickers=forward_rates,
-            flds=fields,
-            start_date=start_date,
-            end_date=end_date,
-        ),
-        forward_mapping
+    with instrumentation.stage("merge") as stage:
+        # Inner join on date, in the order of the spot sheet
+        index = exchange_rates.index.intersection(forward_rates.index, sort=False)
+        index = index.intersection(interest_rates.index, sort=False)
+
+        # One (date x [spot | forward | OIS]) block, filled straight from the
+        # sheets and normalized in place
+        values = np.empty((len(index), 3 * k + 1), order="F")
+        for sheet, cols_slice in [
+            (exchange_rates, slice(0, k)),
+            (forward_rates, slice(k, 2 * k)),
+            (interest_rates, slice(2 * k, 3 * k + 1)),
+        ]:
+            rows = sheet.index.get_indexer(index)
+            np.take(sheet.to_numpy(dtype=float), rows, axis=0, out=values[:, cols_slice])
+        stage.rows = len(index)
+
+    # Forward points -> outright forwards, reciprocal for pairs quoted as
+    # USD per unit (EUR, GBP, AUD, NZD)
+    currency_universe.apply_quote_conventions(values[:, :k], values[:, k:2 * k], universe)
+
+    columns = (
+        [f"{name}_CURNCY" for name in cols]
+        + [f"{name}_CURNCY3M" for name in cols]
+        + [f"{name}_IR" for name in cols + [currency_universe.USD]]
     )
+    return pd.DataFrame(values, index=index, columns=columns, copy=False)
 
-    exchange_rates_df = process_df(
-        blp.bdh(
-            tickers=spot_rates,
-            flds=fields,
-            start_date=start_date,
-            end_date=end_date,
-        ),
-        spot_mapping
-    )
 
-    # For demonstration, we replicate the "3M forward" concept by appending
-    # the spot data (currency_df) to the swap rates (swap_df).
-    # In a real scenario, you might need the forward points separately
-    # to add to / subtract from spot. This code treats 'swap_df' as 3M rates.
-
-    # We keep the original spot rates in swap_df as well for reference:
-    cols = ["AUD", "CAD", "CHF", "EUR", "GBP", "JPY", "NZD", "SEK"]
-    cols_IR = ["AUD", "CAD", "CHF", "EUR", "GBP", "JPY", "NZD", "SEK", "USD"]
-    exchange_rates_df.columns = cols
-    forward_rates_df.columns = cols
-    interest_rates_df.columns = cols_IR
-
-    # Convert certain currencies to reciprocals
-    # The forward df is actually forward points, so we need to make this into forward rates.
-    forward_rates_df[[c for c in cols if c != 'JPY']] /= 10000
-    forward_rates_df['JPY'] /= 100
-    forward_rates_df = exchange_rates_df + forward_rates_df
-
-    exchange_rates_df.columns = [name+"_CURNCY" for name in exchange_rates_df.columns]
-    forward_rates.columns = [name+"_CURNCY3M" for name in forward_rates.columns]
-    interest_rates.columns = [name+"_IR" for name in interest_rates.columns]
-
-    # Merge all
-    df_merged = (
-        exchange_rates_df
-        .merge(forward_rates_df, left_index=True, right_index=True, how='inner')
-        .merge(interest_rates_df, left_index=True, right_index=True, how='inner')
+def _load_excel_panel():
+    """
+    Return the normalized Excel panel, downloading the workbook if needed.
+
+    The workbook is only parsed when the Parquet cache in CACHE_DIR is
+    missing or was built from a different version of the file.
+    """
+    return panel_cache.load_or_build(_workbook_path(), _read_workbook)
+
+
+def _workbook_path():
+    """Path of the workbook, downloading it first if it is not on disk."""
+    filepath = _find_workbook()
+    if filepath is None:
+        download()
+        filepath = _find_workbook()
+    if filepath is None:
+        raise FileNotFoundError("Could not find or load the CIP_2025.xlsx file in any of the expected locations")
+    return filepath
+
+
+######################################
+# Shared, memoized panel loader
+######################################
+def _panel_source():
+    """
+    Identify the current raw-panel source as a hashable (source, fingerprint) pair.
+
+    For the workbook the fingerprint is its path, size and mtime, so an edited
+    or re-downloaded file gets a fresh cache entry. Bloomberg pulls are keyed
+    by calendar day.
+    """
+    if BLOOMBERG:
+        return "bloomberg", datetime.date.today().isoformat()
+
+    filepath = _workbook_path()
+    stat = os.stat(filepath)
+    return "excel", (os.path.abspath(filepath), stat.st_size, stat.st_mtime_ns)
+
+
+def _incremental():
+    try:
+        import src.cip_incremental as cip_incremental
+    except ModuleNotFoundError:
+        import cip_incremental as cip_incremental
+    return cip_incremental
+
+
+def _panel_key():
+    """
+    ``(source, fingerprint, tail)`` keying the panel and spread caches.
+
+    `tail` is the last date appended to this source with
+    cip_incremental.append_rows (None if nothing was appended), so the
+    caches pick up the appended rows.
+    """
+    source, fingerprint = _panel_source()
+    return source, fingerprint, _incremental().tail_version(source, fingerprint)
+
+
+@lru_cache(maxsize=4)
+def _full_panel(source, fingerprint, tail=None):
+    """
+    Load and normalize the full-history panel for a source, exactly once.
+
+    The result is backed by a single read-only float block, so every slice
+    handed out by load_panel is a view onto the same memory and callers
+    cannot modify the shared data by accident. The block is the memory-mapped
+    panel store (see panel_store), so all processes on the machine share
+    one page-cache copy of it. Rows appended with cip_incremental follow
+    the history of the source when `tail` is set.
+    """
+    try:
+        path = panel_store_path(source, fingerprint, tail)
+    except OSError as e:
+        # A read-only checkout should still be able to compute results.
+        print(f"Could not write panel store: {e}")
+        df = _build_panel(source, fingerprint, tail)
+        values = np.asfortranarray(df.to_numpy(dtype=float))
+        values.flags.writeable = False
+        return pd.DataFrame(values, index=df.index, columns=df.columns, copy=False)
+    return panel_store.open_store(path)
+
+
+def _build_panel(source, fingerprint, tail=None):
+    with instrumentation.stage("load_panel") as stage:
+        if source == "excel":
+            df = _load_excel_panel()
+        else:
+            df = fetch_bloomberg_historical_data("2010-01-01", fingerprint)
+        if tail is not None:
+            appended, _ = _incremental().load_tail()
+            df = pd.concat([df, appended.loc[appended.index > df.index[-1]]])
+        stage.rows = len(df)
+    return df
+
+
+def panel_store_path(source=None, fingerprint=None, tail=None):
+    """
+    Memory-mapped store of the normalized panel, built on first use.
+
+    It lives in CACHE_DIR (CIP_2025.panel for the workbook) and is rebuilt
+    when the data source changes. Worker processes and notebooks open it
+    with panel_store.open_store, or through load_panel / load_raw.
+    """
+    if source is None:
+        source, fingerprint, tail = _panel_key()
+    name = os.path.splitext(os.path.basename(fingerprint[0]))[0] if source == "excel" else "bloomberg"
+    return panel_store.ensure_store(
+        panel_store.STORE_DIR / f"{name}.panel",
+        [source, fingerprint, tail],
+        lambda: _build_panel(source, fingerprint, tail),
     )
 
-    return df_merged
 
+@lru_cache(maxsize=32)
+def _panel_view(source, fingerprint, tail, end):
+    return _full_panel(source, fingerprint, tail).loc[:end]
 
-def plot_cip(end ='2025-03-01'):
+
+def load_panel(end=None):
     """
-    Reads data from Excel if excel=True, otherwise fetch from Bloomberg using xbbg.
+    Return the normalized raw panel, sliced to `end`, from the in-process cache.
 
-    After retrieving data, calculates a CIP measure and cleans outliers.
-    Finally, plots the CIP spreads for a 2010-2019 subset and the full range.
+    All entry points (load_raw, load_raw_pieces, compute_cip, plot_cip) go
+    through this function, so one process parses and normalizes the data
+    once no matter how many horizons it asks for.
 
     Parameters
     ----------
-    start : str, optional
-        Start date in 'YYYY-MM-DD' format, used if excel=False
-    end : str, optional
-        End date in 'YYYY-MM-DD' format, used if excel=False
-    excel : bool, optional
-        If True, read from a local Excel file. If False, use Bloomberg xbbg.
+    end : str or Timestamp, optional
+        Last date to include. None returns the full history.
 
     Returns
     -------
-    df_merged : pandas.DataFrame
-        Final cleaned DataFrame with CIP spreads and underlying data.
-    """
-    start = '2010-01-01'
-    if BLOOMBERG == False:
-        possible_paths = [
-            "./data_manual/CIP_2025.xlsx",
-            "../data_manual/CIP_2025.xlsx",
-        ]
-
-        data = None
-        for filepath in possible_paths:
-            if os.path.exists(filepath):
-                try:
-                    data = pd.read_excel(filepath, sheet_name=None)
-                    break
-                except Exception as e:
-                    print(f"Error loading {filepath}: {e}")
-            else:
-                pass
-        if data is None:
-            raise FileNotFoundError("Could not find or load the CIP_2025.xlsx file in any of the expected locations")
-
-        df_spot = data["Spot"]
-        exchange_rates = df_spot.set_index("Date")
-
-        df_forward = data["Forward"]
-        forward_rates = df_forward.set_index("Date")
-
-        df_ir = data["OIS"]
-        interest_rates = df_ir.set_index("Date")
-        # Standard columns
-        cols = ["AUD", "CAD", "CHF", "EUR", "GBP", "JPY", "NZD", "SEK"]
-        exchange_rates.columns = cols
-        forward_rates.columns = cols
-
-        # Convert forward points to forward rates
-        # Non-JPY: forward points are per 10,000; JPY: per 100
-        forward_rates[[c for c in cols if c != 'JPY']] /= 10000
-        forward_rates['JPY'] /= 100
-        forward_rates = exchange_rates + forward_rates
-
-        # Rename to keep track
-        exchange_rates.columns = [f"{name}_CURNCY" for name in exchange_rates.columns]
-        forward_rates.columns = [f"{name}_CURNCY3M" for name in forward_rates.columns]
-        interest_rates.columns = [f"{name}_IR" for name in interest_rates.columns]
-
-        # Merge
-        df_merged = (
-            exchange_rates
-            .merge(forward_rates, left_index=True, right_index=True, how='inner')
-            .merge(interest_rates, left_index=True, right_index=True, how='inner')
-        )
+    pandas.DataFrame
+        A shallow copy over read-only data: new columns may be added to it,
+        but the shared spot/forward/OIS values cannot be written to.
+    """
+    return _panel_view(*_panel_key(), end).copy(deep=False)
 
-        # Convert to reciprocal for these currencies
-        reciprocal_currencies = ['EUR', 'GBP', 'AUD', 'NZD']
-        for ccy in reciprocal_currencies:
-            df_merged[f"{ccy}_CURNCY"] = 1.0 / df_merged[f"{ccy}_CURNCY"]
-            df_merged[f"{ccy}_CURNCY3M"] = 1.0 / df_merged[f"{ccy}_CURNCY3M"]
 
-    else:
-        # 2) Pull from Bloomberg
-        df_merged = fetch_bloomberg_historical_data(start, end)
+def clear_panel_cache():
+    """Drop all in-process panels (the on-disk Parquet cache is kept)."""
+    _panel_view.cache_clear()
+    _full_panel.cache_clear()
+    _full_spreads.cache_clear()
+    _full_term_panel.cache_clear()
 
-    # List of all the core currencies
-    currencies = ['AUD', 'CAD', 'CHF', 'EUR', 'GBP', 'JPY', 'NZD', 'SEK']
 
-    ######################################
-    # Compute the log CIP basis in basis points
-    ######################################
-    for ccy in currencies:
-        fwd_col    = f'{ccy}_CURNCY3M'
-        spot_col   = f'{ccy}_CURNCY'
-        ir_col     = f'{ccy}_IR'
-        usd_ir_col = 'USD_IR'  # The US interest rate column
-
-        # CIP in log terms (bps) = 100*100 x [ domestic_i - (logF - logS)*(360/90) - foreign_i ]
-        cip_col = f'CIP_{ccy}_ln'
-        df_merged[cip_col] = 100*100 * (
-            (df_merged[ir_col] / 100.0)               # domestic interest rate
-            - (360.0 / 90.0) * (
-                np.log(df_merged[fwd_col]) - np.log(df_merged[spot_col])
+
+
+def _default_bloomberg_client():
+    """Return the xbbg `blp` module, imported only when a pull is requested."""
+    from xbbg import blp
+    return blp
+
+
+def _date_chunks(start_date, end_date, chunk_years=5):
+    """
+    Split [start_date, end_date] into consecutive ranges of at most `chunk_years`.
+
+    Examples
+    --------
+    >>> _date_chunks("2010-01-01", "2019-12-31", chunk_years=5)
+    [('2010-01-01', '2014-12-31'), ('2015-01-01', '2019-12-31')]
+    """
+    start = pd.Timestamp(start_date)
+    end = pd.Timestamp(end_date)
+    chunks = []
+    while start <= end:
+        chunk_end = min(start + pd.DateOffset(years=chunk_years) - pd.Timedelta(days=1), end)
+        chunks.append((start.strftime("%Y-%m-%d"), chunk_end.strftime("%Y-%m-%d")))
+        start = chunk_end + pd.Timedelta(days=1)
+    return chunks
+
+
+def _flatten_bdh(df, tickers, field="PX_LAST"):
+    """
+    Turn a `bdh` result into a date-indexed frame with one column per ticker.
+
+    Columns come back from xbbg as a (ticker, field) MultiIndex; they are
+    matched by ticker name (case-insensitively), not by position, and
+    returned in the order of `tickers`.
+    """
+    if df is None or df.empty:
+        return pd.DataFrame(columns=tickers, index=pd.DatetimeIndex([], name="Date"), dtype=float)
+    df = df.copy()
+    if "date" in df.columns:
+        df = df.set_index("date")
+    if isinstance(df.columns, pd.MultiIndex):
+        df = df.xs(field, axis=1, level=-1)
+    by_upper = {str(c).upper(): c for c in df.columns}
+    df = df[[by_upper[t.upper()] for t in tickers if t.upper() in by_upper]]
+    df.columns = [t for t in tickers if t.upper() in by_upper]
+    df.index = pd.DatetimeIndex(pd.to_datetime(df.index), name="Date")
+    return df.reindex(columns=tickers).astype(float)
+
+
+def fetch_bloomberg_history(tickers_by_group, start_date, end_date, client=None,
+                            fields=("PX_LAST",), max_workers=4, chunk_years=5):
+    """
+    Pull several ticker groups over a date range concurrently.
+
+    Every (group, date chunk) pair is one `bdh` request on a bounded thread
+    pool; the chunks of each group are stitched back together in date order.
+
+    Parameters
+    ----------
+    tickers_by_group : dict
+        Group name -> list of tickers.
+    start_date, end_date : str
+        'YYYY-MM-DD' bounds of the pull.
+    client : object, optional
+        Anything with a ``bdh(tickers, flds, start_date, end_date)`` method
+        returning an xbbg-style frame. Defaults to ``xbbg.blp``; tests and
+        benchmarks pass a local fake.
+    fields : tuple of str, optional
+    max_workers : int, optional
+        Upper bound on concurrent requests.
+    chunk_years : int, optional
+        Length of each date chunk.
+
+    Returns
+    -------
+    dict
+        Group name -> date-indexed frame with one column per ticker.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    client = client if client is not None else _default_bloomberg_client()
+    chunks = _date_chunks(start_date, end_date, chunk_years)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            (group, chunk): pool.submit(
+                client.bdh,
+                tickers=list(tickers),
+                flds=list(fields),
+                start_date=chunk[0],
+                end_date=chunk[1],
             )
-            - (df_merged[usd_ir_col] / 100.0)         # foreign interest rate (USD)
+            for group, tickers in tickers_by_group.items()
+            for chunk in chunks
+        }
+        results = {}
+        for group, tickers in tickers_by_group.items():
+            pieces = [_flatten_bdh(futures[(group, chunk)].result(), tickers, fields[0]) for chunk in chunks]
+            stitched = pd.concat(pieces).sort_index()
+            results[group] = stitched[~stitched.index.duplicated(keep="last")]
+    return results
+
+
+def fetch_bloomberg_historical_data(start_date="2010-01-01", end_date="2025-12-31", client=None,
+                                    max_workers=4, chunk_years=5, use_store=True, store_dir=None):
+    """
+    Fetch historical data from Bloomberg using xbbg for the tickers in the currency universe,
+    clean up the data, and merge into a single DataFrame similar to the existing process.
+
+    The interest rate, forward point and spot groups are requested
+    concurrently and long ranges are split into date chunks, see
+    fetch_bloomberg_history. With `use_store`, only the date ranges missing
+    from the local per-ticker store are requested, see bloomberg_store.
+
+    Parameters
+    ----------
+    start_date : str, optional
+        Start date in 'YYYY-MM-DD' format, defaults to "2010-01-01"
+    end_date : str, optional
+        End date in 'YYYY-MM-DD' format, defaults to "2025-12-31"
+    client : object, optional
+        Bloomberg client with a `bdh` method; defaults to ``xbbg.blp``.
+    max_workers : int, optional
+        Maximum number of concurrent requests.
+    chunk_years : int, optional
+        Length in years of each date chunk.
+    use_store : bool, optional
+        If True (default), serve already-pulled dates from the local store.
+    store_dir : str or Path, optional
+        Location of the local store; defaults to DATA_DIR/bloomberg.
+
+    Returns
+    -------
+    pandas.DataFrame
+        A merged DataFrame containing all the processed historical data
+        (spot rates, swap rates, interest rates) for every currency in the
+        currency universe table (with USD as reference).
+    """
+    exchange_rates_df, forward_rates_df, interest_rates_df, universe = _fetch_bloomberg_sheets(
+        start_date, end_date, client, max_workers, chunk_years, use_store, store_dir)
+
+    # Same conventions as the workbook: forward points -> outrights, merge
+    # and reciprocal quotes, all driven by the universe table
+    return normalize_sheets(exchange_rates_df, forward_rates_df, interest_rates_df, universe)
+
+
+def _fetch_bloomberg_sheets(start_date, end_date, client=None, max_workers=4, chunk_years=5,
+                            use_store=True, store_dir=None):
+    """Raw spot, forward-point and OIS frames for the universe, plus the universe table."""
+    def fetch(tickers_by_group, start, end):
+        return fetch_bloomberg_history(
+            tickers_by_group,
+            start,
+            end,
+            client=client,
+            max_workers=max_workers,
+            chunk_years=chunk_years,
         )
 
-    ######################################
-    # Rolling outlier cleanup (45-day window)
-    ######################################
-    window_size = 45
-    for ccy in currencies:
-        cip_col = f'CIP_{ccy}_ln'
-        if cip_col not in df_merged.columns:
-            continue
+    # One combined request per field for the whole universe
+    universe = currency_universe.load_universe()
+    tickers = currency_universe.bloomberg_tickers(universe)
+    all_tickers = list(dict.fromkeys(tickers["spot"] + tickers["forward"] + tickers["ois"]))
+    if use_store:
+        history = bloomberg_store.fetch_incremental(
+            {"all": all_tickers}, start_date, end_date, fetch, store_dir=store_dir
+        )["all"]
+    else:
+        history = fetch({"all": all_tickers}, start_date, end_date)["all"]
 
-        # Rolling median over 45 days
-        rolling_median = df_merged[cip_col].rolling(window_size).median()
+    return history[tickers["spot"]], history[tickers["forward"]], history[tickers["ois"]], universe
 
-        # Absolute deviation from median
-        abs_dev = (df_merged[cip_col] - rolling_median).abs()
 
-        # Rolling mean of abs_dev (proxy for MAD)
-        rolling_mad = abs_dev.rolling(window_size).mean()
+@instrumentation.instrumented("plot_spreads", rows=None)
+def plot_spreads(spreads_df, yr, output_dir=".", formats=("pdf", "png"), dpi=300,
+                 screen_dpi=100, method="lttb", rasterized=False):
+    """
+    Plots the CIP spreads in basis points.
+    Saves both a PDF and PNG with the specified yr suffix in the filename.
 
-        # Mark outliers (abs_dev / mad >= 10) and replace with NaN
-        outlier_mask = (abs_dev / rolling_mad) >= 10
-        df_merged.loc[outlier_mask, cip_col] = np.nan
+    Each series is first downsampled to about one point per pixel column of
+    the axes at `screen_dpi` (see downsample), which keeps spikes and gaps
+    but cuts the PDF's path vertices about threefold for the daily panel.
+    The figure is built once and saved in every format.
 
-    # Create a separate DataFrame for the CIP columns
-    cip_cols = [f'CIP_{c}_ln' for c in currencies if f'CIP_{c}_ln' in df_merged.columns]
-    spreads = df_merged[cip_cols].copy()
+    Parameters
+    ----------
+    spreads_df : pandas.DataFrame
+        Date-indexed spreads, one column per currency.
+    yr : str
+        Suffix of the file names, spread_plot_<yr>.<fmt>.
+    output_dir : str or Path, optional
+        Directory for the files (the working directory by default).
+    formats : sequence of str, optional
+    dpi : int, optional
+        Resolution of the PNG and of the rasterized lines in the PDF.
+    screen_dpi : int, optional
+        Resolution that sets the downsampling target; None keeps every point.
+    method : {"lttb", "minmax"}, optional
+        Downsampling method.
+    rasterized : bool, optional
+        Rasterize the line layer in vector outputs (axes, labels and legend
+        stay vector), e.g. for dense series plotted with screen_dpi=None.
 
-    # Shorten column names for plotting
-    spreads.columns = [c[4:7] for c in spreads.columns]  # e.g., CIP_AUD_ln -> AUD
+    Returns
+    -------
+    matplotlib.figure.Figure
+    """
+    import matplotlib.pyplot as plt
+    import matplotlib.dates as mdates
 
+    fig, ax = plt.subplots(figsize=(13, 8), dpi=dpi)
 
+    # Target points per series: the axes width in pixels at screen resolution
+    n_out = None
+    if screen_dpi:
+        n_out = int(fig.get_figwidth() * ax.get_position().width * screen_dpi)
 
+    series_by_column = {}
+    for column in spreads_df.columns:
+        series = spreads_df[column]
+        if n_out:
+            series = downsample.downsample_series(series, n_out, method=method)
+        series_by_column[column] = series
 
+    # Plot each column in the DataFrame
+    for column, series in series_by_column.items():
+        ax.plot(series.index, series.to_numpy(), label=column, linewidth=1, antialiased=True,
+                rasterized=rasterized)
 
-    def plot_spreads(spreads_df, yr):
-        """
-        Plots the CIP spreads in basis points.
-        Saves both a PDF and PNG with the specified yr suffix in the filename.
-        """
-        fig, ax = plt.subplots(figsize=(13, 8), dpi=300)
+    ax.set_xlabel("Dates", fontsize=14)
+    ax.set_ylabel("Arbitrage Spread (bps)", fontsize=14)
 
-        # Plot each column in the DataFrame
-        for column in spreads_df.columns:
-            ax.plot(spreads_df.index, spreads_df[column], label=column, linewidth=1, antialiased=True)
+    # Format the x-axis for years
+    ax.xaxis.set_major_locator(mdates.YearLocator(2))
+    ax.xaxis.set_minor_locator(mdates.YearLocator(1))
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
+    ax.tick_params(axis="x", labelrotation=0)
 
-        ax.set_xlabel("Dates", fontsize=14)
-        ax.set_ylabel("Arbitrage Spread (bps)", fontsize=14)
+    # Horizontal grid lines only
+    ax.yaxis.grid(True, linestyle="--", alpha=0.5)
+    ax.xaxis.grid(False)
 
-        # Format the x-axis for years
-        ax.xaxis.set_major_locator(mdates.YearLocator(2))
-        ax.xaxis.set_minor_locator(mdates.YearLocator(1))
-        ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
-        plt.xticks(rotation=0)
+    # Hard limit the y-axis
+    ax.set_ylim([-50, 210])
 
-        # Horizontal grid lines only
-        ax.yaxis.grid(True, linestyle="--", alpha=0.5)
-        ax.xaxis.grid(False)
+    # Legend below the plot
+    ax.legend(loc='upper center', bbox_to_anchor=(0.5, -0.2), ncol=4, fontsize=12, frameon=True)
 
-        # Hard limit the y-axis
-        ax.set_ylim([-50, 210])
+    # Remove top and right spines
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
 
-        # Legend below the plot
-        ax.legend(loc='upper center', bbox_to_anchor=(0.5, -0.2), ncol=4, fontsize=12, frameon=True)
+    fig.tight_layout(rect=[0, 0.15, 1, 1])  # ensure legend fits
 
-        # Remove top and right spines
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
+    os.makedirs(output_dir, exist_ok=True)
+    for fmt in formats:
+        fig.savefig(os.path.join(output_dir, f"spread_plot_{yr}.{fmt}"), format=fmt, dpi=dpi, bbox_inches='tight')
+    return fig
 
-        plt.tight_layout(rect=[0, 0.15, 1, 1])  # ensure legend fits
 
-        plt.savefig(f"spread_plot_{yr}.pdf", format="pdf", bbox_inches='tight')
-        plt.savefig(f"spread_plot_{yr}.png", dpi=300, bbox_inches='tight')
+def plot_cip(end ='2025-03-01'):
+    """
+    Plot the cleaned CIP spreads from the start of the data up to `end`.
 
-    # Plot from start to 2019, and the full range
-    if isinstance(df_merged.index, pd.DatetimeIndex):
-        plot_spreads(spreads.loc[:end], 'rep')
+    The spreads come from compute_cip (computed once on the full history)
+    and the figure is written by plot_spreads with the 'rep' suffix.
+
+    Parameters
+    ----------
+    end : str, optional
+        Last date to plot, in 'YYYY-MM-DD' format.
+
+    Returns
+    -------
+    spreads : pandas.DataFrame
+        The plotted spreads, up to `end`, one column per currency (e.g. AUD).
+    """
+    # Cleaned spreads, a slice of the full-history result shared with compute_cip
+    spreads = compute_cip(end=end)
+
+    # Shorten column names for plotting
+    spreads.columns = [c[4:7] for c in spreads.columns]  # e.g., CIP_AUD_ln -> AUD
+
+    # Plot from start to the end date
+    if isinstance(spreads.index, pd.DatetimeIndex):
+        plot_spreads(spreads, 'rep')
+    return spreads
 
 
+def _deprecated_argument(function, name):
+    warnings.warn(
+        f"{function}({name}=...) is deprecated and ignored; use plot_cip to plot the spreads.",
+        DeprecationWarning,
+        stacklevel=3,
+    )
 
 
-def load_raw(end ='2025-03-01', plot = False):
+def load_raw(end ='2025-03-01', plot = False, start=None, columns=None):
     """
-    Reads data from Excel if excel=True, otherwise fetch from Bloomberg using xbbg.
+    Return the normalized spot, forward and OIS panel up to `end`.
 
-    After retrieving data, calculates a CIP measure and cleans outliers.
-    Finally, plots the CIP spreads for a 2010-2019 subset and the full range.
+    The data come from the workbook or Bloomberg (see BLOOMBERG) through
+    the shared in-process panel, see load_panel.
 
     Parameters
     ----------
+    end : str, tuple or list, optional
+        Last date in 'YYYY-MM-DD' format (None for the full history), a
+        ``(start, end)`` window, or a list of those.
+    plot : bool, optional
+        Deprecated and ignored; use plot_cip.
     start : str, optional
-        Start date in 'YYYY-MM-DD' format, used if excel=False
-    end : str, optional
-        End date in 'YYYY-MM-DD' format, used if excel=False
-    excel : bool, optional
-        If True, read from a local Excel file. If False, use Bloomberg xbbg.
+        First date in 'YYYY-MM-DD' format.
+    columns : list of str, optional
+        With `start` or `columns`, only that date range and those columns
+        are read from the year-partitioned panel dataset (see read_panel)
+        instead of slicing the full in-process panel.
 
     Returns
     -------
-    df_merged : pandas.DataFrame
-        Final cleaned DataFrame with CIP spreads and underlying data.
-    """
-
-    start = '2010-01-01'
-    if BLOOMBERG == False:
-        possible_paths = [
-            "./data_manual/CIP_2025.xlsx",
-            "../data_manual/CIP_2025.xlsx",
-        ]
-
-        data = None
-        for filepath in possible_paths:
-            if os.path.exists(filepath):
-                try:
-                    data = pd.read_excel(filepath, sheet_name=None)
-                    break
-                except Exception as e:
-                    print(f"Error loading {filepath}: {e}")
-            else:
-                pass
-        if data is None:
-            download()
-        data = pd.read_excel(filepath, sheet_name=None, parse_dates=['Date'])
-
-        df_spot = data["Spot"]
-        exchange_rates = df_spot.set_index("Date")
-
-        df_forward = data["Forward"]
-        forward_rates = df_forward.set_index("Date")
-
-        df_ir = data["OIS"]
-        interest_rates = df_ir.set_index("Date")
-
-        # Standard columns
-        cols = ["AUD", "CAD", "CHF", "EUR", "GBP", "JPY", "NZD", "SEK"]
-        exchange_rates.columns = cols
-        forward_rates.columns = cols
-
-        # Convert forward points to forward rates
-        # Non-JPY: forward points are per 10,000; JPY: per 100
-        forward_rates[[c for c in cols if c != 'JPY']] /= 10000
-        forward_rates['JPY'] /= 100
-        forward_rates = exchange_rates + forward_rates
-
-        # Rename to keep track
-        exchange_rates.columns = [f"{name}_CURNCY" for name in exchange_rates.columns]
-        forward_rates.columns = [f"{name}_CURNCY3M" for name in forward_rates.columns]
-        interest_rates.columns = [f"{name}_IR" for name in interest_rates.columns]
-
-        # Merge
-        df_merged = (
-            exchange_rates
-            .merge(forward_rates, left_index=True, right_index=True, how='inner')
-            .merge(interest_rates, left_index=True, right_index=True, how='inner')
-        )
+    df_merged : pandas.DataFrame or dict
+        <CCY>_CURNCY, <CCY>_CURNCY3M and <CCY>_IR columns; for a list, a
+        dict mapping each horizon to its frame.
+    """
+    if plot:
+        _deprecated_argument("load_raw", "plot")
+
+    if (start is not None or columns is not None) and not isinstance(end, list):
+        return read_panel(start, end, columns)
+    if isinstance(end, list):
+        panel = load_panel()
+        return {horizon: _horizon_slice(panel, horizon) for horizon in end}
+    return load_panel(end)
+
+######################################
+# Year-partitioned datasets
+######################################
+def panel_dataset_path():
+    """
+    Year-partitioned Parquet dataset of the normalized panel, built on first use.
 
-        # Convert to reciprocal for these currencies
-        reciprocal_currencies = ['EUR', 'GBP', 'AUD', 'NZD']
-        for ccy in reciprocal_currencies:
-            df_merged[f"{ccy}_CURNCY"] = 1.0 / df_merged[f"{ccy}_CURNCY"]
-            df_merged[f"{ccy}_CURNCY3M"] = 1.0 / df_merged[f"{ccy}_CURNCY3M"]
+    It lives in DATA_DIR/datasets/panel and is rebuilt when the raw data
+    source changes.
+    """
+    source, fingerprint, tail = _panel_key()
+    return panel_dataset.ensure_dataset(
+        panel_dataset.DATASET_DIR / "panel",
+        [source, fingerprint, tail],
+        lambda: _full_panel(source, fingerprint, tail),
+    )
 
 
-    else:
-        # 2) Pull from Bloomberg
-        df_merged = fetch_bloomberg_historical_data(start, end)
+def spreads_dataset_path():
+    """Year-partitioned Parquet dataset of the cleaned spreads (DATA_DIR/datasets/spreads)."""
+    source, fingerprint, tail = _panel_key()
+    backend = _cip_backend()
+    return panel_dataset.ensure_dataset(
+        panel_dataset.DATASET_DIR / "spreads",
+        [source, fingerprint, tail, backend],
+        lambda: _full_spreads(source, fingerprint, backend, _cip_executor(), tail),
+    )
 
 
-    return df_merged.loc[:end]
+def read_panel(start=None, end=None, columns=None):
+    """
+    Normalized panel between `start` and `end`, reading only what is needed.
 
-def compute_cip(end = '2020-01-01'):
-    df_merged = load_raw(end = end)
+    Only the year partitions overlapping the range and the requested columns
+    are loaded from the panel dataset, so a short window does not
+    materialize the whole history.
+
+    Parameters
+    ----------
+    start, end : str or Timestamp, optional
+        Inclusive date bounds; None for the first / last date.
+    columns : list of str, optional
+        E.g. ``["AUD_CURNCY", "AUD_CURNCY3M", "AUD_IR", "USD_IR"]``.
+
+    Returns
+    -------
+    pandas.DataFrame
+    """
+    return panel_dataset.read_dataset(panel_dataset_path(), start, end, columns)
+
+
+def read_spreads(start=None, end=None, columns=None):
+    """
+    Cleaned CIP spreads between `start` and `end`, from the spreads dataset.
+
+    Rows equal the matching rows of compute_cip(None): the outlier filter
+    ran on the full history when the dataset was built.
+    """
+    return panel_dataset.read_dataset(spreads_dataset_path(), start, end, columns)
+
+
+def _cip_backend():
+    backend = settings.config("CIP_BACKEND")
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown CIP_BACKEND {backend!r}; expected one of {BACKENDS}")
+    return backend
+
+
+def _cip_executor():
+    executor = settings.config("CIP_EXECUTOR")
+    if executor not in EXECUTORS:
+        raise ValueError(f"Unknown CIP_EXECUTOR {executor!r}; expected one of {EXECUTORS}")
+    return executor
+
+
+@lru_cache(maxsize=4)
+def _full_spreads(source, fingerprint, backend="pandas", executor="serial", tail=None):
+    """
+    Cleaned CIP spreads over the full history of a source, computed once.
+
+    The outlier filter only looks back (a trailing 45-day window), so any
+    prefix of this frame equals the spreads computed on that prefix alone.
+    With `tail`, the rows appended with cip_incremental follow, as they were
+    cleaned when appended.
+    """
+    if tail is not None:
+        spreads = _full_spreads(source, fingerprint, backend, executor)
+        _, appended = _incremental().load_tail()
+        return pd.concat([spreads, appended.loc[appended.index > spreads.index[-1]]])
+
+    if backend == "polars":
+        return _full_spreads_polars(source, fingerprint)
+
+    df_merged = _full_panel(source, fingerprint)
 
     # List of all the core currencies
-    currencies = ['AUD', 'CAD', 'CHF', 'EUR', 'GBP', 'JPY', 'NZD', 'SEK']
+    currencies = cip_engine.CURRENCIES
+
+    if executor == "process":
+        try:
+            import src.parallel_cip as parallel_cip
+        except ModuleNotFoundError:
+            import parallel_cip as parallel_cip
+        # Basis and outlier filter per block of currencies, in worker processes
+        with instrumentation.stage("cip_parallel", rows=len(df_merged)):
+            return parallel_cip.compute_clean_spreads(
+                df_merged, currencies, workers=settings.config("CIP_WORKERS"), window=45, threshold=10.0
+            )
 
     ######################################
     # Compute the log CIP basis in basis points
     ######################################
-    for ccy in currencies:
-        fwd_col = f'{ccy}_CURNCY3M'
-        spot_col = f'{ccy}_CURNCY'
-        ir_col = f'{ccy}_IR'
-        usd_ir_col = 'USD_IR'  # The US interest rate column
-
-        # CIP in log terms (bps) = 100*100 x [ domestic_i - (logF - logS)*(360/90) - foreign_i ]
-        cip_col = f'CIP_{ccy}_ln'
-        df_merged[cip_col] = 100 * 100 * (
-                (df_merged[ir_col] / 100.0)  # domestic interest rate
-                - (360.0 / 90.0) * (
-                        np.log(df_merged[fwd_col]) - np.log(df_merged[spot_col])
-                )
-                - (df_merged[usd_ir_col] / 100.0)  # foreign interest rate (USD)
-        )
+    # One broadcast over the (date x currency) blocks, see cip_engine
+    with instrumentation.stage("cip", rows=len(df_merged)):
+        spreads = cip_engine.compute_cip_basis(df_merged, currencies)
 
     ######################################
     # Rolling outlier cleanup (45-day window)
     ######################################
-    window_size = 45
-    for ccy in currencies:
-        cip_col = f'CIP_{ccy}_ln'
-        if cip_col not in df_merged.columns:
-            continue
+    # Outliers (abs dev from the rolling median >= 10x its rolling mean)
+    # are replaced with NaN, all currencies at once, see outlier_filter
+    with instrumentation.stage("outlier_filter", rows=len(spreads)):
+        outlier_filter.filter_outliers(spreads, window=45, threshold=10.0, inplace=True)
+    return spreads
+
+
+def _full_spreads_polars(source, fingerprint):
+    """_full_spreads as one polars query, from the raw sheets (see polars_backend)."""
+    try:
+        import src.polars_backend as polars_backend
+    except ModuleNotFoundError:
+        import polars_backend as polars_backend
+
+    if source == "excel":
+        sheets = polars_backend.scan_workbook_sheets(_workbook_path(), _read_workbook_sheets, WORKBOOK_SHEETS)
+        universe = None
+    else:
+        *sheets, universe = _fetch_bloomberg_sheets("2010-01-01", fingerprint)
+    with instrumentation.stage("polars_pipeline") as stage:
+        spreads, _ = polars_backend.cip_pipeline(*sheets, universe)
+        spreads = polars_backend.spreads_to_pandas(spreads.collect())
+        stage.rows = len(spreads)
+    return spreads
 
-        # Rolling median over 45 days
-        rolling_median = df_merged[cip_col].rolling(window_size).median()
 
-        # Absolute deviation from median
-        abs_dev = (df_merged[cip_col] - rolling_median).abs()
+def _horizon_slice(frame, horizon):
+    """Rows of `frame` up to an end date, or within a (start, end) window."""
+    if isinstance(horizon, tuple):
+        start, end = horizon
+        return frame.loc[start:end]
+    return frame.loc[:horizon]
 
-        # Rolling mean of abs_dev (proxy for MAD)
-        rolling_mad = abs_dev.rolling(window_size).mean()
 
-        # Mark outliers (abs_dev / mad >= 10) and replace with NaN
-        outlier_mask = (abs_dev / rolling_mad) >= 10
-        df_merged.loc[outlier_mask, cip_col] = np.nan
+def compute_cip(end = '2020-01-01'):
+    """
+    Compute the cleaned log CIP basis (bps) for one or several horizons.
 
-    # Create a separate DataFrame for the CIP columns
-    cip_cols = [f'CIP_{c}_ln' for c in currencies if f'CIP_{c}_ln' in df_merged.columns]
-    spreads = df_merged[cip_cols].copy()
+    The basis and the rolling outlier filter are evaluated once on the full
+    history (and memoized per data source), followed by any rows appended
+    with cip_incremental.append_rows; every horizon is a slice of that
+    result, so asking for several horizons costs one computation. The
+    CIP_BACKEND setting picks the pandas or the polars implementation, and
+    CIP_EXECUTOR=process spreads the pandas one over CIP_WORKERS processes.
 
-    # Shorten column names for plotting
-    spreads.columns = [c[4:7] for c in spreads.columns]  # e.g., CIP_AUD_ln -> AUD
+    Parameters
+    ----------
+    end : str, Timestamp, tuple or list, optional
+        Last date to include (None for the full history), a
+        ``(start, end)`` window, or a list of those. Windows are slices of
+        the full-history result, so their first days are filtered with the
+        preceding history.
 
-    return df_merged.iloc[:, -8:]
+    Returns
+    -------
+    pandas.DataFrame or dict
+        One CIP_<CCY>_ln column per currency; for a list, a dict mapping
+        each requested horizon to its frame.
+    """
+    source, fingerprint, tail = _panel_key()
+    spreads = _full_spreads(source, fingerprint, _cip_backend(), _cip_executor(), tail)
+    if isinstance(end, list):
+        return {horizon: _horizon_slice(spreads, horizon).copy() for horizon in end}
+    return _horizon_slice(spreads, end).copy()
 
 
 def load_raw_pieces(end ='2025-03-01',excel=False, plot = False):
     """
-    Reads data from Excel if excel=True, otherwise fetch from Bloomberg using xbbg.
+    Return the spot, forward and OIS blocks of the full-history panel.
 
-    After retrieving data, calculates a CIP measure and cleans outliers.
-    Finally, plots the CIP spreads for a 2010-2019 subset and the full range.
+    The data source is set by BLOOMBERG, not by the arguments.
 
     Parameters
     ----------
-    start : str, optional
-        Start date in 'YYYY-MM-DD' format, used if excel=False
     end : str, optional
-        End date in 'YYYY-MM-DD' format, used if excel=False
+        Unused; the full history is returned, as it always has been.
     excel : bool, optional
-        If True, read from a local Excel file. If False, use Bloomberg xbbg.
+        Deprecated and ignored; the source is set by BLOOMBERG.
+    plot : bool, optional
+        Deprecated and ignored; use plot_cip.
 
     Returns
     -------
-    df_merged : pandas.DataFrame
-        Final cleaned DataFrame with CIP spreads and underlying data.
-    """
-    start = '2010-01-01'
-    if BLOOMBERG == False:
-        possible_paths = [
-            "./data_manual/CIP_2025.xlsx",
-            "../data_manual/CIP_2025.xlsx",
-        ]
-
-        data = None
-        for filepath in possible_paths:
-            if os.path.exists(filepath):
-                try:
-                    data = pd.read_excel(filepath, sheet_name=None)
-                    break
-                except Exception as e:
-                    print(f"Error loading {filepath}: {e}")
-            else:
-                pass
-        df_spot = data["Spot"]
-        exchange_rates = df_spot.set_index("Date")
-
-        df_forward = data["Forward"]
-        forward_rates = df_forward.set_index("Date")
-
-        df_ir = data["OIS"]
-        interest_rates = df_ir.set_index("Date")
-
-        # Standard columns
-        cols = ["AUD", "CAD", "CHF", "EUR", "GBP", "JPY", "NZD", "SEK"]
-        exchange_rates.columns = cols
-        forward_rates.columns = cols
-
-        # Convert forward points to forward rates
-        # Non-JPY: forward points are per 10,000; JPY: per 100
-        forward_rates[[c for c in cols if c != 'JPY']] /= 10000
-        forward_rates['JPY'] /= 100
-        forward_rates = exchange_rates + forward_rates
-
-        # Rename to keep track
-        exchange_rates.columns = [f"{name}_CURNCY" for name in exchange_rates.columns]
-        forward_rates.columns = [f"{name}_CURNCY3M" for name in forward_rates.columns]
-        interest_rates.columns = [f"{name}_IR" for name in interest_rates.columns]
-
-        # Merge
-        df_merged = (
-            exchange_rates
-            .merge(forward_rates, left_index=True, right_index=True, how='inner')
-            .merge(interest_rates, left_index=True, right_index=True, how='inner')
+    exchange_rates_df, forward_rates_df, interest_rates_df : pandas.DataFrame
+        <CCY>_CURNCY, <CCY>_CURNCY3M and <CCY>_IR (with USD_IR) columns.
+    """
+    if excel:
+        warnings.warn(
+            "load_raw_pieces(excel=...) is deprecated and ignored; the data source is set by BLOOMBERG.",
+            DeprecationWarning,
+            stacklevel=2,
         )
+    if plot:
+        _deprecated_argument("load_raw_pieces", "plot")
+    df_merged = load_panel()
+
+    currencies = currency_universe.currencies()
+    exchange_rates_df = df_merged[[f"{ccy}_CURNCY" for ccy in currencies]]
+    forward_rates_df = df_merged[[f"{ccy}_CURNCY3M" for ccy in currencies]]
+    interest_rates_df = df_merged[[f"{ccy}_IR" for ccy in currencies + [currency_universe.USD]]]
+
+    return exchange_rates_df, forward_rates_df, interest_rates_df
+
+
+######################################
+# Multi-tenor term structure
+######################################
+def _term_sheet_names(tenor):
+    """Workbook sheets with the forward points and OIS rates of `tenor`."""
+    if tenor == "3M":
+        return "Forward", "OIS"
+    return f"Forward_{tenor}", f"OIS_{tenor}"
+
+
+def normalize_term_sheets(exchange_rates, forward_points, interest_rates, universe=None):
+    """
+    Normalize spot, forward points and OIS rates for several tenors at once.
+
+    Forward points of all tenors are held in one (date x currency x tenor)
+    block and converted to outright forwards in place, with the same
+    conventions as normalize_sheets.
+
+    Parameters
+    ----------
+    exchange_rates : pandas.DataFrame
+        Spot quotes, one column per currency in universe order.
+    forward_points, interest_rates : dict
+        Tenor -> sheet (forward points / OIS in percent, the OIS sheets with
+        a trailing USD column), in the same tenor order.
+    universe : pandas.DataFrame, optional
+
+    Returns
+    -------
+    pandas.DataFrame
+        <CCY>_CURNCY, <CCY>_CURNCY<tenor> and <CCY>_IR<tenor> (including
+        USD) columns on the dates common to every sheet.
+    """
+    universe = universe if universe is not None else currency_universe.load_universe()
+    cols = currency_universe.currencies(universe)
+    ois_cols = cols + [currency_universe.USD]
+    tenors = list(forward_points)
+    k, t = len(cols), len(tenors)
+
+    index = exchange_rates.index
+    for tenor in tenors:
+        index = index.intersection(forward_points[tenor].index, sort=False)
+        index = index.intersection(interest_rates[tenor].index, sort=False)
+
+    def take(sheet, width):
+        if sheet.shape[1] != width:
+            raise ValueError(f"Sheet has {sheet.shape[1]} columns but the currency universe needs {width}.")
+        return np.take(sheet.to_numpy(dtype=float), sheet.index.get_indexer(index), axis=0)
+
+    spot = take(exchange_rates, k)
+    forward = np.empty((len(index), k, t))
+    ois = np.empty((len(index), k + 1, t))
+    for j, tenor in enumerate(tenors):
+        forward[:, :, j] = take(forward_points[tenor], k)
+        ois[:, :, j] = take(interest_rates[tenor], k + 1)
+
+    currency_universe.apply_quote_conventions(spot, forward, universe)
+
+    values = np.concatenate(
+        [spot, forward.reshape(len(index), k * t), ois.reshape(len(index), (k + 1) * t)], axis=1
+    )
+    columns = (
+        [f"{ccy}_CURNCY" for ccy in cols]
+        + [f"{ccy}_CURNCY{tenor}" for ccy in cols for tenor in tenors]
+        + [f"{ccy}_IR{tenor}" for ccy in ois_cols for tenor in tenors]
+    )
+    return pd.DataFrame(values, index=index, columns=columns, copy=False)
+
+
+def _read_term_workbook(filepath):
+    """Parse every tenor available in the workbook into one term panel."""
+    data = pd.read_excel(filepath, sheet_name=None, parse_dates=['Date'])
+    forward_points, interest_rates = {}, {}
+    for tenor in currency_universe.TENOR_OFFSETS:
+        forward_sheet, ois_sheet = _term_sheet_names(tenor)
+        if forward_sheet in data and ois_sheet in data:
+            forward_points[tenor] = data[forward_sheet].set_index("Date")
+            interest_rates[tenor] = data[ois_sheet].set_index("Date")
+    return normalize_term_sheets(data["Spot"].set_index("Date"), forward_points, interest_rates)
+
 
-        # Convert to reciprocal for these currencies
-        reciprocal_currencies = ['EUR', 'GBP', 'AUD', 'NZD']
-        for ccy in reciprocal_currencies:
-            df_merged[f"{ccy}_CURNCY"] = 1.0 / df_merged[f"{ccy}_CURNCY"]
-            df_merged[f"{ccy}_CURNCY3M"] = 1.0 / df_merged[f"{ccy}_CURNCY3M"]
+def fetch_bloomberg_term_data(start_date="2010-01-01", end_date="2025-12-31", client=None, tenors=None,
+                              max_workers=4, chunk_years=5, use_store=True, store_dir=None):
+    """
+    Fetch spot, forward points and OIS rates for every tenor in the tenor table.
+
+    All tickers go out as one bulk request (split into date chunks, and
+    only for dates missing from the local store when `use_store` is set).
+
+    Returns
+    -------
+    pandas.DataFrame
+        Term panel in the layout of normalize_term_sheets.
+    """
+    universe = currency_universe.load_universe()
+    tenor_table = currency_universe.load_tenors(tenors=tenors)
+    cols = currency_universe.currencies(universe)
+    ois_cols = cols + [currency_universe.USD]
+    spot_tickers = list(universe["spot_ticker"])
+    by_key = tenor_table.set_index(["currency", "tenor"])
+
+    tenor_list = currency_universe.tenors(tenor_table)
+    forward_tickers = {t: [by_key.loc[(c, t), "forward_ticker"] for c in cols] for t in tenor_list}
+    ois_tickers = {t: [by_key.loc[(c, t), "ois_ticker"] for c in ois_cols] for t in tenor_list}
+    all_tickers = list(dict.fromkeys(
+        spot_tickers
+        + [x for t in tenor_list for x in forward_tickers[t]]
+        + [x for t in tenor_list for x in ois_tickers[t]]
+    ))
+
+    def fetch(tickers_by_group, start, end):
+        return fetch_bloomberg_history(
+            tickers_by_group, start, end, client=client, max_workers=max_workers, chunk_years=chunk_years
+        )
 
+    if use_store:
+        history = bloomberg_store.fetch_incremental(
+            {"all": all_tickers}, start_date, end_date, fetch, store_dir=store_dir
+        )["all"]
     else:
-        # 2) Pull from Bloomberg
-        df_merged = fetch_bloomberg_historical_data(start, end)
+        history = fetch({"all": all_tickers}, start_date, end_date)["all"]
+
+    return normalize_term_sheets(
+        history[spot_tickers],
+        {t: history[forward_tickers[t]] for t in tenor_list},
+        {t: history[ois_tickers[t]] for t in tenor_list},
+        universe,
+    )
 
 
-    exchange_rates_df = df_merged.iloc[:,:8]
-    forward_rates_df = df_merged.iloc[:, 8:16]
-    interest_rates_df = df_merged.iloc[:, -9:]
+@lru_cache(maxsize=4)
+def _full_term_panel(source, fingerprint):
+    if source == "excel":
+        return panel_cache.load_or_build(_workbook_path(), _read_term_workbook, name="CIP_2025_terms")
+    return fetch_bloomberg_term_data("2010-01-01", fingerprint)
 
-    return exchange_rates_df, forward_rates_df, interest_rates_df
+
+def load_term_panel(end=None):
+    """Return the normalized multi-tenor panel, sliced to `end`."""
+    source, fingerprint = _panel_source()
+    return _full_term_panel(source, fingerprint).loc[:end].copy(deep=False)
+
+
+def term_structure_blocks(term_panel, universe=None):
+    """
+    Split a term panel into (date x currency x tenor) blocks.
+
+    Returns
+    -------
+    tuple
+        ``(tenors, spot, forward, ois, usd_ois)`` with spot (dates x
+        currencies), forward and ois (dates x currencies x tenors) and
+        usd_ois (dates x tenors).
+    """
+    universe = universe if universe is not None else currency_universe.load_universe()
+    cols = currency_universe.currencies(universe)
+    tenors = [t for t in currency_universe.TENOR_OFFSETS if f"{currency_universe.USD}_IR{t}" in term_panel.columns]
+    n, k, t = len(term_panel), len(cols), len(tenors)
+
+    spot = term_panel[[f"{ccy}_CURNCY" for ccy in cols]].to_numpy(dtype=float)
+    forward = term_panel[[f"{ccy}_CURNCY{tenor}" for ccy in cols for tenor in tenors]].to_numpy(dtype=float)
+    ois = term_panel[[f"{ccy}_IR{tenor}" for ccy in cols for tenor in tenors]].to_numpy(dtype=float)
+    usd_ois = term_panel[[f"{currency_universe.USD}_IR{tenor}" for tenor in tenors]].to_numpy(dtype=float)
+    return tenors, spot, forward.reshape(n, k, t), ois.reshape(n, k, t), usd_ois
+
+
+def compute_cip_term_structure(end=None, term_panel=None):
+    """
+    Compute the CIP basis curve (1W to 1Y) for every currency and date.
+
+    The whole (date x currency x tenor) array is evaluated in one
+    vectorized pass. Each tenor accrues over its actual calendar days on the
+    currency's own day-count basis (ACT/360 or ACT/365, from the universe
+    table), so the 3M column differs slightly from compute_cip, which keeps
+    the paper's flat 360/90 convention. Tenors without data in the source
+    are skipped.
+
+    Parameters
+    ----------
+    end : str, optional
+        Last date to include.
+    term_panel : pandas.DataFrame, optional
+        Panel in the layout of normalize_term_sheets; defaults to
+        load_term_panel(end).
+
+    Returns
+    -------
+    pandas.DataFrame
+        Basis in bps, columns a (currency, tenor) MultiIndex.
+    """
+    universe = currency_universe.load_universe()
+    if term_panel is None:
+        term_panel = load_term_panel(end)
+    else:
+        term_panel = term_panel.loc[:end]
+
+    tenors, spot, forward, ois, usd_ois = term_structure_blocks(term_panel, universe)
+    year_fraction = cip_engine.year_fractions(term_panel.index, tenors, universe["day_count"])
+    basis = cip_engine.cip_term_structure(spot, forward, ois, usd_ois, year_fraction)
+
+    columns = pd.MultiIndex.from_product(
+        [currency_universe.currencies(universe), tenors], names=["currency", "tenor"]
+    )
+    return pd.DataFrame(basis.reshape(len(term_panel), -1), index=term_panel.index, columns=columns, copy=False)
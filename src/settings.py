@@ -24,7 +24,6 @@ from pathlib import Path
 from platform import system
 
 from decouple import config as _config
-from pandas import to_datetime
 #Bloomberg indicator
 BLOOMBERG = False
 
@@ -41,6 +40,13 @@ def get_os():
         return "unknown"
 
 
+def to_datetime(value):
+    """pandas.to_datetime, with pandas imported on first use."""
+    from pandas import to_datetime as _to_datetime
+
+    return _to_datetime(value)
+
+
 def if_relative_make_abs(path):
     """If a relative path is given, make it absolute, assuming
     that it is relative to the project root directory (BASE_DIR)
@@ -72,10 +78,19 @@ d["BASE_DIR"] = Path(__file__).absolute().parent.parent
 
 # fmt: off
 ## Other .env variables
-d["START_DATE"] = _config("START_DATE", default="2010-01-01", cast=to_datetime)
-d["END_DATE"] = _config("END_DATE", default="2024-01-01", cast=to_datetime)
+# Parsed by config() on first access, so importing settings does not import pandas
+d["START_DATE"] = _config("START_DATE", default="2010-01-01")
+d["END_DATE"] = _config("END_DATE", default="2024-01-01")
 d["PIPELINE_DEV_MODE"] = _config("PIPELINE_DEV_MODE", default=True, cast=bool)
 d["PIPELINE_THEME"] = _config("PIPELINE_THEME", default="pipeline")
+d["PROFILE"] = _config("PROFILE", default=False, cast=bool)
+d["CIP_BACKEND"] = _config("CIP_BACKEND", default="pandas")  # "pandas" or "polars"
+d["CIP_EXECUTOR"] = _config("CIP_EXECUTOR", default="serial")  # "serial" or "process"
+d["CIP_WORKERS"] = _config("CIP_WORKERS", default=0, cast=int)  # 0: every core
+# SHA-256 the downloaded CIP workbook must match; empty to accept any content
+d["CIP_DATA_SHA256"] = _config(
+    "CIP_DATA_SHA256", default="c6538c7f24a80fd50b44acc758ba16eb9452c318e93076320bb438b8021e1ec0"
+)
 
 ## Paths
 d["DATA_DIR"] = if_relative_make_abs(_config('DATA_DIR', default=Path('_data'), cast=Path))
@@ -83,9 +98,17 @@ d["MANUAL_DATA_DIR"] = if_relative_make_abs(_config('MANUAL_DATA_DIR', default=P
 d["OUTPUT_DIR"] = if_relative_make_abs(_config('OUTPUT_DIR', default=Path('_output'), cast=Path))
 d["PUBLISH_DIR"] = if_relative_make_abs(_config('PUBLISH_DIR', default=Path('reports'), cast=Path))
 d["REPORTS_DIR"] = if_relative_make_abs(_config("REPORTS_DIR", default=Path("reports"), cast=Path))
+d["CACHE_DIR"] = if_relative_make_abs(_config("CACHE_DIR", default=Path("_data/cache"), cast=Path))
+d["CURRENCY_UNIVERSE"] = if_relative_make_abs(_config("CURRENCY_UNIVERSE", default=Path("src/currency_universe.csv"), cast=Path))
+d["PROFILE_DIR"] = if_relative_make_abs(_config("PROFILE_DIR", default=Path("_output/profiles"), cast=Path))
+d["CURRENCY_TENORS"] = if_relative_make_abs(_config("CURRENCY_TENORS", default=Path("src/currency_tenors.csv"), cast=Path))
 # fmt: on
 
 
+# Settings stored raw above and cast when config() first reads them
+_LAZY_CASTS = {"START_DATE": to_datetime, "END_DATE": to_datetime}
+
+
 ## Name of Stata Executable in path
 if d["OS_TYPE"] == "windows":
     d["STATA_EXE"] = _config("STATA_EXE", default="StataMP-64.exe")
@@ -100,6 +123,8 @@ def config(*args, **kwargs):
     default = kwargs.get("default", None)
     cast = kwargs.get("cast", None)
     if key in d:
+        if key in _LAZY_CASTS:
+            d[key] = _LAZY_CASTS.pop(key)(d[key])
         var = d[key]
         if default is not None:
             raise ValueError(
@@ -0,0 +1,343 @@
+"""
+Single-pass, mergeable summary statistics for CIP panels.
+
+`StatsAccumulator` reads each row of a (date x currency) panel once and
+keeps, per calendar year:
+
+- pairwise counts, means, centered sums of squares and co-moments
+  (Welford / Chan et al. updates), from which both the per-column moments
+  and the pairwise-complete correlation matrix follow;
+- per-column minimum and maximum;
+- a per-column quantile sketch of weighted centroids.
+
+Partial states from different years, chunks or worker processes combine with
+`merge`, so the overall, annual and correlation tables all come from the same
+pass, and new days are folded in with `update` without revisiting history.
+The state serializes to JSON.
+
+Quantiles are exact while each yearly partition of a column has at most
+`sketch_size` observations (any daily panel) and approximate beyond; the
+overall table keeps every centroid of the yearly sketches, so it is exact
+whenever they are, however many years the panel spans.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+
+SKETCH_SIZE = 4096
+DESCRIBE_QUANTILES = (0.25, 0.5, 0.75)
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch for one series.
+
+    Values are kept as sorted (centroid, weight) pairs. Once there are more
+    than `size` centroids, neighbours are averaged into `size` bins of equal
+    weight. With unit weights, `quantile` reproduces pandas' linear
+    interpolation exactly.
+
+    Examples
+    --------
+    >>> s = QuantileSketch().update([3.0, 1.0, float("nan"), 2.0])
+    >>> s.merge(QuantileSketch().update([4.0])).quantile([0.25, 0.5])
+    array([1.75, 2.5 ])
+    """
+
+    def __init__(self, size=SKETCH_SIZE):
+        self.size = size
+        self.values = np.empty(0)
+        self.weights = np.empty(0)
+
+    def update(self, values):
+        """Add the non-NaN entries of `values`."""
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        return self._absorb(values, np.ones(len(values)))
+
+    def merge(self, other):
+        """Fold another sketch into this one."""
+        return self._absorb(other.values, other.weights)
+
+    def _absorb(self, values, weights):
+        values = np.concatenate([self.values, values])
+        weights = np.concatenate([self.weights, weights])
+        order = np.argsort(values, kind="stable")
+        self.values, self.weights = values[order], weights[order]
+        if len(self.values) > self.size:
+            self._compress()
+        return self
+
+    def _compress(self):
+        cum = np.cumsum(self.weights)
+        total = cum[-1]
+        # Bin by the cumulative weight at each centroid's midpoint
+        bins = np.minimum(((cum - self.weights / 2) / total * self.size).astype(int), self.size - 1)
+        weights = np.bincount(bins, weights=self.weights, minlength=self.size)
+        sums = np.bincount(bins, weights=self.values * self.weights, minlength=self.size)
+        keep = weights > 0
+        self.weights = weights[keep]
+        self.values = sums[keep] / self.weights
+
+    @property
+    def count(self):
+        return float(self.weights.sum())
+
+    def quantile(self, q):
+        """Linearly interpolated quantiles (NaN if the sketch is empty)."""
+        q = np.asarray(q, dtype=float)
+        if len(self.values) == 0:
+            return np.full(q.shape, np.nan)
+        # Position of each centroid's centre on the 0..n-1 rank axis
+        centres = np.cumsum(self.weights) - (self.weights + 1) / 2
+        return np.interp(q * (self.count - 1), centres, self.values)
+
+    def to_state(self):
+        return {"size": self.size, "values": self.values.tolist(), "weights": self.weights.tolist()}
+
+    @classmethod
+    def from_state(cls, state):
+        s = cls(state["size"])
+        s.values = np.asarray(state["values"], dtype=float)
+        s.weights = np.asarray(state["weights"], dtype=float)
+        return s
+
+
+class PanelMoments:
+    """
+    Pairwise moments, extrema and quantile sketches of a block of rows.
+
+    Entry ``[i, j]`` of `n`, `mean` and `m2` refers to column i over the
+    rows where columns i and j are both observed, and `cxy[i, j]` is the
+    co-moment of that pair; the diagonal holds the per-column moments.
+    """
+
+    def __init__(self, k, sketch_size=SKETCH_SIZE):
+        self.n = np.zeros((k, k))
+        self.mean = np.zeros((k, k))
+        self.m2 = np.zeros((k, k))
+        self.cxy = np.zeros((k, k))
+        self.min = np.full(k, np.nan)
+        self.max = np.full(k, np.nan)
+        self.sketches = [QuantileSketch(sketch_size) for _ in range(k)]
+
+    @classmethod
+    def from_block(cls, block, sketch_size=SKETCH_SIZE):
+        """Moments of a (rows x columns) float block, with NaN as missing."""
+        block = np.asarray(block, dtype=float)
+        k = block.shape[1]
+        moments = cls(k, sketch_size)
+        valid = ~np.isnan(block)
+        if not valid.any():
+            return moments
+
+        # Shift by the column means so the sums below stay well conditioned
+        m = valid.astype(float)
+        observed = m.sum(axis=0)
+        shift = np.divide(np.where(valid, block, 0.0).sum(axis=0), observed,
+                          out=np.zeros(k), where=observed > 0)
+        x = np.where(valid, block - shift, 0.0)
+
+        n = m.T @ m
+        sx = x.T @ m
+        mean_shifted = np.divide(sx, n, out=np.zeros_like(n), where=n > 0)
+        moments.n = n
+        moments.mean = np.where(n > 0, mean_shifted + shift[:, None], 0.0)
+        moments.m2 = (x * x).T @ m - sx * mean_shifted
+        moments.cxy = x.T @ x - sx * mean_shifted.T
+
+        observed = observed > 0
+        moments.min[observed] = np.nanmin(block[:, observed], axis=0)
+        moments.max[observed] = np.nanmax(block[:, observed], axis=0)
+        for sketch, column in zip(moments.sketches, block.T):
+            sketch.update(column)
+        return moments
+
+    def merge(self, other):
+        """Combine with the moments of a disjoint set of rows (in place)."""
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        share = np.divide(other.n, n, out=np.zeros_like(n), where=n > 0)
+        weight = self.n * share
+        self.mean = self.mean + delta * share
+        self.m2 = self.m2 + other.m2 + delta * delta * weight
+        self.cxy = self.cxy + other.cxy + delta * delta.T * weight
+        self.n = n
+        self.min = np.fmin(self.min, other.min)
+        self.max = np.fmax(self.max, other.max)
+        for sketch, other_sketch in zip(self.sketches, other.sketches):
+            sketch.merge(other_sketch)
+        return self
+
+    def copy(self):
+        return PanelMoments.from_state(self.to_state())
+
+    def count(self):
+        return np.diag(self.n).copy()
+
+    def column_mean(self):
+        n = self.count()
+        return np.where(n > 0, np.diag(self.mean), np.nan)
+
+    def column_std(self):
+        """Sample standard deviation (ddof=1), like pandas."""
+        n = self.count()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            var = np.where(n > 1, np.diag(self.m2) / (n - 1), np.nan)
+        return np.sqrt(np.maximum(var, 0.0))
+
+    def correlation(self):
+        """Pairwise-complete Pearson correlation, like DataFrame.corr()."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            denom = np.sqrt(self.m2 * self.m2.T)
+            corr = np.where((self.n > 1) & (denom > 0), self.cxy / denom, np.nan)
+        return np.clip(corr, -1.0, 1.0)
+
+    def to_state(self):
+        return {
+            "n": self.n.tolist(),
+            "mean": self.mean.tolist(),
+            "m2": self.m2.tolist(),
+            "cxy": self.cxy.tolist(),
+            "min": _nan_to_none(self.min),
+            "max": _nan_to_none(self.max),
+            "sketches": [s.to_state() for s in self.sketches],
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        moments = cls(len(state["min"]))
+        for key in ["n", "mean", "m2", "cxy"]:
+            setattr(moments, key, np.asarray(state[key], dtype=float))
+        moments.min = np.asarray(_none_to_nan(state["min"]))
+        moments.max = np.asarray(_none_to_nan(state["max"]))
+        moments.sketches = [QuantileSketch.from_state(s) for s in state["sketches"]]
+        return moments
+
+
+class StatsAccumulator:
+    """
+    Yearly-partitioned `PanelMoments` of a CIP panel.
+
+    Parameters
+    ----------
+    columns : list of str
+        Columns to track, in output order.
+    sketch_size : int, optional
+        Centroids kept per quantile sketch.
+
+    Notes
+    -----
+    `update` adds rows; feeding the same date twice counts it twice.
+    """
+
+    def __init__(self, columns, sketch_size=SKETCH_SIZE):
+        self.columns = list(columns)
+        self.sketch_size = sketch_size
+        self.partitions = {}
+
+    @classmethod
+    def from_frame(cls, df, columns=None, sketch_size=SKETCH_SIZE):
+        """Accumulate every row of a date-indexed frame."""
+        acc = cls(columns if columns is not None else df.columns, sketch_size)
+        return acc.update(df)
+
+    def update(self, df):
+        """Fold the rows of a date-indexed frame into the yearly partitions."""
+        block = df[self.columns].to_numpy(dtype=float)
+        years = pd.DatetimeIndex(df.index).year.to_numpy()
+        for year in np.unique(years):
+            batch = PanelMoments.from_block(block[years == year], self.sketch_size)
+            year = int(year)
+            if year in self.partitions:
+                self.partitions[year].merge(batch)
+            else:
+                self.partitions[year] = batch
+        return self
+
+    def merge(self, other):
+        """Combine with an accumulator over other rows (e.g. from a worker)."""
+        if other.columns != self.columns:
+            raise ValueError("Cannot merge accumulators over different columns.")
+        for year, moments in other.partitions.items():
+            if year in self.partitions:
+                self.partitions[year].merge(moments)
+            else:
+                self.partitions[year] = moments.copy()
+        return self
+
+    def total(self):
+        """
+        `PanelMoments` over all partitions.
+
+        The merged sketches are sized to hold every yearly centroid, so
+        they are not compressed again.
+        """
+        centroids = [
+            sum(len(m.sketches[i].values) for m in self.partitions.values()) for i in range(len(self.columns))
+        ]
+        total = PanelMoments(len(self.columns), max([self.sketch_size, *centroids]))
+        for year in sorted(self.partitions):
+            total.merge(self.partitions[year])
+        return total
+
+    def describe(self, moments=None):
+        """Same layout as DataFrame.describe()."""
+        moments = moments if moments is not None else self.total()
+        quantiles = np.array([s.quantile(DESCRIBE_QUANTILES) for s in moments.sketches]).T
+        rows = np.vstack([
+            moments.count(),
+            moments.column_mean(),
+            moments.column_std(),
+            moments.min,
+            quantiles,
+            moments.max,
+        ])
+        index = ["count", "mean", "std", "min"] + [f"{q:.0%}" for q in DESCRIBE_QUANTILES] + ["max"]
+        return pd.DataFrame(rows, index=index, columns=self.columns)
+
+    def correlation(self, moments=None):
+        """Same layout as DataFrame.corr()."""
+        moments = moments if moments is not None else self.total()
+        return pd.DataFrame(moments.correlation(), index=self.columns, columns=self.columns)
+
+    def annual(self, index_name="Date"):
+        """Same layout as ``resample('YE').agg(['mean', 'std', 'min', 'max'])``."""
+        stats = ["mean", "std", "min", "max"]
+        columns = pd.MultiIndex.from_product([self.columns, stats])
+        if not self.partitions:
+            return pd.DataFrame(columns=columns, index=pd.DatetimeIndex([], name=index_name))
+
+        years = range(min(self.partitions), max(self.partitions) + 1)
+        rows = np.full((len(years), len(self.columns), len(stats)), np.nan)
+        for i, year in enumerate(years):
+            moments = self.partitions.get(year)
+            if moments is not None:
+                rows[i] = np.column_stack(
+                    [moments.column_mean(), moments.column_std(), moments.min, moments.max]
+                )
+        index = pd.DatetimeIndex([pd.Timestamp(year=y, month=12, day=31) for y in years], name=index_name)
+        return pd.DataFrame(rows.reshape(len(years), -1), index=index, columns=columns)
+
+    def to_state(self):
+        return {
+            "columns": self.columns,
+            "sketch_size": self.sketch_size,
+            "partitions": {str(year): m.to_state() for year, m in sorted(self.partitions.items())},
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        acc = cls(state["columns"], state["sketch_size"])
+        acc.partitions = {int(year): PanelMoments.from_state(m) for year, m in state["partitions"].items()}
+        return acc
+
+
+def _nan_to_none(values):
+    return [None if math.isnan(v) else float(v) for v in values]
+
+
+def _none_to_nan(values):
+    return [math.nan if v is None else float(v) for v in values]
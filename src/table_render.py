@@ -0,0 +1,150 @@
+"""
+Render DataFrames as table images (PNG/SVG) with matplotlib.
+
+Tables are drawn straight from the DataFrame with the object-oriented
+matplotlib API on an Agg canvas, so no browser, HTML converter or network
+access is involved and no pyplot state is shared between renders. Several
+tables are rendered in parallel worker processes.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+
+HEADER_COLOR = "#dfe6ee"
+ROW_COLORS = ("#ffffff", "#f5f7fa")
+
+
+def _labels(index):
+    """Display strings for an index or columns (dates, MultiIndex tuples)."""
+    if isinstance(index, pd.DatetimeIndex):
+        return list(index.strftime("%Y-%m-%d"))
+    if isinstance(index, pd.MultiIndex):
+        return ["\n".join(str(level) for level in key) for key in index]
+    return [str(label) for label in index]
+
+
+def _cell_text(df, float_format):
+    def fmt(value):
+        if isinstance(value, float):
+            return "" if pd.isna(value) else float_format.format(value)
+        return str(value)
+
+    return [[fmt(v) for v in row] for row in df.itertuples(index=False)]
+
+
+def render_table(df, path, title=None, float_format="{:.2f}", font_size=8, dpi=150):
+    """
+    Draw `df` as a table and save it to `path`.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Table to draw; the index becomes the row labels.
+    path : str or Path
+        Output file; the format (png, svg, pdf) follows the suffix.
+    title : str, optional
+    float_format : str, optional
+        Format for float cells; NaN is drawn as an empty cell.
+    font_size : int, optional
+    dpi : int, optional
+        Resolution for raster formats.
+
+    Returns
+    -------
+    Path
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    col_labels = _labels(df.columns)
+    row_labels = _labels(df.index)
+    header_lines = max((label.count("\n") + 1 for label in col_labels), default=1)
+
+    # Rough size in inches from the label and cell widths, so wide tables
+    # (e.g. the annual statistics) are not squeezed
+    char_width = font_size / 72 * 0.62
+    col_width = max([len(line) for label in col_labels for line in label.split("\n")] + [8]) * char_width + 0.2
+    row_label_width = max([len(label) for label in row_labels] + [4]) * char_width + 0.2
+    width = row_label_width + col_width * max(len(col_labels), 1)
+    height = (len(row_labels) + header_lines) * font_size / 72 * 1.7 + (0.4 if title else 0.1)
+
+    fig = Figure(figsize=(width, height))
+    FigureCanvasAgg(fig)
+    ax = fig.add_axes([0, 0, 1, 1])
+    ax.axis("off")
+
+    table = ax.table(
+        cellText=_cell_text(df, float_format) or None,
+        rowLabels=row_labels or None,
+        colLabels=col_labels,
+        loc="upper center",
+        cellLoc="right",
+    )
+    table.auto_set_font_size(False)
+    table.set_fontsize(font_size)
+    table.scale(1.0, 1.0 + 0.6 * (header_lines - 1) / max(len(row_labels), 1))
+    for (row, col), cell in table.get_celld().items():
+        cell.set_edgecolor("#c0c6cc")
+        cell.set_linewidth(0.4)
+        if row == 0 or col == -1:
+            cell.set_facecolor(HEADER_COLOR)
+            cell.set_text_props(weight="bold")
+        else:
+            cell.set_facecolor(ROW_COLORS[row % 2])
+        if row == 0:
+            cell.set_height(cell.get_height() * header_lines)
+
+    if title:
+        ax.set_title(title, fontsize=font_size + 2, loc="left")
+
+    fig.savefig(path, dpi=dpi, bbox_inches="tight", pad_inches=0.05)
+    return path
+
+
+def _render_job(job):
+    df, path, kwargs = job
+    return render_table(df, path, **kwargs)
+
+
+def render_tables(tables, output_dir, formats=("png",), max_workers=None, **kwargs):
+    """
+    Render several tables, in parallel processes.
+
+    Parameters
+    ----------
+    tables : dict
+        File stem -> DataFrame, or file stem -> (DataFrame, options) where
+        options are extra keyword arguments for render_table (e.g. a
+        per-table ``float_format``).
+    output_dir : str or Path
+    formats : sequence of str, optional
+        File suffixes to write for every table, e.g. ``("png", "svg")``.
+    max_workers : int, optional
+        Worker processes; 1 renders in this process.
+    **kwargs
+        Defaults passed to render_table for every table.
+
+    Returns
+    -------
+    list of Path
+        Written files, in table then format order.
+    """
+    output_dir = Path(output_dir)
+    jobs = []
+    for stem, table in tables.items():
+        df, options = table if isinstance(table, tuple) else (table, {})
+        for fmt in formats:
+            jobs.append((df, output_dir / f"{stem}.{fmt.lstrip('.')}", {**kwargs, **options}))
+
+    if max_workers is None:
+        max_workers = min(len(jobs), os.cpu_count() or 1)
+    if max_workers <= 1 or len(jobs) <= 1:
+        return [_render_job(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(_render_job, jobs))
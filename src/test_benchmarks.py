@@ -0,0 +1,40 @@
+"""
+Unit test on the synthetic benchmark suite
+"""
+
+import numpy as np
+
+try:
+    import benchmarks
+    import cip_engine
+    import pull_bloomberg_cip_data
+except ModuleNotFoundError:
+    import src.benchmarks as benchmarks
+    import src.cip_engine as cip_engine
+    import src.pull_bloomberg_cip_data as pull_bloomberg_cip_data
+
+
+def test_synthetic_panel_has_the_planted_basis():
+    exchange_rates, forward_rates, interest_rates, universe = benchmarks.synthetic_sheets(
+        30, years=2, outlier_rate=0.0)
+    assert universe.index.is_unique and "USD" not in universe.index
+    assert interest_rates.shape[1] == 31
+
+    panel = pull_bloomberg_cip_data.normalize_sheets(exchange_rates, forward_rates, interest_rates, universe)
+    spreads = cip_engine.compute_cip_basis(panel, list(universe.index))
+    assert spreads.shape == (len(exchange_rates), 30)
+    np.testing.assert_allclose(spreads.mean(), 20.0, atol=1.0)
+
+
+def test_run_and_compare(tmp_path):
+    cases = [(8, 1, "B"), (12, 1, "B")]
+    first = benchmarks.run_benchmarks(cases, repeat=1, results_dir=tmp_path)
+    assert set(first["stage"]) == set(benchmarks.STAGES)
+    assert (first["rows"] == 262).all() and (first["wall_s"] > 0).all()
+
+    second = benchmarks.run_benchmarks(cases[:1], repeat=1, stages=("ingest", "cip"), results_dir=tmp_path)
+    stored = benchmarks.load_results(tmp_path)
+    assert len(stored) == len(first) + len(second)
+
+    comparison = benchmarks.compare_results(second, first, tolerance=1e6)
+    assert len(comparison) == 2 and not comparison["slower"].any()
@@ -2,6 +2,7 @@
 Unit test on bloomberg data
 """
 
+import numpy as np
 import pandas as pd
 import pytest
 
@@ -66,3 +67,39 @@ def test_pull_bloomberg_cip_data_compute_cip():
     assert not pd.isna(max_value), f"Max value in column {max_column} is NaN."
 
 
+def test_pull_bloomberg_cip_data_load_panel_shared():
+    df_2020 = pull_bloomberg_cip_data.load_raw(end='2020-01-01')
+    df_2025 = pull_bloomberg_cip_data.load_raw(end='2025-01-01')
+
+    # Both horizons are views onto the same parsed panel
+    assert np.shares_memory(df_2020.to_numpy(), df_2025.to_numpy())
+
+    # The shared panel cannot be modified by a caller
+    with pytest.raises(ValueError):
+        df_2020.iloc[0, 0] = 0.0
+
+
+def test_pull_bloomberg_cip_data_compute_cip_horizons():
+    horizons = ['2015-01-01', '2020-01-01', ('2018-01-01', '2019-12-31')]
+    by_horizon = pull_bloomberg_cip_data.compute_cip(end=horizons)
+    assert list(by_horizon) == horizons
+
+    # Each slice equals the basis and filter run on that history alone
+    for end in ['2015-01-01', '2020-01-01']:
+        panel = pull_bloomberg_cip_data.load_raw(end=end)
+        expected = pull_bloomberg_cip_data.cip_engine.compute_cip_basis(panel)
+        pull_bloomberg_cip_data.outlier_filter.filter_outliers(expected, inplace=True)
+        pd.testing.assert_frame_equal(by_horizon[end], expected)
+
+    window = by_horizon[('2018-01-01', '2019-12-31')]
+    assert window.index.min() >= pd.Timestamp('2018-01-01')
+    pd.testing.assert_frame_equal(window, by_horizon['2020-01-01'].loc['2018-01-01':'2019-12-31'])
+
+
+def test_pull_bloomberg_cip_data_deprecated_arguments():
+    with pytest.warns(DeprecationWarning, match="plot"):
+        df = pull_bloomberg_cip_data.load_raw(end='2020-01-01', plot=True)
+    pd.testing.assert_frame_equal(df, pull_bloomberg_cip_data.load_raw(end='2020-01-01'))
+    with pytest.warns(DeprecationWarning, match="excel"):
+        spot, _, _ = pull_bloomberg_cip_data.load_raw_pieces(excel=True)
+    assert list(spot.columns[:1]) == ['AUD_CURNCY']
@@ -0,0 +1,58 @@
+"""
+Unit test on the chart registry and its content-hash cache
+"""
+
+import json
+
+import matplotlib
+import numpy as np
+import pandas as pd
+
+try:
+    import chart_registry
+except ModuleNotFoundError:
+    import src.chart_registry as chart_registry
+
+
+def test_render_charts_only_redraws_changed_inputs(tmp_path, monkeypatch):
+    monkeypatch.setattr(chart_registry, "CHARTS", {})
+    index = pd.bdate_range("2019-01-01", periods=300)
+    data = {
+        "a": pd.DataFrame({"AUD": np.linspace(0, 10, 300)}, index=index),
+        "b": pd.DataFrame({"JPY": np.linspace(5, -5, 300)}, index=index),
+    }
+    for name in data:
+        chart_registry.register_chart(name, lambda name=name: data[name], formats=("png",), screen_dpi=50)
+
+    first = chart_registry.render_charts(output_dir=tmp_path, max_workers=2)
+    assert first == {"a": "rendered", "b": "rendered"}
+    assert (tmp_path / "a.png").exists() and (tmp_path / "b.png").exists()
+
+    assert chart_registry.render_charts(output_dir=tmp_path) == {"a": "cached", "b": "cached"}
+
+    # New data for one chart, new style for none: only that chart is redrawn
+    data["b"] = data["b"] * 2
+    assert chart_registry.render_charts(output_dir=tmp_path, max_workers=1) == {"a": "cached", "b": "rendered"}
+
+    # A deleted artifact is redrawn even though its inputs are unchanged
+    (tmp_path / "a.png").unlink()
+    assert chart_registry.render_charts(output_dir=tmp_path)["a"] == "rendered"
+
+    manifest = json.loads((tmp_path / chart_registry.MANIFEST_FILE).read_text())
+    assert set(manifest) == {"a", "b"}
+
+
+def test_render_in_process_keeps_the_callers_backend(tmp_path, monkeypatch):
+    monkeypatch.setattr(chart_registry, "CHARTS", {})
+    index = pd.bdate_range("2019-01-01", periods=50)
+    frame = pd.DataFrame({"AUD": np.linspace(0, 10, 50)}, index=index)
+    chart_registry.register_chart("a", lambda: frame, formats=("png",), screen_dpi=50)
+
+    backend = matplotlib.get_backend()
+    matplotlib.use("svg")
+    try:
+        chart_registry.render_charts(output_dir=tmp_path, max_workers=1)
+        assert matplotlib.get_backend() == "svg"
+    finally:
+        matplotlib.use(backend)
+    assert (tmp_path / "a.png").exists()
@@ -0,0 +1,113 @@
+"""
+Unit test on the incremental daily-append store
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+try:
+    import cip_engine
+    import cip_incremental
+    import outlier_filter
+    import panel_store
+    import pull_bloomberg_cip_data
+except ModuleNotFoundError:
+    import src.panel_store as panel_store
+    import src.cip_engine as cip_engine
+    import src.cip_incremental as cip_incremental
+    import src.outlier_filter as outlier_filter
+    import src.pull_bloomberg_cip_data as pull_bloomberg_cip_data
+
+
+def _raw_sheets(n_days=300, seed=2):
+    """Spot, forward-point and OIS sheets laid out like CIP_2025.xlsx."""
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2018-01-01", periods=n_days, name="Date")
+    currencies = cip_engine.CURRENCIES
+    spot = pd.DataFrame(
+        1.0 + rng.random(len(currencies)) * np.exp(rng.normal(0, 0.004, (n_days, len(currencies))).cumsum(axis=0)),
+        index=index, columns=[f"{c} Curncy" for c in currencies],
+    )
+    forward = pd.DataFrame(
+        rng.normal(0, 20, (n_days, len(currencies))),
+        index=index, columns=[f"{c}3M Curncy" for c in currencies],
+    )
+    forward.iloc[220, 1] += 2000.0
+    ois = pd.DataFrame(
+        rng.normal(1.0, 0.1, (n_days, len(currencies) + 1)),
+        index=index, columns=currencies + ["USD"],
+    )
+    return spot, forward, ois
+
+
+def test_cip_incremental_append_matches_full_recompute(tmp_path):
+    spot, forward, ois = _raw_sheets()
+    full = pull_bloomberg_cip_data.normalize_sheets(spot, forward, ois)
+    expected, expected_mask = outlier_filter.filter_outliers(cip_engine.compute_cip_basis(full))
+
+    cip_incremental.build_store(full.iloc[:200], store_dir=tmp_path)
+    cip_incremental.append_rows(spot.iloc[200:250], forward.iloc[200:250], ois.iloc[200:250], store_dir=tmp_path)
+    # Overlapping rows are skipped rather than stored twice
+    cip_incremental.append_rows(spot.iloc[240:], forward.iloc[240:], ois.iloc[240:], store_dir=tmp_path)
+
+    cleaned, outlier_mask = cip_incremental.load_store(store_dir=tmp_path)
+    pd.testing.assert_frame_equal(outlier_mask, expected_mask, check_freq=False)
+    pd.testing.assert_frame_equal(cleaned, expected, check_freq=False)
+    assert outlier_mask["CIP_CAD_ln"].iloc[220]
+
+
+def test_cip_incremental_keeps_few_parts(tmp_path, monkeypatch):
+    monkeypatch.setattr(cip_incremental, "PART_ROWS", 16)
+    spot, forward, ois = _raw_sheets()
+    full = pull_bloomberg_cip_data.normalize_sheets(spot, forward, ois)
+    expected, _ = outlier_filter.filter_outliers(cip_engine.compute_cip_basis(full))
+
+    cip_incremental.build_store(full.iloc[:200], store_dir=tmp_path)
+    for day in range(200, 300):
+        rows = slice(day, day + 1)
+        cip_incremental.append_rows(spot.iloc[rows], forward.iloc[rows], ois.iloc[rows], store_dir=tmp_path)
+
+    # 100 daily appends in parts of 16 rows
+    assert len(list(tmp_path.glob("part-*.parquet"))) == 1 + 7
+    cleaned, _ = cip_incremental.load_store(store_dir=tmp_path)
+    pd.testing.assert_frame_equal(cleaned, expected, check_freq=False)
+
+
+@pytest.fixture
+def synthetic_source(tmp_path, monkeypatch):
+    """Point the pipeline at a synthetic workbook whose version the test controls."""
+    spot, forward, ois = _raw_sheets()
+    full = pull_bloomberg_cip_data.normalize_sheets(spot, forward, ois)
+    source = {"version": 1, "rows": 200}
+    monkeypatch.setattr(cip_incremental, "STORE_DIR", tmp_path / "incremental")
+    monkeypatch.setattr(panel_store, "STORE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(pull_bloomberg_cip_data, "_panel_source",
+                        lambda: ("excel", ("synthetic.xlsx", source["version"], 0)))
+    monkeypatch.setattr(pull_bloomberg_cip_data, "_load_excel_panel", lambda: full.iloc[:source["rows"]])
+    pull_bloomberg_cip_data.clear_panel_cache()
+    yield (spot, forward, ois), full, source
+    pull_bloomberg_cip_data.clear_panel_cache()
+
+
+def test_appended_rows_are_served_and_follow_the_source(synthetic_source):
+    (spot, forward, ois), full, source = synthetic_source
+    expected, _ = outlier_filter.filter_outliers(cip_engine.compute_cip_basis(full))
+
+    cip_incremental.build_store()
+    cip_incremental.append_rows(spot.iloc[200:], forward.iloc[200:], ois.iloc[200:])
+    pd.testing.assert_frame_equal(pull_bloomberg_cip_data.compute_cip(None), expected, check_freq=False)
+    pd.testing.assert_frame_equal(pull_bloomberg_cip_data.load_panel(), full, check_freq=False)
+    pd.testing.assert_frame_equal(pull_bloomberg_cip_data.load_raw("2018-10-31"), full.loc[:"2018-10-31"],
+                                  check_freq=False)
+
+    # A new version of the workbook: the store is rebuilt from it before
+    # appending, instead of extending spreads of the old version
+    source.update(version=2, rows=250)
+    cip_incremental.append_rows(spot.iloc[250:], forward.iloc[250:], ois.iloc[250:])
+    state = json.loads((cip_incremental.STORE_DIR / cip_incremental.STATE_FILE).read_text())
+    assert state["source"] == ["excel", ["synthetic.xlsx", 2, 0]]
+    assert state["part_rows"] == [250, 50]
+    pd.testing.assert_frame_equal(pull_bloomberg_cip_data.compute_cip(None), expected, check_freq=False)
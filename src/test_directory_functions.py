@@ -0,0 +1,37 @@
+"""
+Unit test on the statistics export entry point
+"""
+
+import numpy as np
+import pandas as pd
+
+try:
+    import directory_functions
+    import stats_accumulator
+except ModuleNotFoundError:
+    import src.directory_functions as directory_functions
+    import src.stats_accumulator as stats_accumulator
+
+
+def test_export_cip_statistics_writes_all_formats(tmp_path):
+    # Importing the module must not have computed anything
+    assert not hasattr(directory_functions, "stats_dict")
+
+    rng = np.random.default_rng(5)
+    index = pd.bdate_range("2019-06-03", periods=400, name="Date")
+    spreads = pd.DataFrame(rng.normal(0, 5, (400, 2)), index=index, columns=["CIP_AUD_ln", "CIP_JPY_ln"])
+    acc = stats_accumulator.StatsAccumulator.from_frame(spreads)
+    stats_dict = {
+        "overall_statistics": acc.describe(),
+        "correlation_matrix": acc.correlation(),
+        "annual_statistics": acc.annual(),
+    }
+
+    written = directory_functions.export_cip_statistics(
+        stats_dict, formats=("html", "png", "svg"),
+        html_dir=tmp_path / "html", image_dir=tmp_path / "img", max_workers=1,
+    )
+    assert set(written) == {"html", "png", "svg"}
+    assert all(len(paths) == 3 for paths in written.values())
+    assert (tmp_path / "html" / "cip_summary_overall.html").exists()
+    assert (tmp_path / "img" / "cip_annual_statistics.svg").exists()
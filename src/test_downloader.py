@@ -0,0 +1,92 @@
+"""
+Unit test on the conditional downloader, against a local http.server
+"""
+
+import hashlib
+import stat
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+try:
+    import downloader
+except ModuleNotFoundError:
+    import src.downloader as downloader
+
+
+class _Handler(BaseHTTPRequestHandler):
+    body = b""
+    truncate = False
+    requests_seen = []
+
+    def do_GET(self):
+        etag = '"%s"' % hashlib.md5(self.body).hexdigest()
+        type(self).requests_seen.append(dict(self.headers))
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body[: len(self.body) // 2] if self.truncate else self.body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    _Handler.body = b"workbook v1" * 50_000
+    _Handler.truncate = False
+    _Handler.requests_seen = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/CIP_2025.xlsx"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_download_file_is_conditional_and_atomic(server, tmp_path):
+    target = tmp_path / "data" / "CIP_2025.xlsx"
+
+    first = downloader.download_file(server, target, chunk_size=4096)
+    assert first["status"] == 200 and first["changed"]
+    assert target.read_bytes() == _Handler.body
+    assert first["sha256"] == hashlib.sha256(_Handler.body).hexdigest()
+    # Same permissions as a file created with open()
+    reference = tmp_path / "reference"
+    reference.write_bytes(b"")
+    assert stat.S_IMODE(target.stat().st_mode) == stat.S_IMODE(reference.stat().st_mode)
+
+    # Unchanged upstream: a 304, and the file is not rewritten
+    mtime = target.stat().st_mtime_ns
+    second = downloader.download_file(server, target)
+    assert second["status"] == 304 and not second["changed"]
+    assert "If-None-Match" in _Handler.requests_seen[-1]
+    assert target.stat().st_mtime_ns == mtime
+
+    # New content with a wrong checksum leaves the old file in place
+    _Handler.body = b"workbook v2" * 50_000
+    with pytest.raises(ValueError, match="Checksum"):
+        downloader.download_file(server, target, expected_sha256="0" * 64)
+    assert target.read_bytes() == b"workbook v1" * 50_000
+
+    # A truncated body is rejected too
+    _Handler.truncate = True
+    with pytest.raises(ValueError, match="Truncated"):
+        downloader.download_file(server, target)
+    _Handler.truncate = False
+
+    third = downloader.download_file(
+        server, target, expected_sha256=hashlib.sha256(_Handler.body).hexdigest()
+    )
+    assert third["changed"] and target.read_bytes() == _Handler.body
+
+    # No temporary files are left behind
+    assert sorted(p.name for p in target.parent.iterdir()) == [
+        "CIP_2025.xlsx", "CIP_2025.xlsx" + downloader.META_SUFFIX
+    ]
@@ -0,0 +1,38 @@
+"""
+Unit test on the plotting downsamplers
+"""
+
+import numpy as np
+import pandas as pd
+
+try:
+    import downsample
+except ModuleNotFoundError:
+    import src.downsample as downsample
+
+
+def _series(n=4000, seed=4):
+    rng = np.random.default_rng(seed)
+    values = rng.normal(0, 1, n).cumsum()
+    values[1234] = 500.0  # spike
+    values[[2000, 2001, 3500]] = np.nan  # filtered outliers
+    return pd.Series(values, index=pd.bdate_range("2010-01-01", periods=n))
+
+
+def test_downsample_series_keeps_extremes_and_gaps():
+    series = _series()
+    for method in ["lttb", "minmax"]:
+        reduced = downsample.downsample_series(series, 1000, method=method)
+        assert len(reduced) < 0.4 * len(series)
+        assert reduced.index.is_monotonic_increasing
+        assert reduced.index.isin(series.index).all()
+        # The spike and both ends survive, and the gaps are still gaps
+        assert reduced.max() == 500.0
+        assert reduced.index[0] == series.index[0] and reduced.index[-1] == series.index[-1]
+        assert series.index[2000] in reduced.index and np.isnan(reduced[series.index[2000]])
+        assert series.index[3500] in reduced.index
+
+
+def test_downsample_series_is_identity_below_target():
+    series = pd.Series(np.arange(200.0), index=pd.bdate_range("2010-01-01", periods=200))
+    assert downsample.downsample_series(series, 1000) is series
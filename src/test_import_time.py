@@ -0,0 +1,62 @@
+"""
+Regression test on import-time work: the data and CIP modules must not load
+plotting, HTTP or browser-automation packages, and must import quickly once
+pandas is loaded.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Packages only needed once a feature (plotting, downloading, ...) is used
+DEFERRED = ["matplotlib", "requests", "urllib3", "polars", "selenium", "webdriver_manager", "seaborn"]
+
+# Seconds a module may take to import, on top of numpy and pandas
+IMPORT_BUDGET = 0.5
+
+SCRIPT = """
+import json, sys, time
+import numpy, pandas
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+loaded = sorted({{name.split(".")[0] for name in sys.modules}})
+print(json.dumps({{"elapsed": elapsed, "loaded": loaded}}))
+"""
+
+
+def _import_in_subprocess(module):
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT.format(module=module)],
+        cwd=SRC_DIR, capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize("module", [
+    "settings",
+    "cip_engine",
+    "pull_bloomberg_cip_data",
+    "cip_analysis",
+    "misc_tools",
+    "directory_functions",
+    "chart_registry",
+])
+def test_import_is_light(module):
+    result = _import_in_subprocess(module)
+    assert not set(DEFERRED) & set(result["loaded"])
+    assert result["elapsed"] < IMPORT_BUDGET
+
+
+def test_settings_does_not_import_pandas():
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, settings; print('pandas' in sys.modules)"],
+        cwd=SRC_DIR, capture_output=True, text=True, check=True,
+    )
+    assert result.stdout.strip() == "False"
@@ -0,0 +1,81 @@
+"""
+Unit test on the opt-in stage instrumentation
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+try:
+    import instrumentation
+except ModuleNotFoundError:
+    import src.instrumentation as instrumentation
+
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+@pytest.fixture
+def profiling():
+    instrumentation.enable()
+    instrumentation.reset_trace()
+    yield
+    instrumentation.enable(False)
+    instrumentation.reset_trace()
+
+
+def test_disabled_stages_record_nothing():
+    instrumentation.reset_trace()
+    with instrumentation.stage("quiet") as stage:
+        stage.rows = 10
+    assert instrumentation.get_trace() == []
+
+
+def test_trace_and_summary(profiling, tmp_path):
+    index = pd.bdate_range("2020-01-01", periods=300)
+    cip = pd.DataFrame(np.random.default_rng(0).normal(size=(300, 2)), index=index,
+                       columns=["CIP_AUD_ln", "CIP_JPY_ln"])
+
+    @instrumentation.instrumented("pipeline")
+    def pipeline():
+        for _ in range(2):
+            with instrumentation.stage("stats", rows=len(cip)):
+                cip.rolling(45).median()
+        return cip
+
+    pipeline()
+    trace = instrumentation.get_trace()
+    # Nested stages finish first and carry the path of their parents
+    assert [r["stage"] for r in trace] == ["pipeline/stats", "pipeline/stats", "pipeline"]
+    for record in trace:
+        assert record["rows"] == 300
+        assert record["wall_s"] >= 0 and record["cpu_s"] >= 0
+
+    summary = instrumentation.summary_table()
+    assert summary.loc["pipeline/stats", "calls"] == 2
+    assert summary.loc["pipeline/stats", "rows"] == 600
+
+    path = instrumentation.write_trace(tmp_path / "run.json", run_name="test")
+    written = json.loads(path.read_text())
+    assert written["run"] == "test"
+    assert [r["stage"] for r in written["stages"]] == [r["stage"] for r in trace]
+
+
+
+def test_trace_is_shared_between_import_names():
+    # With src/ on sys.path the pipeline modules may load this file under
+    # both names; the two module objects must still record one trace
+    script = "\n".join([
+        "import instrumentation, src.instrumentation as other",
+        "assert instrumentation is not other",
+        "other.enable()",
+        "with other.stage('elsewhere'): pass",
+        "print(instrumentation.is_enabled(), [r['stage'] for r in instrumentation.get_trace()])",
+    ])
+    result = subprocess.run([sys.executable, "-c", script], cwd=SRC_DIR, capture_output=True, text=True,
+                            env={**os.environ, "PYTHONPATH": os.path.dirname(SRC_DIR)}, check=True)
+    assert result.stdout.strip() == "True ['elsewhere']"
@@ -0,0 +1,48 @@
+"""
+Unit test on the Parquet panel cache
+"""
+
+import os
+
+import pandas as pd
+
+try:
+    import panel_cache
+except ModuleNotFoundError:
+    import src.panel_cache as panel_cache
+
+
+def _build_counter():
+    calls = []
+
+    def build(source_path):
+        calls.append(source_path)
+        with open(source_path) as f:
+            value = float(f.read())
+        index = pd.DatetimeIndex(["2020-01-01", "2020-01-02"], name="Date")
+        return pd.DataFrame({"AUD_CURNCY": [value, value + 1]}, index=index)
+
+    return build, calls
+
+
+def test_panel_cache_hit_and_invalidation(tmp_path):
+    source = tmp_path / "CIP_2025.xlsx"
+    source.write_text("1.0")
+    build, calls = _build_counter()
+
+    first = panel_cache.load_or_build(source, build, cache_dir=tmp_path / "cache")
+    second = panel_cache.load_or_build(source, build, cache_dir=tmp_path / "cache")
+    assert len(calls) == 1
+    pd.testing.assert_frame_equal(first, second)
+
+    # Touching the file without changing it is still a hit
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    panel_cache.load_or_build(source, build, cache_dir=tmp_path / "cache")
+    assert len(calls) == 1
+
+    # New contents invalidate the entry
+    source.write_text("2.0")
+    third = panel_cache.load_or_build(source, build, cache_dir=tmp_path / "cache")
+    assert len(calls) == 2
+    assert third["AUD_CURNCY"].iloc[0] == 2.0
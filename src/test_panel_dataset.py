@@ -0,0 +1,57 @@
+"""
+Unit test on the year-partitioned Parquet datasets
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+
+try:
+    import panel_dataset
+except ModuleNotFoundError:
+    import src.panel_dataset as panel_dataset
+
+
+def _panel():
+    index = pd.bdate_range("2012-06-01", "2016-03-31", name="Date")
+    values = np.random.default_rng(0).normal(size=(len(index), 3))
+    return pd.DataFrame(values, index=index, columns=["AUD_CURNCY", "AUD_IR", "USD_IR"])
+
+
+def test_range_reads_match_loc(tmp_path):
+    panel = _panel()
+    path = panel_dataset.write_dataset(panel, tmp_path / "panel")
+    assert sorted(p.name for p in path.iterdir() if p.is_dir()) == [f"year={y}" for y in range(2012, 2017)]
+
+    for start, end in [(None, None), ("2013-02-15", "2013-03-01"), (None, "2014"), ("2015-12-31", None)]:
+        expected = panel.loc[start:end]
+        got = panel_dataset.read_dataset(path, start, end)
+        pd.testing.assert_frame_equal(got, expected, check_freq=False)
+
+    got = panel_dataset.read_dataset(path, "2014-01-01", "2014-01-31", columns=["USD_IR"])
+    assert list(got.columns) == ["USD_IR"] and len(got) == 23
+
+
+def test_filter_prunes_partitions(tmp_path):
+    path = panel_dataset.write_dataset(_panel(), tmp_path / "panel")
+    dataset = ds.dataset(path, format="parquet", partitioning=panel_dataset._PARTITIONING)
+    fragments = list(dataset.get_fragments(filter=panel_dataset.date_filter("2014-03-01", "2014-06-30")))
+    assert [f.path.split("/")[-2] for f in fragments] == ["year=2014"]
+
+
+def test_ensure_dataset_rebuilds_on_new_fingerprint(tmp_path):
+    builds = []
+
+    def build():
+        builds.append(1)
+        return _panel() * len(builds)
+
+    path = tmp_path / "panel"
+    panel_dataset.ensure_dataset(path, ("excel", ("a.xlsx", 1, 2)), build)
+    panel_dataset.ensure_dataset(path, ["excel", ["a.xlsx", 1, 2]], build)
+    assert len(builds) == 1
+
+    panel_dataset.ensure_dataset(path, ("excel", ("a.xlsx", 1, 3)), build)
+    assert len(builds) == 2
+    pd.testing.assert_frame_equal(panel_dataset.read_dataset(path), _panel() * 2, check_freq=False)
+    assert not any(p.name.startswith(".") for p in tmp_path.iterdir())
@@ -0,0 +1,65 @@
+"""
+Unit test on the memory-mapped panel store
+"""
+
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+try:
+    import panel_store
+except ModuleNotFoundError:
+    import src.panel_store as panel_store
+
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _panel():
+    index = pd.date_range("2019-12-30", periods=6, freq="D", name="Date")
+    return pd.DataFrame({"EUR_CURNCY": np.arange(6.0), "USD_IR": np.arange(6.0) / 10}, index=index)
+
+
+def test_round_trip_is_zero_copy(tmp_path):
+    path = panel_store.write_store(_panel(), tmp_path / "CIP_2025.panel", ["excel", ["a", 1, 2]])
+    df = panel_store.open_store(path)
+    pd.testing.assert_frame_equal(df, _panel(), check_freq=False)
+
+    base = df.to_numpy()
+    while not isinstance(base, np.memmap):
+        base = base.base
+    assert str(base.filename) == str((path / panel_store.VALUES_FILE).resolve())
+    assert np.shares_memory(df.loc["2020"].to_numpy(), df.to_numpy())
+    with pytest.raises(ValueError):
+        df.to_numpy()[0, 0] = 1.0
+
+
+def test_ensure_store_rebuilds_on_new_fingerprint(tmp_path):
+    path = tmp_path / "CIP_2025.panel"
+    calls = []
+
+    def build():
+        calls.append(1)
+        return _panel()
+
+    panel_store.ensure_store(path, ("excel", ("a", 1, 2)), build)
+    panel_store.ensure_store(path, ["excel", ["a", 1, 2]], build)
+    assert len(calls) == 1
+    panel_store.ensure_store(path, ("excel", ("a", 1, 3)), build)
+    assert len(calls) == 2
+
+
+def test_store_opens_in_another_process(tmp_path):
+    path = panel_store.write_store(_panel(), tmp_path / "CIP_2025.panel")
+    script = (
+        "import sys, panel_store; "
+        "df = panel_store.open_store(sys.argv[1]); "
+        "print(df['EUR_CURNCY'].sum())"
+    )
+    result = subprocess.run([sys.executable, "-c", script, str(path)],
+                            cwd=SRC_DIR, capture_output=True, text=True, check=True)
+    assert float(result.stdout.strip()) == 15.0
@@ -0,0 +1,37 @@
+"""
+Unit test on the process-pool CIP executor: it must match the serial path
+"""
+
+import numpy as np
+import pandas as pd
+
+try:
+    import parallel_cip
+    import benchmarks
+    import cip_engine
+    import outlier_filter
+    import pull_bloomberg_cip_data
+except ModuleNotFoundError:
+    import src.parallel_cip as parallel_cip
+    import src.benchmarks as benchmarks
+    import src.cip_engine as cip_engine
+    import src.outlier_filter as outlier_filter
+    import src.pull_bloomberg_cip_data as pull_bloomberg_cip_data
+
+
+def test_column_blocks_cover_every_column():
+    for n_columns, workers in [(1, 4), (7, 2), (200, 8), (13, 1)]:
+        blocks = parallel_cip.column_blocks(n_columns, workers)
+        assert [i for start, stop in blocks for i in range(start, stop)] == list(range(n_columns))
+        assert len(blocks) <= workers * parallel_cip.BLOCKS_PER_WORKER
+
+
+def test_process_pool_matches_serial():
+    exchange_rates, forward_rates, interest_rates, universe = benchmarks.synthetic_sheets(16, years=3, seed=5)
+    exchange_rates.iloc[40:43, 1] = np.nan
+    panel = pull_bloomberg_cip_data.normalize_sheets(exchange_rates, forward_rates, interest_rates, universe)
+    currencies = list(universe.index)
+
+    expected, _ = outlier_filter.filter_outliers(cip_engine.compute_cip_basis(panel, currencies))
+    result = parallel_cip.compute_clean_spreads(panel, currencies, workers=2)
+    pd.testing.assert_frame_equal(result, expected)
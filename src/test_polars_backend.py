@@ -0,0 +1,72 @@
+"""
+Unit test on the polars LazyFrame backend: it must match the pandas path
+"""
+
+import numpy as np
+import pandas as pd
+
+try:
+    import polars_backend
+    import benchmarks
+    import cip_engine
+    import outlier_filter
+    import panel_cache
+    import pull_bloomberg_cip_data
+except ModuleNotFoundError:
+    import src.polars_backend as polars_backend
+    import src.benchmarks as benchmarks
+    import src.cip_engine as cip_engine
+    import src.outlier_filter as outlier_filter
+    import src.panel_cache as panel_cache
+    import src.pull_bloomberg_cip_data as pull_bloomberg_cip_data
+
+
+def test_pipeline_matches_pandas():
+    exchange_rates, forward_rates, interest_rates, universe = benchmarks.synthetic_sheets(12, years=4, seed=3)
+    # Gaps and a date missing from one sheet exercise the join and the windows
+    exchange_rates.iloc[100:103, 2] = np.nan
+    forward_rates = forward_rates.drop(forward_rates.index[500])
+
+    panel = pull_bloomberg_cip_data.normalize_sheets(exchange_rates, forward_rates, interest_rates, universe)
+    spreads = cip_engine.compute_cip_basis(panel, list(universe.index))
+    expected, _ = outlier_filter.filter_outliers(spreads)
+    expected_annual = expected.resample("YE").agg(["mean", "std", "min", "max"])
+
+    result = polars_backend.run_pipeline(exchange_rates, forward_rates, interest_rates, universe)
+    pd.testing.assert_frame_equal(result["spreads"], expected, check_freq=False, rtol=1e-12, atol=1e-9)
+    pd.testing.assert_frame_equal(result["annual_statistics"], expected_annual, check_freq=False,
+                                  rtol=1e-12, atol=1e-9)
+
+
+def test_scan_workbook_sheets_parses_once(tmp_path):
+    source = tmp_path / "CIP_2025.xlsx"
+    source.write_bytes(b"workbook")
+    calls = []
+    index = pd.DatetimeIndex(["2020-01-01", "2020-01-02"], name="Date")
+
+    def read_sheets(path):
+        calls.append(path)
+        return [pd.DataFrame({"a": [1.0, 2.0]}, index=index), pd.DataFrame({"b": [3.0, 4.0]}, index=index)]
+
+    for _ in range(2):
+        spot, forward = polars_backend.scan_workbook_sheets(source, read_sheets, ["Spot", "Forward"],
+                                                            cache_dir=tmp_path / "cache")
+    assert len(calls) == 1
+    assert sorted(spot.collect().columns) == ["Date", "a"]
+    assert forward.collect()["b"].to_list() == [3.0, 4.0]
+    assert panel_cache.fresh_cache_path(source, tmp_path / "cache", name="CIP_2025_forward") is not None
+
+
+def test_scan_workbook_sheets_without_writable_cache(tmp_path):
+    source = tmp_path / "CIP_2025.xlsx"
+    source.write_bytes(b"workbook")
+    # A file where the cache directory should be makes every write fail
+    blocker = tmp_path / "blocker"
+    blocker.write_text("")
+    index = pd.DatetimeIndex(["2020-01-01", "2020-01-02"], name="Date")
+
+    def read_sheets(path):
+        return [pd.DataFrame({"a": [1.0, 2.0]}, index=index)]
+
+    spot, = polars_backend.scan_workbook_sheets(source, read_sheets, ["Spot"], cache_dir=blocker / "cache")
+    assert spot.collect()["a"].to_list() == [1.0, 2.0]
@@ -0,0 +1,69 @@
+"""
+Unit test on the single-pass statistics accumulator
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+try:
+    import stats_accumulator
+except ModuleNotFoundError:
+    import src.stats_accumulator as stats_accumulator
+
+
+def _spreads(n_days=900, seed=3):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2015-03-02", periods=n_days, name="Date")
+    columns = [f"CIP_{c}_ln" for c in ["AUD", "CHF", "JPY", "SEK"]]
+    data = rng.normal(0, 1, (n_days, len(columns))).cumsum(axis=0) * 5 + 20
+    data[rng.random(data.shape) < 0.05] = np.nan
+    return pd.DataFrame(data, index=index, columns=columns)
+
+
+def test_stats_accumulator_matches_pandas():
+    df = _spreads()
+    acc = stats_accumulator.StatsAccumulator.from_frame(df)
+
+    pd.testing.assert_frame_equal(acc.describe(), df.describe(), rtol=1e-10)
+    pd.testing.assert_frame_equal(acc.correlation(), df.corr(), rtol=1e-10)
+    pd.testing.assert_frame_equal(
+        acc.annual(), df.resample("YE").agg(["mean", "std", "min", "max"]), rtol=1e-10, check_freq=False
+    )
+
+
+def test_stats_accumulator_merges_partial_states():
+    df = _spreads()
+    whole = stats_accumulator.StatsAccumulator.from_frame(df)
+
+    # Two workers over interleaved rows, one of them shipped as JSON
+    first = stats_accumulator.StatsAccumulator.from_frame(df.iloc[::2])
+    second = stats_accumulator.StatsAccumulator.from_frame(df.iloc[1::2])
+    restored = stats_accumulator.StatsAccumulator.from_state(json.loads(json.dumps(first.to_state())))
+    merged = restored.merge(second)
+    pd.testing.assert_frame_equal(merged.describe(), whole.describe(), rtol=1e-10)
+    pd.testing.assert_frame_equal(merged.correlation(), whole.correlation(), rtol=1e-10)
+
+    # Folding in new days matches a recomputation over the full history
+    appended = stats_accumulator.StatsAccumulator.from_frame(df.iloc[:-20]).update(df.iloc[-20:])
+    pd.testing.assert_frame_equal(appended.annual(), whole.annual(), rtol=1e-10)
+
+
+def test_quantile_sketch_is_close_once_compressed():
+    values = np.random.default_rng(0).normal(size=20_000)
+    sketch = stats_accumulator.QuantileSketch(size=512)
+    for chunk in np.array_split(values, 40):
+        sketch.merge(stats_accumulator.QuantileSketch(size=512).update(chunk))
+
+    assert len(sketch.values) <= 512
+    assert sketch.count == len(values)
+    np.testing.assert_allclose(sketch.quantile([0.25, 0.5, 0.75]), np.quantile(values, [0.25, 0.5, 0.75]), atol=0.02)
+
+
+def test_overall_quantiles_stay_exact_beyond_sketch_size():
+    df = _spreads(n_days=6000)
+    acc = stats_accumulator.StatsAccumulator.from_frame(df)
+
+    assert df.count().max() > stats_accumulator.SKETCH_SIZE
+    pd.testing.assert_frame_equal(acc.describe(), df.describe(), rtol=1e-10)
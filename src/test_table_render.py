@@ -0,0 +1,48 @@
+"""
+Unit test on the matplotlib table renderer
+"""
+
+import numpy as np
+import pandas as pd
+
+try:
+    import table_render
+except ModuleNotFoundError:
+    import src.table_render as table_render
+
+
+def test_render_tables_writes_png_and_svg(tmp_path):
+    index = pd.DatetimeIndex(["2020-12-31", "2021-12-31"], name="Date")
+    annual = pd.DataFrame(
+        [[1.0, 0.5, np.nan, 2.0], [1.5, 0.25, 0.0, 3.0]],
+        index=index,
+        columns=pd.MultiIndex.from_product([["CIP_AUD_ln"], ["mean", "std", "min", "max"]]),
+    )
+    corr = pd.DataFrame(np.eye(2), index=["a", "b"], columns=["a", "b"])
+
+    paths = table_render.render_tables(
+        {"annual": annual, "corr": (corr, {"float_format": "{:.3f}"})},
+        tmp_path, formats=("png", "svg"), max_workers=2,
+    )
+
+    assert [p.name for p in paths] == ["annual.png", "annual.svg", "corr.png", "corr.svg"]
+    assert (tmp_path / "annual.png").read_bytes().startswith(b"\x89PNG")
+    svg = (tmp_path / "corr.svg").read_text()
+    assert "<svg" in svg
+    assert table_render._labels(annual.columns)[0] == "CIP_AUD_ln\nmean"
+    assert table_render._cell_text(annual, "{:.2f}")[0] == ["1.00", "0.50", "", "2.00"]
+
+
+def test_html_to_png_renders_each_table(tmp_path):
+    try:
+        import misc_tools
+    except ModuleNotFoundError:
+        import src.misc_tools as misc_tools
+
+    table = pd.DataFrame({"mean": [1.0, 2.0], "std": [0.5, 0.25]}, index=["CIP_AUD_ln", "CIP_CAD_ln"])
+    table.to_html(tmp_path / "overall.html")
+
+    paths = misc_tools.html_to_png(tmp_path)
+
+    assert paths == [str(tmp_path / "converted_pngs" / "overall.png")]
+    assert (tmp_path / "converted_pngs" / "overall.png").read_bytes().startswith(b"\x89PNG")